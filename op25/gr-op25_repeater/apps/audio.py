@@ -61,13 +61,14 @@ parser.add_option("-u", "--wireshark-port", type="int", default=23456, help="Wir
 parser.add_option("-2", "--two-channel", action="store_true", default=False, help="single or two channel audio")
 parser.add_option("-x", "--audio-gain", type="float", default="1.0", help="audio gain (default = 1.0)")
 parser.add_option("-s", "--stdout", action="store_true", default=False, help="write to stdout instead of audio device")
+parser.add_option("-j", "--jitter-ms", type="int", default=0, help="jitter buffer target depth in ms (default = 0, disabled)")
  
 (options, args) = parser.parse_args()
 if len(args) != 0:
    parser.print_help()
    sys.exit(1)
 
-audio_handler = socket_audio("0.0.0.0", options.wireshark_port, options.audio_output, options.two_channel, options.audio_gain, options.stdout)
+audio_handler = socket_audio("0.0.0.0", options.wireshark_port, options.audio_output, options.two_channel, options.audio_gain, options.stdout, jitter_ms=options.jitter_ms)
 
 if __name__ == "__main__":
    signal.signal(signal.SIGINT, signal_handler)
@@ -0,0 +1,247 @@
+# Per-call audio recorder
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+
+"""
+Records decoded voice to one wav file per call.
+
+Audio is tapped from the audio server (sockaudio) by udp port, and call
+boundaries come from the trunking module by receiver id; add_stream()
+maps a receiver to the udp port its audio is sent to.  Every entry point
+only appends to a bounded in-memory queue, so the audio and trunking
+threads never wait on the disk.  A writer thread owns all open files.
+When the queue is full, audio is dropped (and counted) but call start
+and end events are always kept so the segmentation stays correct.
+
+Files are written as <dir>/YYYYMMDD/HHMMSS_<sys>_<tgid>_<rid>_<port>-<seq>.wav
+(8 kHz, 16 bit mono), with a .part suffix until the call ends.  The udp
+port and a per-recorder sequence number keep calls that start in the same
+second apart, and existing files are never overwritten.
+"""
+
+import os
+import sys
+import time
+import wave
+import threading
+import collections
+from log_ts import log_ts, vclock
+
+_def_min_secs = 1.0         # calls with less audio than this are discarded
+QUEUE_LIMIT = 2000          # queued audio frames (20ms each) before dropping
+PCM_RATE = 8000
+
+_recorder = None
+
+def configure(directory, min_secs = _def_min_secs, debug = 0):
+    global _recorder
+    if _recorder is not None or directory == "":
+        return None
+    _recorder = call_recorder(directory, min_secs, debug)
+    return _recorder
+
+def add_stream(rx_id, port):
+    if _recorder is not None:
+        _recorder.add_stream(rx_id, port)
+
+def call_start(rx_id, tgid, srcaddr = None, sysname = ""):
+    if _recorder is not None:
+        _recorder.call_start(rx_id, tgid, srcaddr, sysname)
+
+def call_update(rx_id, srcaddr):
+    if _recorder is not None:
+        _recorder.call_update(rx_id, srcaddr)
+
+def call_end(rx_id):
+    if _recorder is not None:
+        _recorder.call_end(rx_id)
+
+def stop():
+    global _recorder
+    if _recorder is None:
+        return
+    _recorder.kill()
+    _recorder = None
+
+# open a new file for writing, failing rather than reusing one that exists
+def _open_excl(path):
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644), 'wb')
+
+class _call(object):
+    def __init__(self, directory, ts, tgid, srcaddr, sysname, port, seq):
+        self.ts = ts
+        self.tgid = tgid
+        self.srcaddr = srcaddr
+        self.sysname = sysname
+        self.samples = 0
+        day = os.path.join(directory, time.strftime("%Y%m%d", time.localtime(ts)))
+        if not os.path.isdir(day):
+            os.makedirs(day)
+        self.path = os.path.join(day, "%s_%s_%s" % (time.strftime("%H%M%S", time.localtime(ts)), sysname.replace(os.sep, "_").replace(" ", "_"), tgid))
+        self.uniq = "%s-%d" % (port, seq)
+        self.part = "%s_%s.wav.part" % (self.path, self.uniq)
+        self.f = _open_excl(self.part)
+        try:
+            self.wav = wave.open(self.f, 'wb')
+            self.wav.setnchannels(1)
+            self.wav.setsampwidth(2)
+            self.wav.setframerate(PCM_RATE)
+        except:
+            self.f.close()
+            os.remove(self.part)
+            raise
+
+    def write(self, data):
+        self.wav.writeframesraw(data)
+        self.samples += len(data) // 2
+
+    def close(self, min_secs):
+        try:
+            self.wav.close()
+        finally:
+            self.f.close()      # wave does not close a file object it was handed
+        if self.samples < min_secs * PCM_RATE:
+            os.remove(self.part)
+            return None
+        base = "%s_%s_%s" % (self.path, self.srcaddr if self.srcaddr else 0, self.uniq)
+        name = "%s.wav" % base
+        n = 1
+        while os.path.exists(name):     # left over from an earlier run; keep both
+            name = "%s.%d.wav" % (base, n)
+            n += 1
+        os.rename(self.part, name)
+        return name
+
+    def discard(self):
+        for close in (self.wav.close, self.f.close):
+            try:
+                close()
+            except (IOError, OSError, wave.Error):
+                pass
+        try:
+            os.remove(self.part)
+        except OSError:
+            pass
+
+class call_recorder(threading.Thread):
+    def __init__(self, directory, min_secs = _def_min_secs, debug = 0):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.directory = directory
+        self.min_secs = min_secs
+        self.debug = debug
+        self.ports = {}             # rx_id -> udp port carrying its audio
+        self.calls = {}             # udp port -> _call (writer thread only)
+        self.q = collections.deque()
+        self.cv = threading.Condition()
+        self.dropped = 0
+        self.seq = 0                # numbers calls so their file names are unique
+        self.keep_running = True
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        sys.stderr.write("%s call recorder: writing to %s\n" % (log_ts.get(), directory))
+        self.start()
+
+    def put(self, item, droppable = False):
+        with self.cv:
+            if droppable and len(self.q) >= QUEUE_LIMIT:
+                self.dropped += 1
+                return
+            self.q.append(item)
+            self.cv.notify()
+
+    def add_stream(self, rx_id, port):
+        self.ports[rx_id] = port
+
+    def call_start(self, rx_id, tgid, srcaddr = None, sysname = ""):
+        if rx_id in self.ports:
+            self.put(('start', self.ports[rx_id], (vclock.time(), tgid, srcaddr, sysname)))
+
+    def call_update(self, rx_id, srcaddr):
+        if rx_id in self.ports:
+            self.put(('update', self.ports[rx_id], srcaddr))
+
+    def call_end(self, rx_id):
+        if rx_id in self.ports:
+            self.put(('end', self.ports[rx_id], None))
+
+    def audio(self, port, data):    # called from the audio thread; data must be an immutable copy
+        self.put(('audio', port, data), droppable = True)
+
+    def end_call(self, port):
+        call = self.calls.pop(port, None)
+        if call is None:
+            return
+        try:
+            name = call.close(self.min_secs)
+        except (IOError, OSError, wave.Error):
+            call.discard()
+            raise
+        if name is not None and self.debug >= 5:
+            sys.stderr.write("%s call recorder: %s (%.1f sec)\n" % (log_ts.get(), name, float(call.samples) / PCM_RATE))
+
+    def fail_call(self, port):      # after a write error: keep the recording if it can still be finalized
+        call = self.calls.pop(port, None)
+        if call is None:
+            return
+        try:
+            call.close(self.min_secs)
+        except (IOError, OSError, wave.Error):
+            call.discard()
+
+    def process(self, op, port, arg):
+        if op == 'audio':
+            if port in self.calls:
+                self.calls[port].write(arg)
+        elif op == 'start':
+            self.end_call(port)
+            ts, tgid, srcaddr, sysname = arg
+            self.seq += 1
+            self.calls[port] = _call(self.directory, ts, tgid, srcaddr, sysname, port, self.seq)
+        elif op == 'update':
+            if port in self.calls and arg:
+                self.calls[port].srcaddr = arg
+        elif op == 'end':
+            self.end_call(port)
+
+    def run(self):
+        while True:
+            with self.cv:
+                while self.keep_running and not self.q:
+                    self.cv.wait()
+                if not self.q:
+                    break
+                items = list(self.q)
+                self.q.clear()
+                dropped, self.dropped = self.dropped, 0
+            for op, port, arg in items:
+                try:
+                    self.process(op, port, arg)
+                except (IOError, OSError, wave.Error) as e:
+                    sys.stderr.write("%s call recorder: %s\n" % (log_ts.get(), e))
+                    self.fail_call(port)
+            if dropped and self.debug >= 1:
+                sys.stderr.write("%s call recorder: writer behind, dropped %d audio frames\n" % (log_ts.get(), dropped))
+        for port in list(self.calls):
+            self.end_call(port)
+
+    def kill(self):
+        with self.cv:
+            self.keep_running = False
+            self.cv.notify()
+        self.join(timeout=2.0)
@@ -0,0 +1,108 @@
+# Per-device polyphase channelizer
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+
+"""
+Polyphase filterbank channelizer shared by all channels of a device.
+
+The device sample stream is split once into evenly spaced, 2x oversampled
+bins.  Each attached channel receives the output of a selector block which
+picks the bin nearest to its tuned frequency; the remaining (residual)
+offset is removed by the channel's own demodulator at the much lower bin
+rate.  Retuning a channel only changes the selected bin and the residual
+mixer frequency.
+"""
+
+import sys
+from gnuradio import gr, filter, blocks
+from gnuradio.fft import window
+from log_ts import log_ts
+
+_def_bin_width = 50000
+_def_oversample = 2
+
+class pfb_channelizer_c(gr.hier_block2):
+    def __init__(self,
+                 input_rate,
+                 bin_width = _def_bin_width,
+                 usable_bw = 1.0,
+                 debug = 0):
+        """
+        Hierarchical block splitting a complex device stream into nbins outputs
+
+        @param input_rate: sample rate of the device
+        @type input_rate: int
+        @param bin_width: requested spacing between adjacent bins (Hz)
+        @type bin_width: int
+        """
+        self.input_rate = input_rate
+        self.usable_bw = usable_bw
+        self.debug = debug
+        self.src_connected = False
+        self.taps = {}          # per-demod [selector, bin index]
+
+        nbins = int(round(float(input_rate) / bin_width))
+        nbins += nbins & 1                      # oversampled pfb requires an even number of bins
+        if nbins < 2:
+            nbins = 2
+        self.nbins = nbins
+        self.bin_width = float(input_rate) / nbins
+        self.output_rate = self.bin_width * _def_oversample
+
+        gr.hier_block2.__init__(self, "pfb_channelizer_c",
+                                gr.io_signature(1, 1, gr.sizeof_gr_complex),                 # Input signature
+                                gr.io_signature(self.nbins, self.nbins, gr.sizeof_gr_complex)) # Output signature
+
+        # passband must cover a full bin plus the half-width of a channel sitting at the bin edge
+        taps = filter.firdes.low_pass(1.0, input_rate, self.bin_width * 0.7, self.bin_width * 0.3, window.WIN_BLACKMAN_HARRIS)
+        self.pfb = filter.pfb.channelizer_ccf(self.nbins, taps, _def_oversample)
+        self.connect(self, self.pfb)
+        for i in range(self.nbins):
+            self.connect((self.pfb, i), (self, i))
+
+        sys.stderr.write("channelizer: input_rate=%d, bins=%d, bin_width=%d, output_rate=%d, taps=%d\n" % (input_rate, self.nbins, self.bin_width, self.output_rate, len(taps)))
+
+    def get_output_rate(self):
+        return self.output_rate
+
+    def connect_channel(self, tb, src, demod):
+        # assumes lock held or init
+        if not self.src_connected:
+            tb.connect(src, self)
+            self.src_connected = True
+        tap = self.taps.setdefault(demod, [None, 0])
+        tap[0] = blocks.selector(gr.sizeof_gr_complex, tap[1], 0)  # selector only accepts index changes once connected
+        for i in range(self.nbins):
+            tb.connect((self, i), (tap[0], i))
+        tb.connect(tap[0], demod)
+
+    def set_relative_frequency(self, demod, freq):
+        # freq follows the p25_demod_cb convention: (device center - channel frequency)
+        if abs(freq) > (((self.input_rate * self.usable_bw) / 2) - (self.bin_width / 2)):
+            return False
+        bin_offset = int(round(-freq / self.bin_width))
+        residual = freq + (bin_offset * self.bin_width)
+        if not demod.set_relative_frequency(residual):
+            return False
+        tap = self.taps.setdefault(demod, [None, 0])
+        tap[1] = bin_offset % self.nbins
+        if tap[0] is not None:
+            tap[0].set_input_index(tap[1])
+        if self.debug >= 9:
+            sys.stderr.write("%s channelizer: relative freq(%d), bin(%d), residual(%d)\n" % (log_ts.get(), freq, tap[1], residual))
+        return True
@@ -0,0 +1,144 @@
+# Structured trunking event journal
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+
+"""
+Append-only journal of trunking events (grants, calls, control channel
+changes, sync loss) for offline statistics, independent of log verbosity.
+
+Callers use the module level log() which only timestamps the event and
+queues it; a dedicated thread serializes records, one compact json object
+per line, into journal files named op25-YYYYMMDD-HHMMSS.jsonl.  A new file
+is started when the current one exceeds its size limit or the day changes,
+so closed files are immutable and can be indexed once (see journal_query.py).
+
+Record fields: t (epoch seconds), ev (event name) and, where applicable,
+sys, rx, tg, rid, freq, slot, dur, reason, algid, keyid.  Fields that are
+None are omitted.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+from log_ts import log_ts, vclock
+
+_def_max_mb = 64            # rotate after this many megabytes
+QUEUE_LIMIT = 10000         # events dropped (and counted) beyond this backlog
+FILE_PREFIX = "op25-"
+FILE_SUFFIX = ".jsonl"
+
+_journal = None
+
+def configure(directory, max_mb = _def_max_mb, debug = 0):
+    global _journal
+    if _journal is not None or directory == "":
+        return
+    _journal = event_journal(directory, max_mb, debug)
+
+def log(ev, **fields):
+    if _journal is None:
+        return
+    fields['t'] = round(vclock.time(), 3)
+    fields['ev'] = ev
+    _journal.put(fields)
+
+def stop():
+    global _journal
+    if _journal is None:
+        return
+    _journal.kill()
+    _journal = None
+
+class event_journal(threading.Thread):
+    def __init__(self, directory, max_mb = _def_max_mb, debug = 0):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.debug = debug
+        self.q = queue.Queue(QUEUE_LIMIT)
+        self.f = None
+        self.f_day = None
+        self.dropped = 0
+        self.keep_running = True
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        sys.stderr.write("%s event journal: writing to %s\n" % (log_ts.get(), directory))
+        self.start()
+
+    def put(self, rec):
+        try:
+            self.q.put_nowait(rec)
+        except queue.Full:
+            self.dropped += 1
+
+    def open_file(self, ts):
+        if self.f is not None:
+            self.f.close()
+        lt = time.localtime(ts)
+        name = os.path.join(self.directory, "%s%s%s" % (FILE_PREFIX, time.strftime("%Y%m%d-%H%M%S", lt), FILE_SUFFIX))
+        self.f = open(name, 'a')
+        self.f_day = lt.tm_yday
+        if self.debug >= 5:
+            sys.stderr.write("%s event journal: opened %s\n" % (log_ts.get(), name))
+
+    def write(self, rec):
+        if self.f is None or self.f.tell() >= self.max_bytes or time.localtime(rec['t']).tm_yday != self.f_day:
+            self.open_file(rec['t'])
+        for k in [k for k in rec if rec[k] is None]:
+            del rec[k]
+        self.f.write(json.dumps(rec, separators=(',', ':')))
+        self.f.write("\n")
+
+    def run(self):
+        while self.keep_running or not self.q.empty():
+            try:
+                rec = self.q.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if rec is None:
+                continue
+            try:
+                self.write(rec)
+                while not self.q.empty():        # drain what has accumulated, then flush once
+                    rec = self.q.get_nowait()
+                    if rec is not None:
+                        self.write(rec)
+                if self.dropped:
+                    self.write({'t': round(vclock.time(), 3), 'ev': 'dropped', 'count': self.dropped})
+                    self.dropped = 0
+                self.f.flush()
+            except (IOError, OSError, queue.Empty) as e:
+                sys.stderr.write("%s event journal: write error: %s\n" % (log_ts.get(), e))
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def kill(self):
+        self.keep_running = False
+        try:
+            self.q.put_nowait(None)         # wake the writer
+        except queue.Full:
+            pass
+        self.join(timeout=2.0)
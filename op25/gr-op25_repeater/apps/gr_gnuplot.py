@@ -42,8 +42,13 @@ FFT_AVG  = 0.05
 MIX_AVG  = 0.10
 BAL_AVG  = 0.05
 FFT_BINS = 512    # number of fft bins
+MAX_BINS = 256    # default number of spectrum points plotted
 FFT_FREQ = 0.05   # time interval between fft updates
 MIX_FREQ = 0.02   # time interval between mixer updates
+PLOT_FREQ = 0.1   # minimum time interval between eye, constellation and symbol updates
+
+FRAME_INTERVALS = { 'fft': FFT_FREQ, 'mixer': MIX_FREQ, 'fll': MIX_FREQ, 'eye': PLOT_FREQ, 'constellation': PLOT_FREQ, 'symbol': PLOT_FREQ }
+AVERAGED_MODES = ('fft', 'mixer', 'fll')
 
 class wrap_gp(object):
     def __init__(self, sps=_def_sps, plot_name="", chan = 0, out_q = None):
@@ -56,8 +61,13 @@ class wrap_gp(object):
         self.freqs = ()
         self.avg_pwr = np.zeros(FFT_BINS)
         self.min_y = -100.0
-        self.buf = []
-        self.plot_count = 0
+        self.buf = None         # preallocated frame buffer, filled across work() calls
+        self.fill = 0
+        self.next_due = 0
+        self.frame_interval = None
+        self.max_bins = MAX_BINS
+        self.window = None
+        self.freq_params = None
         self.last_plot = 0
         self.plot_interval = None
         self.sequence = 0
@@ -65,13 +75,13 @@ class wrap_gp(object):
         self.filename = None
         self.chan = chan
         self.out_q = out_q
+        self.client_render = False
+        self.gp = None
         if plot_name == "":
             self.plot_name = ""
         else:
             self.plot_name = plot_name + " "
 
-        self.attach_gp()
-
     def attach_gp(self):
         args = ""
         exe  = GNUPLOT
@@ -81,13 +91,15 @@ class wrap_gp(object):
         self.sps = int(sps)
 
     def kill(self):
+        if self.out_q is not None:
+            self.out_q.flush()
+        self.out_q = None
+        if self.gp is None:             # gnuplot is only started on demand
+            return
         try:
             self.gp.stdin.close()   # closing pipe should cause subprocess to exit
         except IOError:
             pass
-        if self.out_q is not None:
-            self.out_q.flush()
-        self.out_q = None
         sleep_count = 0
         while True:                     # wait politely, but only for so long
             self.gp.poll()
@@ -104,82 +116,78 @@ class wrap_gp(object):
     def set_output_dir(self, v):
         self.output_dir = v
 
+    def set_frame_rate(self, fps):
+        # upper limit on frames processed per second; None or 0 restores the per-mode default
+        self.frame_interval = 1.0 / fps if fps else None
+
+    def set_max_bins(self, n):
+        # fft bins are max-decimated down to at most n points before plotting
+        self.max_bins = max(int(n), 1) if n else MAX_BINS
+
+    def get_frame_interval(self, mode):
+        interval = self.frame_interval if self.frame_interval is not None else FRAME_INTERVALS[mode]
+        if mode not in AVERAGED_MODES and self.plot_interval:
+            interval = max(interval, self.plot_interval)    # frames that would never be shown are not collected
+        return interval
+
+    def set_client_render(self, v, out_q = None):
+        # plots are drawn by the http terminal from the json frames instead of gnuplot
+        self.client_render = v
+        if out_q is not None:
+            self.out_q = out_q
+
     def plot(self, buf, bufsz, mode='eye'):
         BUFSZ = bufsz
-        consumed = min(len(buf), BUFSZ-len(self.buf))
-        if len(self.buf) < BUFSZ:
-            self.buf = np.concatenate((self.buf, buf[:int(consumed)]))
-        if len(self.buf) < BUFSZ:
-            return consumed
-
-        self.plot_count += 1
-        if mode == 'eye' and self.plot_count % 20 != 0:
-            self.buf = np.array([])
+        if self.fill == 0:
+            now = time.time()
+            if now < self.next_due:             # rate limited: input is dropped without copying
+                return len(buf)
+            self.next_due = now + self.get_frame_interval(mode)
+        # samples are held as float64/complex128 so the rounded values print as short decimals
+        dtype = np.complex128 if np.iscomplexobj(buf) else np.float64
+        if self.buf is None or len(self.buf) != BUFSZ or self.buf.dtype != dtype:
+            self.buf = np.empty(BUFSZ, dtype=dtype)
+            self.fill = 0
+        consumed = min(len(buf), BUFSZ - self.fill)
+        self.buf[self.fill:self.fill + consumed] = buf[:consumed]
+        self.fill += consumed
+        if self.fill < BUFSZ:
             return consumed
-
-        plot_data = { "json_type": "plot", "chan": self.chan, "mode": mode, "data": [] }
-        plots = []
-        s = ''
-        while(len(self.buf)):
-            if mode == 'eye':
-                if len(self.buf) < self.sps:
-                    break
-                for i in range(self.sps):
-                    s += '%f\n' % self.buf[i]
-                    plot_data['data'].append( (i, self.buf[i]) )
-                s += 'e\n'
-                self.buf=self.buf[self.sps:]
-                plots.append('"-" with lines')
-            elif mode == 'constellation':
-                for b in self.buf:
-                    s += '%f\t%f\n' % (b.real, b.imag)
-                    plot_data['data'].append( (b.real, b.imag) )
-                s += 'e\n'
-                self.buf = []
-                plots.append('"-" with points')
-            elif mode == 'symbol':
-                idx = 0
-                for b in self.buf:
-                    s += '%f\n' % (b)
-                    plot_data['data'].append( (idx, b) )
-                    idx += 1
-                s += 'e\n'
-                self.buf = []
-                plots.append('"-" with points')
-            elif mode == 'fft' or mode == 'mixer' or mode == 'fll':
-                sum_pwr = 0.0
-                self.ffts = np.fft.fft((self.buf * np.blackman(BUFSZ)), BUFSZ , 0) / (0.42 * BUFSZ)
-                self.ffts = np.fft.fftshift(self.ffts)
-                self.freqs = np.fft.fftfreq(len(self.ffts))
-                self.freqs = np.fft.fftshift(self.freqs)
-                tune_freq = (self.center_freq - self.relative_freq) / 1e6
-                if self.center_freq and self.width:
-                                    self.freqs = ((self.freqs * self.width) + self.center_freq + self.offset_freq) / 1e6
-                elif self.width:
-                                    self.freqs = (self.freqs * self.width)
-                for i in range(len(self.ffts)):
-                    if mode == 'fft':
-                        self.avg_pwr[i] = ((1.0 - FFT_AVG) * self.avg_pwr[i]) + (FFT_AVG * np.abs(self.ffts[i]))
-                    else:
-                        self.avg_pwr[i] = ((1.0 - MIX_AVG) * self.avg_pwr[i]) + (MIX_AVG * np.abs(self.ffts[i]))
-                    if self.avg_pwr[i] == 0: # guard against divide by zero
-                        break
-                    y_val = 20 * np.log10(self.avg_pwr[i])
-                    s += '%f\t%f\n' % (self.freqs[i], y_val)
-                    plot_data['data'].append( (self.freqs[i], y_val) )
-                    if ((mode == 'mixer') or (mode == 'fll')) and (self.avg_pwr[i] > 1e-5):
-                        if (self.freqs[i] - self.center_freq) < 0:
-                            sum_pwr -= self.avg_pwr[i]
-                        elif (self.freqs[i] - self.center_freq) > 0:
-                            sum_pwr += self.avg_pwr[i]
-                s += 'e\n'
-                self.buf = []
-                plots.append('"-" with lines')
-                if min(self.avg_pwr) == 0: # plot is broken, probably because source device was missing
-                    return consumed
-                min_y = 20 * np.log10(min(self.avg_pwr))
-                self.min_y = ((1.0 - Y_AVG) * self.min_y) + (Y_AVG * min_y) 
-        self.buf = []
+        self.fill = 0
+
+        # sample data is kept in numpy arrays; it is only formatted as text when
+        # a gnuplot window is actually being fed
+        plot_data = { "json_type": "plot", "chan": self.chan, "mode": mode }
+        if mode == 'eye':
+            n_traces = BUFSZ // self.sps
+            ys = np.reshape(self.buf[:n_traces * self.sps], (n_traces, self.sps))
+            plot_data['sps'] = self.sps
+            plot_data['y'] = np.round(ys, 3).ravel().tolist()
+        elif mode == 'constellation':
+            xs = np.real(self.buf)
+            ys = np.imag(self.buf)
+            plot_data['x'] = np.round(xs, 3).tolist()
+            plot_data['y'] = np.round(ys, 3).tolist()
+        elif mode == 'symbol':
+            ys = np.real(self.buf)
+            plot_data['y'] = np.round(ys, 3).tolist()
+        elif mode in AVERAGED_MODES:
+            if self.window is None or len(self.window) != BUFSZ:
+                self.window = np.blackman(BUFSZ) / (0.42 * BUFSZ)
+            self.ffts = np.fft.fftshift(np.fft.fft(self.buf * self.window, BUFSZ, 0))
+            self.update_freqs(BUFSZ)
+            avg = FFT_AVG if mode == 'fft' else MIX_AVG
+            self.avg_pwr *= (1.0 - avg)
+            self.avg_pwr += avg * np.abs(self.ffts)
+            min_pwr = self.avg_pwr.min()
+            if min_pwr == 0: # plot is broken, probably because source device was missing
+                return consumed
+            self.min_y = ((1.0 - Y_AVG) * self.min_y) + (Y_AVG * 20 * np.log10(min_pwr))
+            if self.plot_interval and self.last_plot + self.plot_interval > time.time():
+                return consumed         # averages are maintained; nothing to draw yet
+            xs, ys = self.decimate_bins(self.freqs, self.avg_pwr)
+            ys = 20 * np.log10(ys)
+            plot_data['y'] = np.round(ys, 1).tolist()
 
         # FFT processing needs to be completed to maintain the weighted average buckets
         # regardless of whether we actually produce a new plot or not.
@@ -188,7 +196,7 @@ class wrap_gp(object):
         self.last_plot = time.time()
 
         filename = None
-        if self.output_dir:
+        if self.output_dir and not self.client_render:
             if self.sequence >= 2:
                 delete_pathname = '%s/plot-%d-%s-%d.png' % (self.output_dir, self.chan, mode, self.sequence-2)
                 if os.access(delete_pathname, os.W_OK):
@@ -216,24 +224,24 @@ class wrap_gp(object):
             h+= background
             h+= 'set yrange [-4:4]\n'
             h+= 'set title "%sDatascope"\n' % self.plot_name
-            plot_data['xrange'] = (0,len(plot_data['data']))
+            plot_data['xrange'] = (0,self.sps-1)
             plot_data['yrange'] = (-4,4)
             plot_data['title'] = "%sDatascope" % self.plot_name
         elif mode == 'symbol':
             h+= background
             h+= 'set yrange [-4:4]\n'
             h+= 'set title "%sSymbol"\n' % self.plot_name
-            plot_data['xrange'] = (0,len(plot_data['data']))
+            plot_data['xrange'] = (0,len(ys))
             plot_data['yrange'] = (-4,4)
             plot_data['title'] = "%sSymbol" % self.plot_name
         elif mode == 'fft' or mode == 'mixer' or mode =='fll':
             h+= 'unset arrow; unset title\n'
-            h+= 'set xrange [%f:%f]\n' % (self.freqs[0], self.freqs[len(self.freqs)-1])
+            h+= 'set xrange [%f:%f]\n' % (xs[0], xs[-1])
             h+= 'set xlabel "Frequency"\n'
             h+= 'set ylabel "Power(dB)"\n'
             h+= 'set grid\n'
             h+= 'set yrange [%d:0]\n' % ((self.min_y // 20) * 20)
-            plot_data['xrange'] = (self.freqs[0], self.freqs[len(self.freqs)-1])
+            plot_data['xrange'] = (xs[0], xs[-1])
             plot_data['yrange'] = (((self.min_y // 20) * 20), 0)
             if mode == 'mixer':
                 h+= 'set title "%sRaw Mixer\n' % self.plot_name
@@ -247,27 +255,68 @@ class wrap_gp(object):
                     h+= 'set arrow from %f, graph 0 to %f, graph 1 nohead\n' % (arrow_pos, arrow_pos)
                     h+= 'set title "%sSpectrum: tuned to %f Mhz"\n' % (self.plot_name, arrow_pos)
                     plot_data['title'] = "%sSpectrum: tuned to %f Mhz" % (self.plot_name, arrow_pos)
+                    plot_data['marker'] = arrow_pos
                 else:
                     h+= 'set title "%sSpectrum"\n' % self.plot_name
                     plot_data['title'] = "%sSpectrum" % self.plot_name
+
+        if not self.client_render:
+            self.gnuplot_write(h, mode, xs if mode in ('constellation', 'fft', 'mixer', 'fll') else None, ys)
+        if filename:
+            self.filename = filename
+
+        if self.out_q is not None and not self.out_q.full_p():      # if configured, send plot data to UI
+            msg = gr.message().make_from_string(json.dumps(plot_data, separators=(',', ':')), -4, 0, 0)
+            if not self.out_q.full_p():
+                self.out_q.insert_tail(msg)
+
+        return consumed
+
+    def update_freqs(self, n):
+        # bin frequencies only change on retune, so they are computed once per setting
+        params = (n, self.center_freq, self.offset_freq, self.width)
+        if params == self.freq_params:
+            return
+        self.freq_params = params
+        self.freqs = np.fft.fftshift(np.fft.fftfreq(n))
+        if self.center_freq and self.width:
+            self.freqs = ((self.freqs * self.width) + self.center_freq + self.offset_freq) / 1e6
+        elif self.width:
+            self.freqs = (self.freqs * self.width)
+        if len(self.avg_pwr) != n:
+            self.avg_pwr = np.zeros(n)
+
+    def decimate_bins(self, xs, ys):
+        # peak-hold decimation so narrow carriers stay visible
+        d = -(-len(ys) // self.max_bins)
+        if d <= 1:
+            return xs, ys
+        m = len(ys) // d
+        return xs[:m*d].reshape(m, d).mean(axis=1), ys[:m*d].reshape(m, d).max(axis=1)
+
+    def gnuplot_write(self, h, mode, xs, ys):
+        if mode == 'eye':
+            plots = ['"-" with lines'] * len(ys)
+            s = ''.join(['\n'.join(['%f' % y for y in trace]) + '\ne\n' for trace in ys])
+        else:
+            style = '"-" with points' if mode in ('constellation', 'symbol') else '"-" with lines'
+            plots = [style]
+            if xs is None:
+                s = '\n'.join(['%f' % y for y in ys])
+            else:
+                s = '\n'.join(['%f\t%f' % xy for xy in zip(xs, ys)])
+            s += '\ne\n'
         dat = '%splot %s\n%s' % (h, ','.join(plots), s)
         if sys.version[0] != '2':
             dat = bytes(dat, 'utf8')
+        if self.gp is None:
+            self.attach_gp()
         self.gp.poll()
         if self.gp.returncode is None:  # make sure gnuplot is still running 
             try:
                 self.gp.stdin.write(dat)
             except (IOError, ValueError):
                 pass
-        if filename:
-            self.filename = filename
-
-        if self.out_q is not None and not self.out_q.full_p():      # if configured, send raw plot data to UI
-            msg = gr.message().make_from_string(json.dumps(plot_data), -4, 0, 0)
-            if not self.out_q.full_p():
-                self.out_q.insert_tail(msg)
-
-        return consumed
 
     def set_center_freq(self, f):
         self.center_freq = f
@@ -334,13 +383,10 @@ class fft_sink_c(gr.sync_block):
             out_sig=None)
         self.debug = debug
         self.gnuplot = wrap_gp(plot_name=plot_name, chan=chan, out_q=out_q)
-        self.next_due = time.time()
 
     def work(self, input_items, output_items):
-        if time.time() > self.next_due:
-            self.next_due = time.time() + FFT_FREQ
-            in0 = input_items[0]
-            self.gnuplot.plot(in0, FFT_BINS, mode='fft')
+        in0 = input_items[0]
+        self.gnuplot.plot(in0, FFT_BINS, mode='fft')
         return len(input_items[0])
 
     def kill(self):
@@ -369,13 +415,10 @@ class mixer_sink_c(gr.sync_block):
             out_sig=None)
         self.debug = debug
         self.gnuplot = wrap_gp(plot_name=plot_name, chan=chan, out_q=out_q)
-        self.next_due = time.time()
 
     def work(self, input_items, output_items):
-        if time.time() > self.next_due:
-            self.next_due = time.time() + MIX_FREQ
-            in0 = input_items[0]
-            self.gnuplot.plot(in0, FFT_BINS, mode='mixer')
+        in0 = input_items[0]
+        self.gnuplot.plot(in0, FFT_BINS, mode='mixer')
         return len(input_items[0])
 
     def kill(self):
@@ -394,13 +437,10 @@ class fll_sink_c(gr.sync_block):
             out_sig=None)
         self.debug = debug
         self.gnuplot = wrap_gp(plot_name=plot_name, chan=chan, out_q=out_q)
-        self.next_due = time.time()
 
     def work(self, input_items, output_items):
-        if time.time() > self.next_due:
-            self.next_due = time.time() + MIX_FREQ
-            in0 = input_items[0]
-            self.gnuplot.plot(in0, FFT_BINS, mode='fll')
+        in0 = input_items[0]
+        self.gnuplot.plot(in0, FFT_BINS, mode='fll')
         return len(input_items[0])
 
     def kill(self):
@@ -23,6 +23,7 @@
 import sys
 import json
 import ast
+import bisect
 from log_ts import log_ts
 
 #################
@@ -76,8 +77,124 @@ def get_key_dict(keys_file, _id = 0):      # used to read crypt keys files
             keys_config[keyid]['key'].append(int(ast.literal_eval(str(kval))))
     return keys_config
 
+class id_list(object):
+    # Set of integer ids (tgid, rid) stored as sorted, non-overlapping [lo, hi] ranges,
+    # each carrying a value (e.g. an expiry time, or None for permanent).  Membership
+    # is a binary search over the ranges, so wide ranges cost no more than single ids.
+    # Supports the subset of the dict interface used by the trunking modules.
+    def __init__(self):
+        self.lo = []
+        self.hi = []
+        self.val = []
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+    __nonzero__ = __bool__
+
+    def find(self, x):     # index of range holding x, or -1
+        i = bisect.bisect_right(self.lo, x) - 1
+        if i >= 0 and x <= self.hi[i]:
+            return i
+        return -1
+
+    def __contains__(self, x):
+        return self.find(x) >= 0
+
+    def __getitem__(self, x):
+        i = self.find(x)
+        if i < 0:
+            raise KeyError(x)
+        return self.val[i]
+
+    def __setitem__(self, x, value):
+        self.add(x, x, value)
+
+    def __iter__(self):
+        for lo, hi in zip(self.lo, self.hi):
+            for x in range(lo, hi + 1):
+                yield x
+
+    def keys(self):
+        return list(iter(self))
+
+    def get(self, x, default=None):
+        i = self.find(x)
+        return self.val[i] if i >= 0 else default
+
+    def pop(self, x, *default):
+        i = self.find(x)
+        if i < 0:
+            if default:
+                return default[0]
+            raise KeyError(x)
+        value = self.val[i]
+        self.remove(x)
+        return value
+
+    def ranges(self):
+        return list(zip(self.lo, self.hi, self.val))
+
+    def add(self, lo, hi=None, value=None):
+        lo = int(lo)
+        hi = lo if hi is None else int(hi)
+        if hi < lo:
+            return
+        self.remove(lo, hi)
+        i = bisect.bisect_left(self.lo, lo)
+        if i > 0 and self.hi[i-1] == lo - 1 and self.val[i-1] == value:          # extend left neighbour
+            i -= 1
+            lo = self.lo[i]
+            self.count -= self.hi[i] - self.lo[i] + 1
+            self.delete(i)
+        if i < len(self.lo) and self.lo[i] == hi + 1 and self.val[i] == value:    # absorb right neighbour
+            hi = self.hi[i]
+            self.count -= self.hi[i] - self.lo[i] + 1
+            self.delete(i)
+        self.lo.insert(i, lo)
+        self.hi.insert(i, hi)
+        self.val.insert(i, value)
+        self.count += hi - lo + 1
+
+    def remove(self, lo, hi=None):
+        lo = int(lo)
+        hi = lo if hi is None else int(hi)
+        i = max(bisect.bisect_right(self.lo, lo) - 1, 0)
+        while i < len(self.lo) and self.lo[i] <= hi:
+            r_lo, r_hi, r_val = self.lo[i], self.hi[i], self.val[i]
+            if r_hi < lo:
+                i += 1
+                continue
+            self.count -= min(r_hi, hi) - max(r_lo, lo) + 1
+            self.delete(i)
+            if r_hi > hi:                           # keep the part above the removed span
+                self.lo.insert(i, hi + 1)
+                self.hi.insert(i, r_hi)
+                self.val.insert(i, r_val)
+            if r_lo < lo:                           # keep the part below the removed span
+                self.lo.insert(i, r_lo)
+                self.hi.insert(i, lo - 1)
+                self.val.insert(i, r_val)
+                i += 1
+            if r_hi > hi:
+                break
+
+    def delete(self, i):
+        del self.lo[i]
+        del self.hi[i]
+        del self.val[i]
+
+    def expire(self, curr_time):   # drop ranges whose (non-None) value is earlier than curr_time
+        expired = [(lo, hi) for lo, hi, val in self.ranges() if val is not None and val < curr_time]
+        for lo, hi in expired:
+            self.remove(lo, hi)
+        return expired
+
 def get_int_dict(s, _id = 0):      # used to read blacklist/whitelist files
-    d = {}
+    d = id_list()
     try:
         with open(s,"r") as f:
             for v in f:
@@ -88,10 +205,11 @@ def get_int_dict(s, _id = 0):      # used to read blacklist/whitelist files
                     if (len(v) > 1) and (int(v[1]) > v0):  # second parameter if present is end of tgid range
                         v1 = int(v[1])
 
-                    for tg in range(v0, (v1 + 1)):
-                            if tg not in d:      # is this a new tg?
-                                    d[tg] = []   # if so, add to dict (key only, value null)
-                                    sys.stderr.write('%s [%s] added talkgroup %d from %s\n' % (log_ts.get(), _id, tg,s))
+                    d.add(v0, v1)
+                    if v1 > v0:
+                        sys.stderr.write('%s [%s] added talkgroups %d-%d from %s\n' % (log_ts.get(), _id, v0, v1, s))
+                    else:
+                        sys.stderr.write('%s [%s] added talkgroup %d from %s\n' % (log_ts.get(), _id, v0, s))
 
                 except (IndexError, ValueError) as ex:
                     continue
@@ -99,7 +217,7 @@ def get_int_dict(s, _id = 0):      # used to read blacklist/whitelist files
     except (IOError) as ex:
         sys.stderr.write("%s: %s\n" % (ex.strerror, s))
 
-    return dict.fromkeys(d)
+    return d
 
 def from_dict(d, key, def_val):
     if key in d and d[key] != "":
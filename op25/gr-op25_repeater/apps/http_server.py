@@ -25,6 +25,14 @@ import json
 import socket
 import traceback
 import threading
+import collections
+import gzip
+import email.utils
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 from gnuradio import gr
 from waitress.server import create_server
@@ -35,12 +43,93 @@ my_input_q = None
 my_output_q = None
 my_recv_q = None
 my_port = None
+my_recv_cv = threading.Condition()
+my_recv_seq = 0
+my_streams = None
+
+POST_WAIT = 0.2             # max time a polling request waits for its reply (sec)
+POST_SETTLE = 0.02          # extra wait for the rest of a multi-message reply (sec)
+STREAM_INTERVAL = 0.25      # update request interval while stream clients are connected (sec)
+STREAM_KEEPALIVE = 5.0      # idle time before a keepalive comment is sent (sec)
+STREAM_QLIMIT = 16          # max distinct pending updates per stream client
+MAX_STREAM_CLIENTS = 8      # concurrent /stream connections (each holds a server thread)
+HTTP_THREADS = MAX_STREAM_CLIENTS + 4
+ASSET_CACHE_SIZE = 64       # max number of static files held in memory
+COMPRESS_TYPES = 'css js html ico'.split()
 
 """
 fake http and ajax server module
 TODO: make less fake
 """
 
+class static_asset(object):
+    # one file as loaded from disk, with its precomputed encodings and validators
+    def __init__(self, pathname, content_type, compress):
+        st = os.stat(pathname)
+        with open(pathname, 'rb') as f:
+            data = f.read()
+        self.content_type = content_type
+        self.stamp = (st.st_mtime, st.st_size)
+        self.last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+        self.mtime = int(st.st_mtime)
+        etag = '%x-%x' % (int(st.st_mtime * 1000000), st.st_size)
+        self.variants = {None: (data, '"%s"' % etag)}
+        if not compress:
+            return
+        gz = gzip.compress(data, 9)
+        if len(gz) < len(data):
+            self.variants['gzip'] = (gz, '"%s-gz"' % etag)
+        if brotli is not None:
+            br = brotli.compress(data)
+            if len(br) < len(data):
+                self.variants['br'] = (br, '"%s-br"' % etag)
+
+    def select(self, accept_encoding):
+        accepted = [e.split(';')[0].strip() for e in accept_encoding.split(',')]
+        for encoding in ['br', 'gzip']:
+            if encoding in self.variants and encoding in accepted:
+                return encoding
+        return None
+
+class asset_cache(object):
+    # Keeps static files in memory.  A stat() per request detects changed files;
+    # the file itself is only read again when its mtime or size changes.
+    def __init__(self, limit = ASSET_CACHE_SIZE):
+        self.limit = limit
+        self.assets = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, pathname, content_type, compress):
+        st = os.stat(pathname)
+        with self.lock:
+            asset = self.assets.get(pathname)
+            if asset is not None and asset.stamp == (st.st_mtime, st.st_size):
+                self.assets.move_to_end(pathname)
+                return asset
+        asset = static_asset(pathname, content_type, compress)
+        with self.lock:
+            self.assets[pathname] = asset
+            self.assets.move_to_end(pathname)
+            while len(self.assets) > self.limit:
+                self.assets.popitem(last=False)
+        return asset
+
+my_assets = asset_cache()
+
+def not_modified(environ, asset, etag):
+    if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(',')]
+        return '*' in tags or etag in tags or ('W/' + etag) in tags
+    if_modified_since = environ.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since is not None:
+        try:
+            since = email.utils.mktime_tz(email.utils.parsedate_tz(if_modified_since))
+        except (TypeError, ValueError, OverflowError):
+            return False
+        return asset.mtime <= since
+    return False
+
 def static_file(environ, start_response):
     content_types = { 'png': 'image/png', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg', 'gif': 'image/gif', 'css': 'text/css', 'js': 'application/javascript', 'html': 'text/html', 'ico' : 'image/x-icon'}
     img_types = 'png jpg jpeg gif'.split()
@@ -53,20 +142,48 @@ def static_file(environ, start_response):
     if suf in img_types:
         pathname = '../www/images'
     pathname = '%s/%s' % (pathname, filename)
-    if suf not in list(content_types.keys()) or '..' in filename or not os.access(pathname, os.R_OK):
+    headers = []
+    asset = None
+    if suf in list(content_types.keys()) and '..' not in filename and os.access(pathname, os.R_OK):
+        try:
+            asset = my_assets.get(pathname, content_types[suf], suf in COMPRESS_TYPES)
+        except (IOError, OSError):      # removed since the access check (e.g. rotated plot images)
+            asset = None
+    if asset is None:
         sys.stderr.write('404 %s\n' % pathname)
         status = '404 NOT FOUND'
         content_type = 'text/plain'
         output = status
-    else:
-        output = open(pathname, 'rb').read()
-        content_type = content_types[suf]
-        status = '200 OK'
-    return status, content_type, output
+        return status, content_type, output, headers
+
+    encoding = asset.select(environ.get('HTTP_ACCEPT_ENCODING', ''))
+    output, etag = asset.variants[encoding]
+    content_type = asset.content_type
+    headers.append(('ETag', etag))
+    headers.append(('Last-Modified', asset.last_modified))
+    headers.append(('Cache-Control', 'no-cache'))      # always revalidate; usually a 304
+    if len(asset.variants) > 1:
+        headers.append(('Vary', 'Accept-Encoding'))
+    if not_modified(environ, asset, etag):
+        return '304 NOT MODIFIED', content_type, b'', headers
+    if encoding is not None:
+        headers.append(('Content-Encoding', encoding))
+    status = '200 OK'
+    return status, content_type, output, headers
+
+def wait_reply(seq):
+    # wait until replies arrive after seq, returning shortly after they stop
+    timeout = POST_WAIT
+    with my_recv_cv:
+        while my_recv_cv.wait_for(lambda: my_recv_seq != seq, timeout):
+            seq = my_recv_seq
+            timeout = POST_SETTLE
 
 def post_req(environ, start_response, postdata):
     global my_input_q, my_output_q, my_recv_q, my_port
     valid_req = False
+    streaming = environ.get('QUERY_STRING') == 'stream'
+    seq = my_recv_seq
     try:
         data = json.loads(postdata)
         for d in data:
@@ -74,14 +191,17 @@ def post_req(environ, start_response, postdata):
             if not my_output_q.full_p():
                 my_output_q.insert_tail(msg)
         valid_req = True
-        time.sleep(0.2)
+        if streaming:                   # replies are pushed over the client's /stream
+            valid_req = False
+        else:
+            wait_reply(seq)
     except:
         sys.stderr.write('post_req: error processing input: %s\n%s\n' % (postdata, traceback.format_exc()))
 
     resp_msg = []
-    while not my_recv_q.empty_p():
-        msg = my_recv_q.delete_head()
-        if msg.type() == -4:
+    while valid_req and not my_recv_q.empty_p():
+        msg = my_recv_q.delete_head_nowait()
+        if msg is not None and msg.type() == -4:
             resp_msg.append(json.loads(msg.to_string()))
     if not valid_req:
         resp_msg = []
@@ -90,9 +210,36 @@ def post_req(environ, start_response, postdata):
     output = json.dumps(resp_msg)
     return status, content_type, output
 
+def stream_req(environ, start_response):
+    client = my_streams.subscribe()
+    if client is None:
+        sys.stderr.write('stream_req: too many stream clients\n')
+        start_response('503 SERVICE UNAVAILABLE', [('Content-type', 'text/plain'), ('Content-Length', '0')])
+        return [b'']
+    start_response('200 OK', [('Content-type', 'text/event-stream'),
+                              ('Cache-Control', 'no-cache'),
+                              ('X-Accel-Buffering', 'no')])
+    return stream_events(client)
+
+def stream_events(client):
+    # Server-Sent Events: each event carries a json list of updates, like a POST reply
+    try:
+        yield b'retry: 2000\n\n'
+        while client.active:
+            updates = client.get(STREAM_KEEPALIVE)
+            if updates:
+                yield b'data: [' + b','.join(updates) + b']\n\n'
+            elif client.active:
+                yield b': keepalive\n\n'
+    finally:
+        my_streams.unsubscribe(client)
+
 def http_request(environ, start_response):
+    if environ['REQUEST_METHOD'] == 'GET' and environ['PATH_INFO'] == '/stream':
+        return stream_req(environ, start_response)
+    headers = []
     if environ['REQUEST_METHOD'] == 'GET':
-        status, content_type, output = static_file(environ, start_response)
+        status, content_type, output, headers = static_file(environ, start_response)
     elif environ['REQUEST_METHOD'] == 'POST':
         postdata = environ['wsgi.input'].read()
         status, content_type, output = post_req(environ, start_response, postdata)
@@ -102,14 +249,14 @@ def http_request(environ, start_response):
         output = status
         sys.stderr.write('http_request: unexpected input %s\n' % environ['PATH_INFO'])
     
-    response_headers = [('Content-type', content_type),
-                        ('Content-Length', str(len(output)))]
-    start_response(status, response_headers)
-
     if sys.version[0] > '2':
         if type(output) is str:
             output = output.encode()
 
+    response_headers = [('Content-type', content_type),
+                        ('Content-Length', str(len(output)))] + headers
+    start_response(status, response_headers)
+
     return [output]
 
 def application(environ, start_response):
@@ -123,16 +270,115 @@ def application(environ, start_response):
     return result
 
 def process_qmsg(msg):
-    if my_recv_q.full_p():
-        my_recv_q.delete_head_nowait()   # ignores result
-    if my_recv_q.full_p():
-        return
-    if not my_recv_q.full_p():
-        my_recv_q.insert_tail(msg)
+    global my_recv_seq
+    if msg.type() == -4:
+        my_streams.publish(msg.to_string())
+    with my_recv_cv:
+        if my_recv_q.full_p():
+            my_recv_q.delete_head_nowait()   # ignores result
+        if not my_recv_q.full_p():
+            my_recv_q.insert_tail(msg)
+        my_recv_seq += 1
+        my_recv_cv.notify_all()
+
+class stream_client(object):
+    # Bounded per-client queue of pending updates.  An update supersedes any
+    # pending update with the same key, so a slow client only ever receives
+    # the latest state of each kind rather than a growing backlog.
+    def __init__(self, qlimit = STREAM_QLIMIT):
+        self.qlimit = qlimit
+        self.pending = collections.OrderedDict()
+        self.cv = threading.Condition()
+        self.active = True
+        self.coalesced = 0
+        self.dropped = 0
+
+    def put(self, key, payload):
+        with self.cv:
+            if key in self.pending:
+                self.coalesced += 1
+            elif len(self.pending) >= self.qlimit:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+            self.pending[key] = payload
+            self.cv.notify()
+
+    def get(self, timeout):
+        with self.cv:
+            self.cv.wait_for(lambda: self.pending or not self.active, timeout)
+            updates = list(self.pending.values())
+            self.pending.clear()
+        return updates
+
+    def close(self):
+        with self.cv:
+            self.active = False
+            self.cv.notify()
+
+class stream_hub(object):
+    # Fans updates out to all stream clients and remembers the latest update of
+    # each kind so a new client starts with a complete display.
+    def __init__(self, max_clients = MAX_STREAM_CLIENTS):
+        self.max_clients = max_clients
+        self.clients = []
+        self.latest = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.seq = 0
+
+    def count(self):
+        return len(self.clients)
+
+    def subscribe(self):
+        client = stream_client()
+        with self.lock:
+            if len(self.clients) >= self.max_clients:
+                return None
+            self.clients.append(client)
+            for key in self.latest:
+                client.put(key, self.latest[key])
+        return client
+
+    def unsubscribe(self, client):
+        client.close()
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def close(self):
+        with self.lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            client.close()
+
+    def update_key(self, js):
+        try:
+            d = json.loads(js)
+        except ValueError:
+            return None
+        if type(d) is not dict or 'json_type' not in d:
+            return None
+        if d['json_type'] == 'plot':
+            return 'plot-%s-%s' % (d.get('chan'), d.get('mode'))
+        return d['json_type']
+
+    def publish(self, js):
+        if type(js) is not bytes:
+            js = js.encode()
+        key = self.update_key(js)
+        with self.lock:
+            if key is None:             # unkeyed updates are never coalesced
+                self.seq += 1
+                key = self.seq
+            elif self.latest.get(key) == js:
+                return                  # unchanged since last published
+            else:
+                self.latest[key] = js
+            for client in self.clients:
+                client.put(key, js)
 
 class http_server(object):
     def __init__(self, input_q, output_q, endpoint, **kwds):
-        global my_input_q, my_output_q, my_recv_q, my_port
+        global my_input_q, my_output_q, my_recv_q, my_port, my_streams
         host, port = endpoint.split(':')
         if my_port is not None:
             raise AssertionError('this server is already active on port %s' % my_port)
@@ -141,10 +387,12 @@ class http_server(object):
         my_port = int(port)
 
         my_recv_q = gr.msg_queue(10)
+        my_streams = stream_hub()
         self.q_watcher = queue_watcher(my_input_q, process_qmsg)
+        self.pump = update_pump(my_output_q)
 
         try:
-            self.server = create_server(application, host=host, port=my_port)
+            self.server = create_server(application, host=host, port=my_port, threads=HTTP_THREADS)
         except:
             sys.stderr.write('Failed to create http terminal server\n%s\n' % traceback.format_exc())
             sys.exit(1)
@@ -152,6 +400,25 @@ class http_server(object):
     def run(self):
         self.server.run()
 
+class update_pump(threading.Thread):
+    # requests status updates on behalf of all connected stream clients
+    def __init__(self, msgq, interval = STREAM_INTERVAL, **kwds):
+        threading.Thread.__init__ (self, **kwds)
+        self.setDaemon(1)
+        self.msgq = msgq
+        self.interval = interval
+        self.keep_running = True
+        self.start()
+
+    def run(self):
+        while self.keep_running:
+            time.sleep(self.interval)
+            if my_streams.count() and not self.msgq.full_p():
+                self.msgq.insert_tail(gr.message().make_from_string("update", -2, 0, 0))
+
+    def kill(self):
+        self.keep_running = False
+
 class queue_watcher(threading.Thread):
     def __init__(self, msgq,  callback, **kwds):
         threading.Thread.__init__ (self, **kwds)
@@ -163,11 +430,17 @@ class queue_watcher(threading.Thread):
 
     def run(self):
         while(self.keep_running):
-            if not self.msgq.empty_p(): # check queue before trying to read a message to avoid deadlock at startup
-                msg = self.msgq.delete_head()
-                if msg is not None:
+            msgs = [self.msgq.delete_head()]    # blocks (with the GIL released) until a message is queued
+            while not self.msgq.empty_p():      # drain everything that arrived with this wakeup
+                msgs.append(self.msgq.delete_head_nowait())
+            for msg in msgs:
+                if msg is not None and self.keep_running:
                     self.callback(msg)
                 else:
                     self.keep_running = False
-            else: # empty queue
-                time.sleep(0.01)
+                    break
+
+    def kill(self):
+        self.keep_running = False
+        if not self.msgq.full_p():          # wake the blocked reader so the thread can exit
+            self.msgq.insert_tail(gr.message().make_from_string("", -1, 0, 0))
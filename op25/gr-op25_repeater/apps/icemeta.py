@@ -24,10 +24,17 @@
 import sys
 import time
 import threading
+import collections
 import requests
 import json
+from gnuradio import gr
 from log_ts import log_ts
 
+QUEUE_POLL = 0.05       # queue check interval while an update is waiting for its due time
+BACKOFF_MIN = 1.0       # first retry delay after a failed update
+BACKOFF_MAX = 30.0      # retry delay ceiling while the server is unreachable
+HTTP_TIMEOUT = 1.0
+
 # Helper function
 def from_dict(d, key, def_val):
     if key in d and d[key] != "":
@@ -45,7 +52,11 @@ class meta_server(threading.Thread):
         self.keep_running = True
         self.last_metadata = ""
         self.delay = 0
-        self.msg = None
+        self.pending = collections.deque()  # (due time, msg) in arrival order
+        self.title = None                   # latest due metadata not yet accepted by the server
+        self.retry_at = 0
+        self.backoff = 0
+        self.session = requests.Session()   # keeps the connection to the server alive between updates
         self.urlBase = ""
         self.url = ""
         if isinstance(metacfg,dict):
@@ -61,6 +72,7 @@ class meta_server(threading.Thread):
         self.fmt_tag = from_dict(self.cfg, 'meta_format_tag', '[%TGID%] %TAG%')
         self.fmt_rid = from_dict(self.cfg, 'meta_format_rid', '')   # default is no RID
         self.fmt_rtag = from_dict(self.cfg, 'meta_format_rtag', '') # default is no RTAG
+        self.session.auth = ("source", self.cfg['icecastPass'])
         self.start()
 
     def set_debug(self, dbglvl):
@@ -76,14 +88,36 @@ class meta_server(threading.Thread):
     def run(self):
         while(self.keep_running):
             self.process_q_events()
-            if self.msg and self.logging >= 11:
-                    sys.stderr.write("%s icemeta::run: received message arg1=%s\n" % (log_ts.get(), log_ts.get(self.msg.arg1())))
-            if self.msg and (time.time() >= (self.msg.arg1() + self.delay)):
+            now = time.time()
+            latest = None
+            while self.pending and now >= self.pending[0][0]:   # a burst of due updates collapses to the newest
+                latest = self.pending.popleft()[1]
+            if latest is not None:
                 if self.logging >= 11:
-                    sys.stderr.write("%s icemeta::run: processing message\n" % (log_ts.get()))
-                self.send_metadata(self.format(json.loads(self.msg.to_string())))
-                self.msg = None
-            time.sleep(0.1)
+                    sys.stderr.write("%s icemeta::run: processing message arg1=%s\n" % (log_ts.get(), log_ts.get(latest.arg1())))
+                self.title = self.format(json.loads(latest.to_string()))
+            if self.title is not None and now >= self.retry_at:
+                if self.send_metadata(self.title):
+                    self.title = None
+                    self.backoff = 0
+                else:
+                    self.backoff = min(max(self.backoff * 2, BACKOFF_MIN), BACKOFF_MAX)
+                    self.retry_at = time.time() + self.backoff
+                    if self.logging >= 11:
+                        sys.stderr.write("%s icemeta::run: retrying in %.1f sec\n" % (log_ts.get(), self.backoff))
+            self.wait_events()
+
+    def wait_events(self):
+        wakeup = None
+        if self.pending:
+            wakeup = self.pending[0][0]
+        if self.title is not None and (wakeup is None or self.retry_at < wakeup):
+            wakeup = self.retry_at
+        if wakeup is None:
+            self.queue_msg(self.input_q.delete_head())  # nothing scheduled; block until a message arrives
+            return
+        if self.input_q.empty_p():
+            time.sleep(max(0, min(wakeup - time.time(), QUEUE_POLL)))
 
     def format(self, meta):
         if meta['tgid'] is None:
@@ -108,34 +142,44 @@ class meta_server(threading.Thread):
 
     def stop(self):
         self.keep_running = False
+        if not self.input_q.full_p():       # wake the thread if it is blocked on the queue
+            self.input_q.insert_tail(gr.message().make_from_string("", -1, 0, 0))
 
     def process_q_events(self):
-        if (self.msg is None) and (self.input_q.empty_p() == False):
-            if self.logging >= 11:
-                sys.stderr.write("%s icemeta::process_q_events: queue size=%d\n" % (log_ts.get(), self.input_q.count()))
-            self.msg = self.input_q.delete_head_nowait()
-            if self.msg.type() != -2:
-                self.msg = None
+        if self.logging >= 11 and not self.input_q.empty_p():
+            sys.stderr.write("%s icemeta::process_q_events: queue size=%d\n" % (log_ts.get(), self.input_q.count()))
+        while not self.input_q.empty_p():
+            self.queue_msg(self.input_q.delete_head_nowait())
+
+    def queue_msg(self, msg):
+        if msg is None or msg.type() != -2:
+            return
+        if self.logging >= 11:
+            sys.stderr.write("%s icemeta::queue_msg: received message arg1=%s\n" % (log_ts.get(), log_ts.get(msg.arg1())))
+        self.pending.append((msg.arg1() + self.delay, msg))
 
-    def send_metadata(self, metadata):
+    def send_metadata(self, metadata):  # returns False if the update should be retried
         if (self.urlBase != "") and (metadata != '') and (self.last_metadata != metadata):
             metadataFormatted = metadata.replace(" ","+") # add "+" instead of " " for icecast2
             requestToSend = (self.urlBase) +(metadataFormatted)
             if self.logging >= 11:
                 sys.stderr.write("%s metadata update: \"%s\"\n" % (log_ts.get(), requestToSend))
             try:
-                r = requests.get((requestToSend), auth=("source",self.cfg['icecastPass']), timeout=1.0)
+                r = self.session.get((requestToSend), timeout=HTTP_TIMEOUT)
                 status = r.status_code
                 if self.logging >= 11:
                     sys.stderr.write("%s metadata result: \"%s\"\n" % (log_ts.get(), status))
                 if status != 200:
                     if self.logging >= 11:
                         sys.stderr.write("%s meta_server::send_metadata(): metadata update error: %s\n" % (log_ts.get(), status))
+                    return False
                 else:
                     self.last_metadata = metadata
             except (requests.ConnectionError, requests.Timeout):
                 if self.logging >= 11:
                     sys.stderr.write("%s meta_server::send_metadata(): exception %s\n" % (log_ts.get(), sys.exc_info()[1]))
+                return False
+        return True
 
     def get_url(self):
         return self.url
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+# Event journal query tool
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+
+# Reports over the journal files written by event_journal.py.  Journal lines
+# are loaded incrementally into an sqlite index kept next to the journal
+# (only bytes appended since the previous run are read), so per-tgid, per-rid
+# and time range queries stay fast over months of data.
+#
+# usage: journal_query.py [options] [summary|tgids|rids|calls|freqs|cc|encrypt|activity]
+
+import os
+import sys
+import json
+import time
+import sqlite3
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from event_journal import FILE_PREFIX, FILE_SUFFIX
+
+INDEX_NAME = "journal_index.sqlite"
+COLUMNS = ['t', 'ev', 'sys', 'rx', 'tg', 'rid', 'freq', 'slot', 'dur', 'reason', 'algid', 'keyid', 'count']
+REPORTS = ['summary', 'tgids', 'rids', 'calls', 'freqs', 'cc', 'encrypt', 'activity']
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, offset INTEGER)",
+    "CREATE TABLE IF NOT EXISTS events (t REAL, ev TEXT, sys TEXT, rx INTEGER, tg INTEGER, rid INTEGER, freq INTEGER, slot INTEGER, dur REAL, reason TEXT, algid INTEGER, keyid INTEGER, count INTEGER)",
+    "CREATE INDEX IF NOT EXISTS events_t ON events (t)",
+    "CREATE INDEX IF NOT EXISTS events_ev_t ON events (ev, t)",
+    "CREATE INDEX IF NOT EXISTS events_tg_t ON events (tg, t)",
+    "CREATE INDEX IF NOT EXISTS events_rid_t ON events (rid, t)",
+]
+
+def open_index(path):
+    db = sqlite3.connect(path)
+    cols = [row[1] for row in db.execute("PRAGMA table_info(events)")]
+    if cols and cols != COLUMNS:        # index from an older release; it is rebuilt from the journal
+        with db:
+            db.execute("DROP TABLE events")
+            db.execute("DROP TABLE IF EXISTS files")
+    for stmt in SCHEMA:
+        db.execute(stmt)
+    return db
+
+def update_index(db, directory):
+    files = sorted([f for f in os.listdir(directory) if f.startswith(FILE_PREFIX) and f.endswith(FILE_SUFFIX)])
+    offsets = dict(db.execute("SELECT name, offset FROM files"))
+    added = 0
+    for name in files:
+        path = os.path.join(directory, name)
+        offset = offsets.get(name, 0)
+        if os.path.getsize(path) <= offset:
+            continue
+        rows = []
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):        # partial record still being written
+                    break
+                offset += len(line)
+                try:
+                    rec = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    continue
+                rows.append(tuple([rec.get(c) for c in COLUMNS]))
+        with db:
+            db.executemany("INSERT INTO events VALUES (%s)" % ','.join('?' * len(COLUMNS)), rows)
+            db.execute("INSERT OR REPLACE INTO files VALUES (?, ?)", (name, offset))
+        added += len(rows)
+    return added
+
+def parse_time(s):
+    if s is None:
+        return None
+    try:
+        return float(s)
+    except ValueError:
+        pass
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"]:
+        try:
+            return time.mktime(time.strptime(s, fmt))
+        except ValueError:
+            continue
+    sys.stderr.write("unrecognized time '%s' (use epoch seconds or YYYY-MM-DD [HH:MM[:SS]])\n" % s)
+    sys.exit(1)
+
+def read_tags(filename):
+    tags = {}
+    if filename is None:
+        return tags
+    with open(filename) as f:
+        for row in f:
+            v = row.rstrip("\r\n").split("\t")
+            try:
+                tags[int(v[0])] = v[1] if len(v) > 1 else ""
+            except ValueError:
+                continue
+    return tags
+
+def fmt_ts(t):
+    return time.strftime("%m/%d/%y %H:%M:%S", time.localtime(t))
+
+class query(object):
+    def __init__(self, db, options):
+        self.db = db
+        self.options = options
+        self.tags = read_tags(options.tags)
+
+    def where(self, *events):   # SQL filter clause and parameters for the selected events and options
+        terms = ["ev IN (%s)" % ','.join('?' * len(events))]
+        params = list(events)
+        for col, val in [('t >=', parse_time(self.options.start)), ('t <', parse_time(self.options.end)),
+                         ('tg =', self.options.tgid), ('rid =', self.options.rid), ('sys =', self.options.sysname)]:
+            if val is not None:
+                terms.append("%s ?" % col)
+                params.append(val)
+        return " WHERE " + " AND ".join(terms), params
+
+    def rows(self, sql, *events):
+        w, params = self.where(*events)
+        return self.db.execute(sql % w, params).fetchall()
+
+    def summary(self):
+        for ev, count, t0, t1, dropped in self.rows("SELECT ev, COUNT(*), MIN(t), MAX(t), SUM(count) FROM events %s GROUP BY ev ORDER BY ev",
+                                           'grant', 'call_start', 'call_end', 'rid', 'cc', 'sync_loss', 'new_tgid', 'new_freq', 'encrypt', 'dropped'):
+            sys.stdout.write("%-12s %10d  %s - %s%s\n" % (ev, count, fmt_ts(t0), fmt_ts(t1), ("  (%d events lost)" % dropped) if ev == 'dropped' else ""))
+
+    def tgids(self):
+        grants = self.rows("SELECT tg, COUNT(*) FROM events %s GROUP BY tg", 'grant')
+        calls = dict([(tg, (n, dur)) for tg, n, dur in self.rows("SELECT tg, COUNT(*), SUM(dur) FROM events %s GROUP BY tg", 'call_end')])
+        total = sum([n for tg, n in grants]) or 1
+        sys.stdout.write("# PCT\tGrants\tCalls\tAirtime\tTGID\tDescription\n")
+        for tg, n in sorted(grants, key=lambda x: x[1], reverse=True)[:self.options.limit]:
+            c, dur = calls.get(tg, (0, 0.0))
+            sys.stdout.write("%2.3f\t%d\t%d\t%.0f\t%d\t%s\n" % (100.0 * n / total, n, c, dur or 0.0, tg, self.tags.get(tg, "")))
+
+    def rids(self):
+        sys.stdout.write("# RID\tEvents\tTGIDs\tLast seen\n")
+        for rid, n, ntg, t1 in self.rows("SELECT rid, COUNT(*), COUNT(DISTINCT tg), MAX(t) FROM events %s AND rid IS NOT NULL GROUP BY rid ORDER BY COUNT(*) DESC LIMIT " + str(self.options.limit), 'grant', 'rid'):
+            sys.stdout.write("%d\t%d\t%d\t%s\n" % (rid, n, ntg, fmt_ts(t1)))
+
+    def calls(self):
+        sys.stdout.write("# Time\t\t\tSystem\tRx\tTGID\tRID\tFreq\tSlot\tDur\tReason\n")
+        for t, sysname, rx, tg, rid, freq, slot, dur, reason in self.rows("SELECT t, sys, rx, tg, rid, freq, slot, dur, reason FROM events %s ORDER BY t LIMIT " + str(self.options.limit), 'call_end'):
+            sys.stdout.write("%s\t%s\t%s\t%s\t%s\t%f\t%s\t%.1f\t%s\n" % (fmt_ts(t - (dur or 0.0)), sysname, rx, tg, rid, (freq or 0)/1e6, slot, dur or 0.0, reason))
+
+    def freqs(self):
+        sys.stdout.write("# Freq\t\tGrants\n")
+        for freq, n in self.rows("SELECT freq, COUNT(*) FROM events %s GROUP BY freq ORDER BY freq", 'grant'):
+            sys.stdout.write("%f\t%d\n" % (freq/1e6, n))
+
+    def cc(self):
+        sys.stdout.write("# Time\t\t\tEvent\t\tSystem\tRx\tFreq\n")
+        for t, ev, sysname, rx, freq in self.rows("SELECT t, ev, sys, rx, freq FROM events %s ORDER BY t LIMIT " + str(self.options.limit), 'cc', 'sync_loss'):
+            sys.stdout.write("%s\t%-10s\t%s\t%s\t%f\n" % (fmt_ts(t), ev, sysname, rx, (freq or 0)/1e6))
+
+    def encrypt(self):
+        sys.stdout.write("# TGID\tAlgID\tKeyID\tCount\n")
+        for tg, algid, keyid, n in self.rows("SELECT tg, algid, keyid, COUNT(*) FROM events %s GROUP BY tg, algid, keyid ORDER BY tg", 'encrypt'):
+            sys.stdout.write("%d\t0x%02x\t0x%04x\t%d\n" % (tg, algid, keyid, n))
+
+    def activity(self):
+        b = self.options.bucket
+        sys.stdout.write("# Interval start\t\tGrants (%d second intervals)\n" % b)
+        for t, n in self.rows("SELECT CAST(t / %d AS INTEGER) * %d, COUNT(*) FROM events %%s GROUP BY 1 ORDER BY 1" % (b, b), 'grant'):
+            sys.stdout.write("%s\t%d\n" % (fmt_ts(t), n))
+
+def main():
+    parser = OptionParser(usage="%prog [options] [" + '|'.join(REPORTS) + "]")
+    parser.add_option("-d", "--dir", type="string", default="journal", help="journal directory")
+    parser.add_option("-i", "--index", type="string", default=None, help="index file (default <dir>/%s)" % INDEX_NAME)
+    parser.add_option("-s", "--start", type="string", default=None, help="start time, epoch or YYYY-MM-DD [HH:MM[:SS]]")
+    parser.add_option("-e", "--end", type="string", default=None, help="end time (exclusive)")
+    parser.add_option("-t", "--tgid", type="int", default=None, help="only this talkgroup")
+    parser.add_option("-r", "--rid", type="int", default=None, help="only this radio id")
+    parser.add_option("-S", "--sysname", type="string", default=None, help="only this trunking system")
+    parser.add_option("-T", "--tags", type="string", default=None, help="tsv tag file for talkgroup descriptions")
+    parser.add_option("-b", "--bucket", type="int", default=300, help="activity interval in seconds")
+    parser.add_option("-n", "--limit", type="int", default=1000000, help="maximum rows per report")
+    parser.add_option("-N", "--no-update", action="store_true", default=False, help="query the index without reading new journal data")
+    (options, args) = parser.parse_args()
+
+    report = args[0] if len(args) > 0 else 'summary'
+    if report not in REPORTS:
+        parser.error("unknown report '%s'" % report)
+    if not os.path.isdir(options.dir):
+        parser.error("journal directory '%s' not found" % options.dir)
+
+    db = open_index(options.index or os.path.join(options.dir, INDEX_NAME))
+    if not options.no_update:
+        t0 = time.time()
+        added = update_index(db, options.dir)
+        if added:
+            sys.stderr.write("indexed %d new events in %.2f seconds\n" % (added, time.time() - t0))
+
+    getattr(query(db, options), report)()
+    db.close()
+
+if __name__ == "__main__":
+    main()
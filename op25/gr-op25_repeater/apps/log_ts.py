@@ -23,11 +23,35 @@
 TS_FORMAT = 1
 
 import time
+
+# Time source for trunking timers.  Normally the wall clock; in unthrottled
+# replay it follows the receive timestamps of decoded messages, which the
+# frame assemblers derive from the number of symbols processed.
+class vclock(object):
+    virtual = False
+    ts = 0.0
+
+    @staticmethod
+    def time():
+        if vclock.virtual:
+            return vclock.ts
+        return time.time()
+
+    @staticmethod
+    def set_virtual(start_ts):
+        vclock.ts = start_ts
+        vclock.virtual = True
+
+    @staticmethod
+    def update(ts):
+        if ts > vclock.ts:
+            vclock.ts = ts
+
 class log_ts(object):
     @staticmethod
     def get(supplied_ts=None):
         if supplied_ts is None:
-            ts = time.time()
+            ts = vclock.time()
         else:
             ts = supplied_ts
 
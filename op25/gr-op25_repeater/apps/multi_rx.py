@@ -63,7 +63,11 @@ import p25_demodulator_dev as p25_demodulator
 import op25_nbfm
 import op25_iqsrc
 import op25_wavsrc
-from log_ts import log_ts
+import channelizer
+import tracking_store
+import event_journal
+import call_recorder
+from log_ts import log_ts, vclock
 from helper_funcs import *
 
 from gr_gnuplot import constellation_sink_c
@@ -91,6 +95,8 @@ class device(object):
         self.name = config['name']
         self.args = config['args']
         self.tunable = bool(from_dict(config, 'tunable', False))
+        self.serial = str(from_dict(config, 'serial', tracking_store.device_serial(config['args'], self.name)))
+        self.tracking_store = None
 
         sys.stderr.write('device: %s\n' % config)
         if config['args'] == 'iqsrc':
@@ -161,11 +167,22 @@ class device(object):
             self.src.set_center_freq(self.frequency + self.offset)
             self.usable_bw = float(from_dict(config, 'usable_bw_pct', 1.0))
 
+        # Optional shared channelizer (complex, non-tunable sources only)
+        self.channelizer = None
+        if bool(from_dict(config, 'channelizer', False)) and self.src is not None and config['args'] != 'wavsrc':
+            if self.tunable:
+                sys.stderr.write("Device %s: channelizer not supported on tunable devices - ignoring\n" % self.name)
+            else:
+                self.channelizer = channelizer.pfb_channelizer_c(self.sample_rate,
+                                                                 bin_width = int(from_dict(config, 'channelizer_bw', channelizer._def_bin_width)),
+                                                                 usable_bw = self.usable_bw)
+
     def get_ppm(self):
         return self.ppm
 
     def set_debug(self, dbglvl):
-        pass
+        if self.channelizer is not None:
+            self.channelizer.debug = dbglvl
 
 class channel(object):
     def __init__(self, config, dev, verbosity, msgq_id, rx_q, tb):
@@ -180,14 +197,15 @@ class channel(object):
         self.raw_sink = None
         self.raw_file = None
         self.throttle = None
+        self.replay_clock = False
         self.nbfm = None
         self.nbfm_mode = 0
         self.auto_tracking      = bool(from_dict(config, "cqpsk_tracking", False))
         self.tracking_threshold = int(from_dict(config, "tracking_threshold", 120))
         self.tracking_limit     = int(from_dict(config, "tracking_limit", 2400))
         self.tracking_feedback  = float(from_dict(config, "tracking_feedback", 0.85))
-        self.tracking = 0
-        self.tracking_cache = {}
+        self.tracking_cache = dev.tracking_store.get(dev.serial) if dev.tracking_store is not None else {}
+        self.tracking = self.tracking_cache.get(self.frequency, 0)
         self.crypt_keys_file    = str(from_dict(config, "crypt_keys", ""))
         self.crypt_keys = {}
         self.error = None
@@ -198,6 +216,12 @@ class channel(object):
         self.config = config
         self.symbol_rate = int(from_dict(config, 'symbol_rate', _def_symbol_rate))
         self.channel_rate = self.symbol_rate
+        if dev.channelizer is not None:    # demod is fed a single channelizer bin rather than the full device bandwidth
+            input_rate = dev.channelizer.get_output_rate()
+            usable_bw = 1.0
+        else:
+            input_rate = dev.sample_rate
+            usable_bw = dev.usable_bw
         if dev.args == 'wavsrc':
             self.demod = p25_demodulator.p25_demod_fb(
                              msgq_id = self.msgq_id,
@@ -213,10 +237,10 @@ class channel(object):
             self.demod = p25_demodulator.p25_demod_cb(
                              msgq_id = self.msgq_id,
                              debug = self.verbosity,
-                             input_rate = dev.sample_rate,
+                             input_rate = input_rate,
                              demod_type = 'fsk4',
                              filter_type = filter_type,
-                             usable_bw = self.device.usable_bw,
+                             usable_bw = usable_bw,
                              excess_bw = float(from_dict(config, 'excess_bw', 0.2)),
                              relative_freq = ((dev.frequency + dev.offset + dev.fractional_corr) - self.frequency),
                              offset = dev.offset,
@@ -226,10 +250,10 @@ class channel(object):
             self.demod = p25_demodulator.p25_demod_cb(
                              msgq_id = self.msgq_id,
                              debug = self.verbosity,
-                             input_rate = dev.sample_rate,
+                             input_rate = input_rate,
                              demod_type = config['demod_type'],
                              filter_type = config['filter_type'],
-                             usable_bw = self.device.usable_bw,
+                             usable_bw = usable_bw,
                              excess_bw = float(from_dict(config, 'excess_bw', 0.2)),
                              relative_freq = ((dev.frequency + dev.offset + dev.fractional_corr) - self.frequency),
                              offset = dev.offset,
@@ -242,8 +266,13 @@ class channel(object):
             sys.stderr.write("%s [%d] reading channel crypt_keys file: %s\n" % (log_ts.get(), self.msgq_id, self.crypt_keys_file))
             self.crypt_keys = get_key_dict(self.crypt_keys_file, self.msgq_id)
             for keyid in self.crypt_keys.keys():
-                self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'crypt_key', 'keyid': int(keyid), 'algid': int(self.crypt_keys[keyid]['algid']), 'key': self.crypt_keys[keyid]['key']}))
+                self.decoder.crypt_key(int(keyid), int(self.crypt_keys[keyid]['algid']), self.crypt_keys[keyid]['key'])
         
+        # Restrict frame sync detection to the listed protocols (e.g. "P25P1,P25P2")
+        self.protocols = str(from_dict(config, 'protocols', ""))
+        if self.protocols != "":
+            self.decoder.set_protocols(self.protocols)
+
         # Load crypt_behavior
         # self.crypt_behavior = int(from_dict(config, 'crypt_behavior', 0))
         # export crypt_behavior to c
@@ -251,7 +280,8 @@ class channel(object):
         # sys.stderr.write("%s crypt behavior: %d\n" % (log_ts.get(), self.crypt_behavior))
         
         # Relative-tune the demodulator
-        if not self.demod.set_relative_frequency((dev.frequency + dev.offset + dev.fractional_corr) - self.frequency):
+        if not self.set_relative_frequency((dev.frequency + dev.offset + dev.fractional_corr + self.tracking) - self.frequency):
+            self.tracking = 0
             sys.stderr.write("%s [%d] Unable to initialize demod to freq: %d, using device freq: %d\n" % (log_ts.get(), self.msgq_id, self.frequency, dev.frequency))
             self.frequency = dev.frequency
 
@@ -323,9 +353,11 @@ class channel(object):
             return
         if self.tb.terminal_type == "http":
             self.sinks[plot][0].gnuplot.set_interval(self.tb.http_plot_interval)
-            self.sinks[plot][0].gnuplot.set_output_dir(self.tb.http_plot_directory)
+            self.sinks[plot][0].gnuplot.set_client_render(True)
         else:
             self.sinks[plot][0].gnuplot.set_interval(self.tb.curses_plot_interval)
+        self.sinks[plot][0].gnuplot.set_frame_rate(self.tb.plot_frame_rate)
+        self.sinks[plot][0].gnuplot.set_max_bins(self.tb.plot_max_bins)
 
     def toggle_plot(self, plot_type):
         if plot_type == 1:
@@ -404,12 +436,18 @@ class channel(object):
             sink.set_relative_freq(self.device.frequency - self.frequency)
             sink.set_width(self.device.sample_rate)
             self.tb.lock()
-            self.demod.connect_complex('src', sink)
+            if self.device.channelizer is not None:     # demod input is only one bin wide; plot the whole device instead
+                self.tb.connect(self.device.src, sink)
+            else:
+                self.demod.connect_complex('src', sink)
             self.tb.unlock()
         else:
             (sink, fn) = self.sinks.pop('fft')
             self.tb.lock()
-            self.demod.disconnect_complex(sink)
+            if self.device.channelizer is not None:
+                self.tb.disconnect(self.device.src, sink)
+            else:
+                self.demod.disconnect_complex(sink)
             self.tb.unlock()
             sink.kill()
 
@@ -446,6 +484,11 @@ class channel(object):
             self.tb.unlock()
             sink.kill()
 
+    def set_relative_frequency(self, freq):
+        if self.device.channelizer is not None:
+            return self.device.channelizer.set_relative_frequency(self.demod, freq)
+        return self.demod.set_relative_frequency(freq)
+
     def set_freq(self, freq):
         if self.frequency == freq:
             return True
@@ -453,22 +496,22 @@ class channel(object):
         old_freq = self.frequency
         old_track = self.tracking
         self.frequency = freq
-        self.tracking_cache[old_freq] = old_track
+        self.cache_tracking(old_freq, old_track)
         if self.frequency in self.tracking_cache:
             self.tracking = self.tracking_cache[self.frequency]     # if cached value available use it otherwise continue with existing
 
-        if not self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - freq): # First attempt relative tune
+        if not self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - freq): # First attempt relative tune
             if self.device.tunable:                                                                  # then hard tune if allowed
                 self.device.frequency = self.frequency
                 if self.device.src is not None:
                     self.device.src.set_center_freq(self.frequency + self.device.offset)
                 self.device.fractional_corr = int((int(round(self.device.ppm)) - self.device.ppm) * (self.device.frequency/1e6))        # Calc frac ppm using new freq
-                self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - freq)
+                self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - freq)
                 if self.verbosity >= 9:
                     sys.stderr.write("%s [%d] Hardware tune: dev_freq(%d), dev_off(%d), dev_frac(%d), tune_freq(%d), tracking(%d)\n" % (log_ts.get(), self.msgq_id, self.device.frequency, self.device.offset, self.device.fractional_corr, (self.device.frequency - (self.device.offset + self.device.frequency + self.device.fractional_corr - freq)), self.tracking))
             else:                                                                                    # otherwise fail and reset to prev freq
                 self.tracking = old_track
-                self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - old_freq)
+                self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - old_freq)
                 self.frequency = old_freq
                 if self.verbosity:
                     sys.stderr.write("%s [%d] Unable to tune %s to frequency %f\n" % (log_ts.get(), self.msgq_id, self.name, (freq/1e6)))
@@ -482,7 +525,7 @@ class channel(object):
         if self.verbosity >= 9:
             sys.stderr.write("%s [%d] Tuning to frequency %f\n" % (log_ts.get(), self.msgq_id, (freq/1e6)))
         #self.demod.reset()          # reset gardner-costas tracking loop NOTE: tuning appears to be faster without this step
-        self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'sync_reset'}))
+        self.decoder.sync_reset()
         return True
 
     def adj_tune(self, adjustment): # ideally this would all be done at the device level but the demod belongs to the channel object
@@ -492,33 +535,35 @@ class channel(object):
             self.device.src.set_freq_corr(int(round(self.device.ppm)))
             self.device.src.set_center_freq(self.device.frequency + self.device.offset)
         self.device.fractional_corr = int((int(round(self.device.ppm)) - self.device.ppm) * (self.device.frequency/1e6))
-        self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - self.frequency)
+        self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - self.frequency)
         self.demod.reset()          # reset gardner-costas tracking loop
 
     def configure_p25_tdma(self, params):
         set_tdma = False
         if 'tdma' in params and params['tdma'] is not None:
             set_tdma = True
-            self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'set_slotid', 'slotid': params['tdma']}))
+            self.decoder.set_slotid(params['tdma'])
         self.demod.set_tdma(set_tdma)
         if set_tdma == self.tdma_state:
             return
         self.tdma_state = set_tdma
         if set_tdma:
-            self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'set_xormask', 'xormask': self.xor_cache[self.get_hash(params)]}))
+            self.decoder.set_xormask(self.xor_cache[self.get_hash(params)])
             rate = 6000
         else:
             rate = self.channel_rate
 
         self.symbol_rate = rate
         self.demod.set_omega(rate)
+        if self.replay_clock:
+            self.set_replay_clock()
         if 'eye' in self.sinks:
             self.sinks['eye'][0].set_sps(self.config['if_rate'] / rate)
 
     def get_hash(self, params):
-        hash = '%x%x%x' % (params['nac'], params['sysid'], params['wacn'])
+        hash = lfsr.xor_masks.key(params['nac'], params['sysid'], params['wacn'])
         if hash not in self.xor_cache:
-            self.xor_cache[hash] = lfsr.p25p2_lfsr(params['nac'], params['sysid'], params['wacn']).xor_chars
+            self.xor_cache[hash] = lfsr.xor_masks.get(params['nac'], params['sysid'], params['wacn'])
             if self.verbosity >= 5:
                 sys.stderr.write("%s [%d] Caching TDMA xor mask for NAC: 0x%x, SYSID: 0x%x, WACN: 0x%x\n" % (log_ts.get(), self.msgq_id, params['nac'], params['sysid'], params['wacn']))
         return hash
@@ -526,30 +571,67 @@ class channel(object):
     def set_rate(self, rate):
         self.symbol_rate = rate
         self.demod.set_omega(rate)
+        if self.replay_clock:
+            self.set_replay_clock()
         if 'eye' in self.sinks:
             self.sinks['eye'][0].set_sps(self.config['if_rate'] / rate)
 
-    def control(self, params):
-        if 'cmd' in params:
-            if self.verbosity >= 10:
-                sys.stderr.write("%s [%d] channel control: cmd=%s, params=%s\n" % (log_ts.get(), self.msgq_id, params['cmd'], params))
-            if params['cmd'] == "set_slotid":
-                self.chan_idle = True if (params['slotid'] == 4) else False
-            elif params['cmd'] == "set_xormask":
-                self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'set_xormask', 'xormask': self.xor_cache[self.get_hash(params)]}))
-                return
-        self.decoder.control(json.dumps(params))
+    def set_replay_clock(self):     # decoder timestamps and timeouts follow the symbol count instead of the wall clock
+        self.replay_clock = True
+        self.decoder.set_replay_clock(self.symbol_rate)
+
+    def control(self, params):     # frame assembler commands go to its typed setters, anything else as json
+        cmd = params.get('cmd')
+        if cmd is not None and self.verbosity >= 10:
+            sys.stderr.write("%s [%d] channel control: cmd=%s, params=%s\n" % (log_ts.get(), self.msgq_id, cmd, params))
+        if cmd == "set_slotid":
+            self.chan_idle = True if (params['slotid'] == 4) else False
+            self.decoder.set_slotid(params['slotid'])
+        elif cmd == "set_xormask":
+            self.decoder.set_xormask(self.xor_cache[self.get_hash(params)])
+            return
+        elif cmd == "set_nac":
+            self.decoder.set_nac(params['nac'])
+        elif cmd == "set_slotkey":
+            self.decoder.set_slotkey(params['slotkey'])
+        elif cmd == "sync_reset":
+            self.decoder.sync_reset()
+        elif cmd == "call_end":
+            self.decoder.call_end()
+        elif cmd == "crypt_reset":
+            self.decoder.crypt_reset()
+        elif cmd == "crypt_behavior":
+            self.decoder.crypt_behavior(params['behavior'])
+        else:
+            self.decoder.control(json.dumps(params))
         self.demod.control(not self.chan_idle)
 
     def kill(self):
         for sink in self.sinks:
             self.sinks[sink][0].kill()
 
+    def cache_tracking(self, freq, tracking):
+        self.tracking_cache[freq] = tracking
+        if self.device.tracking_store is not None and self.auto_tracking and tracking != 0:     # only learned corrections are persisted
+            self.device.tracking_store.update(self.device.serial, freq, tracking)
+
     def error_tracking(self):
         if self.chan_idle:
             self.error = None
             return
         self.error = self.demod.get_freq_error()
+        if not self.auto_tracking or self.error is None or abs(self.error) < self.tracking_threshold:
+            return
+        # fold part of the residual FLL error into the tuning offset and remember it for this frequency
+        tracking = int(self.tracking + self.error * self.tracking_feedback)
+        tracking = max(-self.tracking_limit, min(self.tracking_limit, tracking))
+        if tracking == self.tracking:
+            return
+        self.tracking = tracking
+        self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr + self.tracking - self.frequency)
+        self.cache_tracking(self.frequency, self.tracking)
+        if self.verbosity >= 9:
+            sys.stderr.write("%s [%d] Tracking update: freq(%f), error(%d), tracking(%d)\n" % (log_ts.get(), self.msgq_id, (self.frequency/1e6), self.error, self.tracking))
 
     def dump_tracking(self):
         sys.stderr.write("%s [%d] Frequency Tracking Cache: ch(%d)\n{\n" % (log_ts.get(), self.msgq_id, self.msgq_id))
@@ -581,9 +663,10 @@ class rx_block (gr.top_block):
 
     # Initialize the receiver
     #
-    def __init__(self, verbosity, config):
+    def __init__(self, verbosity, config, unthrottled = False):
         self.config = config
         self.verbosity = verbosity
+        self.unthrottled = unthrottled
         self.devices = []
         self.channels = []
         self.terminal = None
@@ -592,6 +675,7 @@ class rx_block (gr.top_block):
         self.interactive = True
         self.audio = None
         self.audio_instances = {}
+        self.recorder = None
         self.metadata = None
         self.meta_streams = {}
         self.trunking = None
@@ -601,9 +685,16 @@ class rx_block (gr.top_block):
         self.ui_out_q = gr.msg_queue(100)
         self.ui_timeout = 5.0
         self.ui_last_update = 0.0
+        self.ui_freq_cache = (None, None)   # (channel_update params, serialized params)
 
         gr.top_block.__init__(self)
         self.device_id_by_name = {}
+        self.tracking_stores = {}
+
+        if self.unthrottled:    # file replay as fast as possible; trunking follows the symbol position
+            vclock.set_virtual(time.time())
+            self.set_interactive(False)
+            sys.stderr.write("%s Unthrottled replay, using virtual clock\n" % log_ts.get())
 
         if "audio" in config:
             self.configure_audio(config['audio'])
@@ -651,6 +742,8 @@ class rx_block (gr.top_block):
             self.audio = None
             sys.stderr.write("Error: unable to import audio module: %s\n%s\n" % (config['module'], sys.exc_info()[1]))
 
+        self.recorder = call_recorder.configure(str(from_dict(config, 'record_dir', "")), float(from_dict(config, 'record_min_secs', call_recorder._def_min_secs)), self.verbosity)
+        rec_kwds = {} if self.recorder is None else {'recorder': self.recorder}
         idx = 0
         for instance in config['instances']:
             if 'instance_name' in instance and instance['instance_name'] != "":
@@ -662,9 +755,10 @@ class rx_block (gr.top_block):
                 audio_device = str(from_dict(instance,'device_name', "default"))
                 audio_gain = float(from_dict(instance,'audio_gain', "0.0"))
                 audio_2chan = True if int(from_dict(instance,'number_channels', 1)) == 2 else False
+                audio_jitter = int(from_dict(instance,'jitter_ms', 0))
                 sys.stderr.write("Configuring audio instance #%d [%s]\n" % (idx, instance_name))
                 try:
-                    audio_s = self.audio.audio_thread("127.0.0.1", audio_port, audio_device, audio_2chan, audio_gain, instance_name=instance_name)
+                    audio_s = self.audio.audio_thread("127.0.0.1", audio_port, audio_device, audio_2chan, audio_gain, instance_name=instance_name, jitter_ms=audio_jitter, **rec_kwds)
                     self.audio_instances[instance_name] = audio_s
                 except:
                     sys.stderr.write("Error configuring audio instance #%d; %s\n" % (idx, sys.exc_info()[1]))
@@ -689,8 +783,9 @@ class rx_block (gr.top_block):
         self.terminal_type = self.terminal.get_terminal_type()
         self.terminal_config = config
         self.curses_plot_interval = float(from_dict(config, 'curses_plot_interval', 0.0))
-        self.http_plot_interval = float(from_dict(config, 'http_plot_interval', 1.0))
-        self.http_plot_directory = str(from_dict(config, 'http_plot_directory', "../www/images"))
+        self.http_plot_interval = float(from_dict(config, 'http_plot_interval', 0.5))
+        self.plot_frame_rate = float(from_dict(config, 'plot_frame_rate', 0.0))
+        self.plot_max_bins = int(from_dict(config, 'plot_max_bins', 256))
         self.ui_timeout = float(from_dict(config, 'terminal_timeout', 5.0))
 
     def configure_trunking(self, config):
@@ -709,8 +804,9 @@ class rx_block (gr.top_block):
 
         if self.trunking is not None:
             self.trunk_rx = self.trunking.rx_ctl(frequency_set = self.change_freq, nbfm_ctrl = self.nbfm_control, fa_ctrl = self.fa_control, debug = self.verbosity, chans = config['chans'])
-            self.du_watcher = du_queue_watcher(self.rx_q, self.trunk_rx.process_qmsg)
+            self.du_watcher = du_queue_watcher(self.rx_q, self.trunk_rx.process_qmsg, batch_callback = getattr(self.trunk_rx, 'process_qmsgs', None), clocked = self.unthrottled)
             sys.stderr.write("Enabled trunking module: %s\n" % config['module'])
+            event_journal.configure(str(from_dict(config, 'journal_dir', "")), float(from_dict(config, 'journal_max_mb', event_journal._def_max_mb)), self.verbosity)
 
     def configure_metadata(self, config):
         meta_mod = config['module']
@@ -745,7 +841,15 @@ class rx_block (gr.top_block):
         self.devices = []
         for cfg in config:
             self.device_id_by_name[cfg['name']] = len(self.devices)
-            self.devices.append(device(cfg))
+            if self.unthrottled and cfg['args'] in ['iqsrc', 'wavsrc']:
+                cfg = dict(cfg, throttle = False)
+            dev = device(cfg)
+            tracking_file = str(from_dict(cfg, 'tracking_file', ""))
+            if tracking_file != "":     # opt-in; devices naming the same file share one store
+                if tracking_file not in self.tracking_stores:
+                    self.tracking_stores[tracking_file] = tracking_store.tracking_store(tracking_file, debug=self.verbosity)
+                dev.tracking_store = self.tracking_stores[tracking_file]
+            self.devices.append(dev)
 
     def find_device(self, chan):
         if 'device' in chan and (chan['device'] != "") and (chan['device'] in self.device_id_by_name):
@@ -790,6 +894,9 @@ class rx_block (gr.top_block):
                 chan = channel(cfg, dev, self.verbosity, msgq_id, self.rx_q, self)
                 self.channels.append(chan)
                 self.trunk_rx.add_receiver(msgq_id, config=cfg, meta_q=meta_q, freq=chan.frequency)
+                dest = str(from_dict(cfg, 'destination', ""))
+                if dest.startswith('udp://'):
+                    call_recorder.add_stream(msgq_id, int(dest.rsplit(':', 1)[1]))
             else:
                 msgq_id = -1 - len(self.channels)
                 chan = channel(cfg, dev, self.verbosity, msgq_id, self.rx_q, self)
@@ -799,17 +906,26 @@ class rx_block (gr.top_block):
                 chan.raw_file = blocks.file_source(gr.sizeof_char, str(cfg['raw_input']), False)
                 if ("raw_seek" in cfg) and (cfg['raw_seek'] != 0):
                     chan.raw_file.seek(int(cfg['raw_seek']) * 4800, 0)
-                chan.throttle = blocks.throttle(gr.sizeof_char, chan.symbol_rate)
-                chan.throttle.set_max_noutput_items(int(chan.symbol_rate/50));
-                self.connect(chan.raw_file, chan.throttle)
-                self.connect(chan.throttle, chan.decoder)
+                if self.unthrottled:
+                    self.connect(chan.raw_file, chan.decoder)
+                else:
+                    chan.throttle = blocks.throttle(gr.sizeof_char, chan.symbol_rate)
+                    chan.throttle.set_max_noutput_items(int(chan.symbol_rate/50));
+                    self.connect(chan.raw_file, chan.throttle)
+                    self.connect(chan.throttle, chan.decoder)
                 self.set_interactive(False) # this is non-interactive 'replay' session 
             else:
-                self.connect(dev.src, chan.demod, chan.decoder)
+                if dev.channelizer is not None:
+                    dev.channelizer.connect_channel(self, dev.src, chan.demod)
+                    self.connect(chan.demod, chan.decoder)
+                else:
+                    self.connect(dev.src, chan.demod, chan.decoder)
                 if ("raw_output" in cfg) and (cfg['raw_output'] != ""):
                     sys.stderr.write("%s Saving raw symbols to file: %s\n" % (log_ts.get(), cfg['raw_output']))
                     chan.raw_sink = blocks.file_sink(gr.sizeof_char, str(cfg['raw_output']))
                     self.connect(chan.demod, chan.raw_sink)
+            if self.unthrottled:
+                chan.set_replay_clock()
 
     def scan_channels(self):
         for chan in self.channels:
@@ -931,7 +1047,7 @@ class rx_block (gr.top_block):
             #msgq_id = int(msg.arg2())
             #self.find_channel(msgq_id).decoder.control(json.dumps({'tuner': msgq_id, 'cmd': 'dump_buffer'}))
             for chan in self.channels:
-                chan.decoder.control(json.dumps({'tuner': chan.msgq_id, 'cmd': 'dump_buffer'}))
+                chan.decoder.dump_buffer()
         elif s == 'watchdog':
             if self.ui_last_update > 0 and (time.time() > (self.ui_last_update + self.ui_timeout)):
                 self.ui_last_update = 0
@@ -950,7 +1066,10 @@ class rx_block (gr.top_block):
     def ui_freq_update(self):
         if self.trunking is None or self.trunk_rx is None:
             return False
-        params = json.loads(self.trunk_rx.get_chan_status())   # extract data from all channels
+        if hasattr(self.trunk_rx, 'get_chan_status_dict'):
+            params = self.trunk_rx.get_chan_status_dict()          # extract data from all channels
+        else:
+            params = json.loads(self.trunk_rx.get_chan_status())
         for rx_id in params['channels']:                       # iterate and convert stream name to url
             params[rx_id]['ppm'] = self.find_channel(int(rx_id)).device.get_ppm()
             params[rx_id]['capture'] = False if self.find_channel(int(rx_id)).raw_sink is None else True
@@ -962,7 +1081,10 @@ class rx_block (gr.top_block):
                 continue
             meta_s, meta_q = self.meta_streams[s_name]
             params[rx_id]['stream_url'] = meta_s.get_url()
-        js = json.dumps(params)
+        cached_params, js = self.ui_freq_cache
+        if params != cached_params:                            # only re-encode when a channel has changed
+            js = json.dumps(params)
+            self.ui_freq_cache = (params, js)
         msg = gr.message().make_from_string(js, -4, 0, 0)
         if not self.ui_in_q.full_p():
             self.ui_in_q.insert_tail(msg)
@@ -996,6 +1118,12 @@ class rx_block (gr.top_block):
         if self.terminal is not None:
             self.terminal.end_terminal()
 
+        for f in self.tracking_stores:
+            self.tracking_stores[f].kill()
+
+        event_journal.stop()
+        call_recorder.stop()
+
     def stop(self):
         sys.stderr.write("%s rx_block::stop() flowgraph stop called\n" % log_ts.get())
         self.kill()
@@ -1005,30 +1133,43 @@ class rx_block (gr.top_block):
 #
 class du_queue_watcher(threading.Thread):
 
-    def __init__(self, msgq,  callback, **kwds):
+    def __init__(self, msgq,  callback, batch_callback = None, clocked = False, **kwds):
         threading.Thread.__init__ (self, **kwds)
         self.daemon = True
         self.msgq = msgq
         self.callback = callback
+        self.batch_callback = batch_callback
+        self.clocked = clocked      # advance the virtual clock from message timestamps
         self.keep_running = True
         self.start()
 
     def run(self):
         try:
             while(self.keep_running):
-                if not self.msgq.empty_p(): # check queue before trying to read a message to avoid deadlock at startup
-                    msg = self.msgq.delete_head()
-                    if msg is not None:
+                msgs = [self.msgq.delete_head()]    # blocks (with the GIL released) until a message is queued
+                while not self.msgq.empty_p():      # drain everything that arrived with this wakeup
+                    msgs.append(self.msgq.delete_head_nowait())
+                if not self.keep_running:
+                    break
+                if None in msgs:
+                    msgs = msgs[:msgs.index(None)]
+                    self.keep_running = False
+                if self.clocked:
+                    for msg in msgs:
+                        vclock.update(msg.arg2())
+                if self.batch_callback is not None:
+                    if len(msgs) > 0:
+                        self.batch_callback(msgs)
+                else:
+                    for msg in msgs:
                         self.callback(msg)
-                    else:
-                        self.keep_running = False
-                else: # empty queue
-                    time.sleep(0.01)
         except KeyboardInterrupt:
             self.keep_running = False
 
     def kill(self):
         self.keep_running = False
+        if not self.msgq.full_p():          # wake the blocked reader so the thread can exit
+            self.msgq.insert_tail(gr.message().make_from_string("", -1, 0, 0))
 
 class rx_main(object):
     def __init__(self):
@@ -1053,6 +1194,7 @@ class rx_main(object):
         parser.add_option("-v", "--verbosity", type="int", default=0, help="message debug level")
         parser.add_option("-p", "--pause", action="store_true", default=False, help="block on startup")
         parser.add_option("-d", "--dev-mode", action="store_true", default=False, help="enable developer mode")
+        parser.add_option("-u", "--unthrottled", action="store_true", default=False, help="replay file sources as fast as possible using a virtual clock")
         (options, args) = parser.parse_args()
 
         #if options.dev_mode:
@@ -1079,7 +1221,7 @@ class rx_main(object):
                 config = json.loads(open(options.config_file).read())
             else:
                 config = json.loads(open(options.config_file, encoding="utf-8-sig").read())
-        self.tb = rx_block(options.verbosity, config = byteify(config))
+        self.tb = rx_block(options.verbosity, config = byteify(config), unthrottled = options.unthrottled)
         self.q_watcher = du_queue_watcher(self.tb.ui_out_q, self.process_qmsg)
         sys.stderr.write('python version detected: %s\n' % sys.version)
 
@@ -58,6 +58,7 @@ class op25_iqsrc_c(gr.hier_block2):
         self.iq_size = int(from_dict(config, 'iq_size', 1))
         self.iq_signed  = bool(from_dict(config, 'iq_signed', False))
         self.rate = int(from_dict(config, 'rate', 2400000))
+        self.throttled = bool(from_dict(config, 'throttle', True))
 
         # Create the source block
         self.iqsrc = op25_repeater.iqfile_source(self.iq_size, self.iq_file, self.iq_signed, self.iq_seek, 0)
@@ -67,15 +68,18 @@ class op25_iqsrc_c(gr.hier_block2):
             self.freq = self.iqsrc.get_dsd_freq()
             self.ts = self.iqsrc.get_dsd_ts()
 
-        # Create the throttle to set playback rate
-        self.throttle = blocks.throttle(gr.sizeof_gr_complex, self.rate)
-
-        # Connect src and throttle
-        self.connect(self.iqsrc, self.throttle, self)            
+        # Create the throttle to set playback rate (omitted for unthrottled replay)
+        if self.throttled:
+            self.throttle = blocks.throttle(gr.sizeof_gr_complex, self.rate)
+            self.connect(self.iqsrc, self.throttle, self)
+        else:
+            self.throttle = None
+            self.connect(self.iqsrc, self)
 
     def set_sample_rate(self, iq_rate):
         self.rate = iq_rate
-        self.throttle.set_sample_rate(self.rate)
+        if self.throttle is not None:
+            self.throttle.set_sample_rate(self.rate)
 
     def get_sample_rate(self):
         return self.rate
@@ -104,8 +104,7 @@ os.environ['IMBE'] = 'soft'
 
 WIRESHARK_PORT = 23456
 
-_def_interval = 1.0    # sec
-_def_file_dir = '../www/images'
+_def_interval = 0.5    # sec
 
 # The P25 receiver
 #
@@ -431,9 +430,9 @@ class p25_rx_block (gr.top_block):
             return    # already in desired state
         self.tdma_state = set_tdma
         if set_tdma:
-            hash = '%x%x%x' % (params['nac'], params['sysid'], params['wacn'])
+            hash = lfsr.xor_masks.key(params['nac'], params['sysid'], params['wacn'])
             if hash not in self.xor_cache:
-                self.xor_cache[hash] = lfsr.p25p2_lfsr(params['nac'], params['sysid'], params['wacn']).xor_chars
+                self.xor_cache[hash] = lfsr.xor_masks.get(params['nac'], params['sysid'], params['wacn'])
             self.decoder.control({'tuner': 0, 'cmd': 'set_xormask', 'xormask': self.xor_cache[hash]})
             rate = 6000
         else:
@@ -787,7 +786,7 @@ class p25_rx_block (gr.top_block):
             self.plot_sinks.append(plot)
         if self.options.terminal_type.startswith('http:'):
             plot.gnuplot.set_interval(_def_interval)
-            plot.gnuplot.set_output_dir(_def_file_dir)
+            plot.gnuplot.set_client_render(True, self.input_q)
 
     def remove_plot_sink(self, plot):
         if plot in self.plot_sinks:
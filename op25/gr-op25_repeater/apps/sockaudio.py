@@ -38,8 +38,15 @@ PCM_BUFFER_SIZE = 4000      # size of ALSA buffer in frames
 
 MAX_SUPERFRAME_SIZE = 320   # maximum size of incoming UDP audio buffer
 
+# Jitter buffer
+JITTER_FRAME = MAX_SUPERFRAME_SIZE // 2     # nominal frame length (samples per channel)
+JITTER_MAX_MS = 500         # upper limit for adaptive playout depth (ms)
+JITTER_ALPHA = 1.0 / 16     # inter-arrival jitter estimator gain (RFC 3550)
+JITTER_K = 4.0              # playout depth in units of estimated jitter
+
 # Debug
 LOG_AUDIO_XRUNS = True      # log audio underruns to stderr
+LOG_JITTER_STATS = False    # log jitter buffer counters at the end of each call
 
 # Alsa PCM constants
 SND_PCM_FORMAT_S8 = c_int(0)
@@ -108,6 +115,13 @@ SND_PCM_ACCESS_LAST = SND_PCM_ACCESS_RW_NONINTERLEAVED
 PA_STREAM_PLAYBACK = 1
 PA_SAMPLE_S16LE = 3
 
+# Returns (obj, pointer, nbytes) for pcm data held in a numpy array or any bytes-like
+# object, without copying.  Caller keeps obj alive until the pointer is consumed.
+def pcm_buffer(pcm_data):
+    if not isinstance(pcm_data, np.ndarray):
+        pcm_data = np.frombuffer(pcm_data, dtype=np.uint8)
+    return pcm_data, pcm_data.ctypes.data_as(c_void_p), pcm_data.nbytes
+
 # Python CTypes wrapper to Alsa libasound2
 class alsasound(object):
     def __init__(self):
@@ -196,26 +210,25 @@ class alsasound(object):
         return ret
 
     def write(self, pcm_data):
-        datalen = len(pcm_data)
+        pcm_data, c_data, datalen = pcm_buffer(pcm_data)
         n_frames = c_ulong(datalen // self.framesize)
-        c_data = c_char_p(pcm_data)
         ret = 0
 
         if (self.c_pcm.value == None):
             sys.stderr.write("PCM device is closed\n")
             return -1
 
-        ret = self.libasound.snd_pcm_writei(self.c_pcm, cast(c_data, POINTER(c_void_p)), n_frames)
+        ret = self.libasound.snd_pcm_writei(self.c_pcm, c_data, n_frames)
         if (ret < 0):
             if (ret == -errno.EPIPE): # underrun
                 if (LOG_AUDIO_XRUNS):
                     sys.stderr.write("%s PCM underrun\n" % log_ts.get())
                 ret = self.libasound.snd_pcm_recover(self.c_pcm, ret, 1)
                 if (ret >= 0):
-                    ret = self.libasound.snd_pcm_writei(self.c_pcm, cast(c_data, POINTER(c_void_p)), n_frames)
+                    ret = self.libasound.snd_pcm_writei(self.c_pcm, c_data, n_frames)
                 else:
                     ret = self.libasound.snd_pcm_prepare(self.c_pcm)
-                    ret = self.libasound.snd_pcm_writei(self.c_pcm, cast(c_data, POINTER(c_void_p)), n_frames)
+                    ret = self.libasound.snd_pcm_writei(self.c_pcm, c_data, n_frames)
             elif (ret == -errno.ESTRPIPE): # suspended
                 while True:
                     ret = self.libasound.snd_pcm_resume(self.c_pcm)
@@ -312,7 +325,8 @@ class pa_sound(object):
         return 0
 
     def write(self, pcm_data):
-        self.libpa.pa_simple_write(c_void_p(self.out), pcm_data, len(pcm_data), byref(self.error))
+        pcm_data, c_data, datalen = pcm_buffer(pcm_data)
+        self.libpa.pa_simple_write(c_void_p(self.out), c_data, c_size_t(datalen), byref(self.error))
         return self.error
 
     def drain(self):
@@ -375,17 +389,135 @@ class stdout_wrapper(object):
     def dump(self):
         pass
 
+# Adaptive playout buffer for interleaved S16 frames.  Frames are released on a
+# virtual playout clock started one target depth after the first frame of a call;
+# gaps are concealed with silence.  The target depth is re-evaluated at the start
+# of every call from the smoothed inter-arrival jitter.
+class jitter_buffer(object):
+    def __init__(self, target_ms, max_ms = JITTER_MAX_MS, rate = PCM_RATE):
+        self.frame_time = float(JITTER_FRAME) / rate
+        self.rate = rate
+        self.min_depth = max(1, int(round(target_ms / 1000.0 / self.frame_time)))
+        self.max_depth = max(self.min_depth, int(round(max_ms / 1000.0 / self.frame_time)))
+        self.slots = np.zeros((self.max_depth, MAX_SUPERFRAME_SIZE), dtype=np.int16)
+        self.lens = [0] * self.max_depth
+        self.silence = np.zeros(JITTER_FRAME * 2, dtype=np.int16)
+        self.target = self.min_depth
+        self.jitter = 0.0
+        self.frames = 0
+        self.underruns = 0
+        self.late = 0
+        self.overflows = 0
+        self.reset()
+
+    def reset(self):
+        self.head = 0
+        self.count = 0
+        self.next_due = None
+        self.last_arrival = None
+        self.gap = 0                # silence frames inserted since last real frame
+
+    def active(self):
+        return self.next_due is not None
+
+    def put(self, pcm, now):
+        n = len(pcm)
+        if n == 0:
+            return
+        self.frames += 1
+        if self.last_arrival is not None:
+            d = abs((now - self.last_arrival) - self.frame_time)
+            self.jitter += (d - self.jitter) * JITTER_ALPHA
+        self.last_arrival = now
+
+        if self.next_due is None:   # first frame of a call
+            self.target = min(self.max_depth, max(self.min_depth, int(np.ceil(JITTER_K * self.jitter / self.frame_time))))
+            self.next_due = now + self.target * self.frame_time
+        elif self.gap > 0:          # its slot has already been played out as silence
+            self.late += 1
+            self.gap -= 1
+            if self.count >= self.target:
+                return
+
+        if self.count == self.max_depth:
+            self.head = (self.head + 1) % self.max_depth
+            self.count -= 1
+            self.overflows += 1
+        idx = (self.head + self.count) % self.max_depth
+        n = min(n, MAX_SUPERFRAME_SIZE)
+        self.slots[idx, :n] = pcm[:n]
+        self.lens[idx] = n
+        self.count += 1
+
+    def timeout(self, now):
+        if self.next_due is None:
+            return None
+        return max(0.0, self.next_due - now)
+
+    def pop_due(self, now):
+        # returns the next frame whose playout time has arrived, else None
+        if self.next_due is None or now < self.next_due:
+            return None
+        if now - self.next_due > self.max_depth * self.frame_time:
+            self.next_due = now     # player stalled; don't burst the backlog
+        if self.count:
+            idx = self.head
+            frame = self.slots[idx, :self.lens[idx]]
+            self.head = (self.head + 1) % self.max_depth
+            self.count -= 1
+            self.gap = 0
+        else:
+            self.underruns += 1
+            self.gap += 1
+            if self.gap > self.max_depth:   # source went quiet without an end of call flag
+                self.underruns -= self.gap  # trailing silence was not an underrun
+                self.reset()
+                return None
+            frame = self.silence
+        self.next_due += len(frame) / 2.0 / self.rate
+        return frame
+
+    def flush(self):
+        # yields every buffered frame in order and returns the buffer to idle
+        while self.count:
+            idx = self.head
+            self.head = (self.head + 1) % self.max_depth
+            self.count -= 1
+            yield self.slots[idx, :self.lens[idx]]
+        self.reset()
+
+    def get_stats(self):
+        return {'frames': self.frames,
+                'underruns': self.underruns,
+                'late': self.late,
+                'overflows': self.overflows,
+                'depth': self.count,
+                'target': self.target,
+                'target_ms': self.target * self.frame_time * 1000.0,
+                'jitter_ms': self.jitter * 1000.0}
+
 # Main class that receives UDP audio samples and sends them to a PCM subsystem (currently ALSA or STDOUT)
 class socket_audio(object):
-    def __init__(self, udp_host, udp_port, pcm_device, two_channels = False, audio_gain = 1.0, dest_stdout = False, instance_name = "OP25", **kwds):
+    def __init__(self, udp_host, udp_port, pcm_device, two_channels = False, audio_gain = 1.0, dest_stdout = False, instance_name = "OP25", jitter_ms = 0, recorder = None, **kwds):
         self.keep_running = True
         self.two_channels = two_channels
+        self.udp_port = udp_port
+        self.recorder = recorder    # optional call_recorder tapping the received audio
+        self.jbuf = jitter_buffer(jitter_ms) if jitter_ms > 0 else None
         self.audio_gain = audio_gain
         self.dest_stdout = dest_stdout
         self.instance_name = instance_name
         self.sock_a = None
         self.sock_b = None
         self.pcm = None
+
+        # preallocated receive and playout buffers; reused for every datagram
+        self.rx_buf_a = bytearray(MAX_SUPERFRAME_SIZE)
+        self.rx_buf_b = bytearray(MAX_SUPERFRAME_SIZE)
+        self.rx_a = np.frombuffer(self.rx_buf_a, dtype=np.int16)
+        self.rx_b = np.frombuffer(self.rx_buf_b, dtype=np.int16)
+        self.scratch = np.empty(MAX_SUPERFRAME_SIZE // 2, dtype=np.float32)
+        self.pcm_out = np.zeros(MAX_SUPERFRAME_SIZE, dtype=np.int16)  # interleaved stereo
         if dest_stdout:
             pcm_device = "stdout"
             sys.stdout = os.fdopen(sys.stdout.fileno(), 'wb', 0) # reopen stdout with buffering disabled
@@ -415,17 +547,22 @@ class socket_audio(object):
 
     def run(self):
         rc = 0
+        socks = [self.sock_a, self.sock_b]
         while self.keep_running and (rc >= 0):
-            readable, writable, exceptional = select.select( [self.sock_a, self.sock_b], [], [self.sock_a, self.sock_b], 5.0)
-            in_a = None
-            in_b = None
-            data_a = bytearray()
-            data_b = bytearray()
+            timeout = 5.0
+            if self.jbuf is not None and self.jbuf.active():
+                timeout = self.jbuf.timeout(time.time())
+            readable, writable, exceptional = select.select(socks, [], socks, timeout)
+            len_a = -1
+            len_b = -1
             flag_a = -1
             flag_b = -1
 
             # Check for select() polling timeout and pcm self-check
             if (not readable) and (not writable) and (not exceptional):
+                if self.jbuf is not None and self.jbuf.active():
+                    rc = self.playout()
+                    continue
                 rc = self.pcm.check()
                 if isinstance(rc, ctypes.c_int):
                     rc = rc.value
@@ -433,76 +570,110 @@ class socket_audio(object):
 
             # Data received on the udp port is 320 bytes for an audio frame or 2 bytes for a flag
             if self.sock_a in readable:
-                in_a = self.sock_a.recvfrom(MAX_SUPERFRAME_SIZE)
+                len_a = self.sock_a.recv_into(self.rx_buf_a, MAX_SUPERFRAME_SIZE)
 
             if self.sock_b in readable:
-                in_b = self.sock_b.recvfrom(MAX_SUPERFRAME_SIZE)
-
-            if in_a is not None:
-                len_a = len(in_a[0])
-                if len_a == 2:
-                    flag_a = np.frombuffer(in_a[0], dtype=np.int16)[0]
-                elif len_a > 0:
-                    data_a = in_a[0]
-
-            if in_b is not None:
-                len_b = len(in_b[0])
-                if len_b == 2:
-                    flag_b = np.frombuffer(in_b[0], dtype=np.int16)[0]
-                elif len_b > 0:
-                    data_b = in_b[0]
+                len_b = self.sock_b.recv_into(self.rx_buf_b, MAX_SUPERFRAME_SIZE)
+
+            if self.recorder is not None:
+                if len_a > 2:
+                    self.recorder.audio(self.udp_port, bytes(self.rx_buf_a[:len_a]))
+                if len_b > 2:
+                    self.recorder.audio(self.udp_port + 2, bytes(self.rx_buf_b[:len_b]))
+
+            if len_a == 2:
+                flag_a = self.rx_a[0]
+            if len_b == 2:
+                flag_b = self.rx_b[0]
 
             if (flag_a == 0) or (flag_b == 0):
+                if self.jbuf is not None:
+                    rc = self.playout(flush=True)
+                    if rc < 0:
+                        continue
                 rc = self.pcm.drain()
                 if isinstance(rc, ctypes.c_int):
                     rc = rc.value
                 continue
 
             if (((flag_a == 1) and (flag_b == 1)) or
-                ((flag_a == 1) and (in_b is None)) or 
-                ((flag_b == 1) and (in_a is None))):
+                ((flag_a == 1) and (len_b < 0)) or 
+                ((flag_b == 1) and (len_a < 0))):
+                if self.jbuf is not None:
+                    self.jbuf.reset()
                 rc = self.pcm.drop()
                 if isinstance(rc, ctypes.c_int):
                     rc = rc.value
                 continue
 
+            # flags and empty datagrams carry no samples
+            data_a = self.rx_a[:len_a // 2] if len_a > 2 else self.rx_a[:0]
+            data_b = self.rx_b[:len_b // 2] if len_b > 2 else self.rx_b[:0]
+
             if not self.two_channels:
-                data_a = self.scale(data_a)
-                rc = self.pcm.write(self.interleave(data_a, data_a))
-                if isinstance(rc, ctypes.c_int):
-                    rc = rc.value
+                pcm_data = self.interleave(data_a, data_a)
             else:
-                data_a = self.scale(data_a)
-                data_b = self.scale(data_b)
-                rc = self.pcm.write(self.interleave(data_a, data_b))
-                if isinstance(rc, ctypes.c_int):
-                    rc = rc.value
+                pcm_data = self.interleave(data_a, data_b)
+            if self.jbuf is not None:
+                self.jbuf.put(pcm_data, time.time())
+                rc = self.playout()
+                continue
+            rc = self.pcm.write(pcm_data)
+            if isinstance(rc, ctypes.c_int):
+                rc = rc.value
 
         self.close_sockets()
         self.close_pcm()
         return
 
-    def scale(self, data):  # crude amplitude scaler (volume) for S16_LE samples
-        arr = np.array(np.frombuffer(data, dtype=np.int16), dtype=np.float32)
-        result = np.zeros(len(arr), dtype=np.int16)
-        if sys.version[0] == '2':
-            arr = np.clip(arr*self.audio_gain, -32767, 32766, out=result)
+    def playout(self, flush = False):  # write frames released by the jitter buffer
+        rc = 0
+        if flush:
+            frames = self.jbuf.flush()
         else:
-            arr = np.clip(arr*self.audio_gain, -32767, 32766, out=result, casting='unsafe')
-        return result.tobytes('C')
+            frames = iter(lambda: self.jbuf.pop_due(time.time()), None)
+        for frame in frames:
+            rc = self.pcm.write(frame)
+            if isinstance(rc, ctypes.c_int):
+                rc = rc.value
+            if rc < 0:
+                break
+        if flush and LOG_JITTER_STATS:
+            sys.stderr.write("%s jitter buffer: %s\n" % (log_ts.get(), self.get_stats()))
+        return rc
+
+    def get_stats(self):
+        if self.jbuf is None:
+            return None
+        return self.jbuf.get_stats()
+
+    def scale(self, data, out):  # crude amplitude scaler (volume) for S16_LE samples
+        n = len(data)
+        if self.audio_gain == 1.0:
+            np.clip(data, -32767, 32766, out=out)
+            return
+        work = self.scratch[:n]
+        np.multiply(data, self.audio_gain, out=work)
+        np.clip(work, -32767, 32766, out=work)
+        out[...] = work     # truncating float -> int16 conversion
 
     def interleave(self, data_a, data_b):
-        arr_a = np.frombuffer(data_a, dtype=np.int16)
-        arr_b = np.frombuffer(data_b, dtype=np.int16)
-        d_len = max(len(arr_a), len(arr_b))
-        result = np.zeros(d_len*2, dtype=np.int16)
-        if len(arr_a):
-            # copy arr_a to result[0,2,4, ...]
-            result[ range(0, len(arr_a)*2, 2) ] = arr_a
-        if len(arr_b):
-            # copy arr_b to result[1,3,5, ...]
-            result[ range(1, len(arr_b)*2, 2) ] = arr_b
-        return result.tobytes('C')
+        # scale int16 sample arrays directly into the preallocated stereo buffer
+        # and return a view of it; the view is only valid until the next call
+        n_a = len(data_a)
+        n_b = len(data_b)
+        d_len = max(n_a, n_b)
+        result = self.pcm_out[:d_len*2]
+        left = result[0::2]
+        right = result[1::2]
+        self.scale(data_a, left[:n_a])
+        left[n_a:] = 0
+        if data_b is data_a:
+            right[...] = left
+        else:
+            self.scale(data_b, right[:n_b])
+            right[n_b:] = 0
+        return result
 
     def stop(self):
         self.keep_running = False
@@ -546,11 +717,11 @@ class socket_audio(object):
         return
 
 class audio_thread(threading.Thread):
-    def __init__(self, udp_host, udp_port, pcm_device, two_channels = False, audio_gain = 1.0, dest_stdout = False, instance_name = "OP25", **kwds):
+    def __init__(self, udp_host, udp_port, pcm_device, two_channels = False, audio_gain = 1.0, dest_stdout = False, instance_name = "OP25", jitter_ms = 0, recorder = None, **kwds):
         threading.Thread.__init__(self, **kwds)
         self.setDaemon(True)
         self.keep_running = True
-        self.sock_audio = socket_audio(udp_host, udp_port, pcm_device, two_channels, audio_gain, dest_stdout, instance_name, **kwds)
+        self.sock_audio = socket_audio(udp_host, udp_port, pcm_device, two_channels, audio_gain, dest_stdout, instance_name, jitter_ms, recorder, **kwds)
         self.start()
         return
 
@@ -560,3 +731,5 @@ class audio_thread(threading.Thread):
     def stop(self):
         self.sock_audio.stop()
 
+    def get_stats(self):
+        return self.sock_audio.get_stats()
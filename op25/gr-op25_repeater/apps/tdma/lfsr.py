@@ -18,8 +18,22 @@
 # Software Foundation, Inc., 51 Franklin Street, Boston, MA
 # 02110-1301, USA.
 
-import numpy as np
-from bit_utils import *
+import os
+import sys
+import json
+
+XORMASK_BITS = 4320
+XORMASK_CACHE_FILE = 'p25p2_xormask.json'	# persistent mask cache, relative to the working directory
+
+# Initial state transform: M has ones at (i, i+k) for each k in M_OFFSETS.
+# Output bit j of reg*M is the parity of reg masked by column j.
+M_OFFSETS = (0, 4, 9, 15, 20, 34)
+M_COLUMNS = [sum(1 << (43 - i) for i in range(44) if (j - i) in M_OFFSETS) for j in range(44)]
+
+# cyc_reg() in Galois form: shift left, and when the bit shifted out (cy1) is set
+# xor it into the lsb of each of the six sub-registers
+REG_MASK = (1 << 44) - 1
+REG_TAPS = (1 << 40) | (1 << 35) | (1 << 29) | (1 << 24) | (1 << 10) | 1
 
 class p25p2_lfsr(object):
 	def __init__(self,nac,sysid,wacn):
@@ -48,56 +62,73 @@ class p25p2_lfsr(object):
 		return s1,s2,s3,s4,s5,s6
 
 	def cyc_reg(self, reg):
-		s1,s2,s3,s4,s5,s6 = self.disasm_reg(reg)
-		cy1 = (s1 >> 3) & 1
-		cy2 = (s2 >> 4) & 1
-		cy3 = (s3 >> 5) & 1
-		cy4 = (s4 >> 4) & 1
-		cy5 = (s5 >> 13) & 1
-		cy6 = (s6 >> 9) & 1
-		x1 = cy1 ^ cy2
-		x2 = cy1 ^ cy3
-		x3 = cy1 ^ cy4
-		x4 = cy1 ^ cy5
-		x5 = cy1 ^ cy6
-		s1 = (s1 << 1) & 0xf
-		s2 = (s2 << 1) & 0x1f
-		s3 = (s3 << 1) & 0x3f
-		s4 = (s4 << 1) & 0x1f
-		s5 = (s5 << 1) & 0x3fff
-		s6 = (s6 << 1) & 0x3ff
-		s1 = s1 | (x1 & 1)
-		s2 = s2 | (x2 & 1)
-		s3 = s3 | (x3 & 1)
-		s4 = s4 | (x4 & 1)
-		s5 = s5 | (x5 & 1)
-		s6 = s6 | (cy1 & 1)
-		return self.asm_reg(s1,s2,s3,s4,s5,s6)
+		if reg >> 43:
+			return ((reg << 1) & REG_MASK) ^ REG_TAPS
+		return (reg << 1) & REG_MASK
 
 	def mk_xor_bits(self, nac,sysid,wacn):
-		reg = np.int64(mk_array(16777216*wacn + 4096*sysid + nac, 44))
+		reg0 = (16777216*wacn + 4096*sysid + nac) & REG_MASK
+		reg = 0
+		for col in M_COLUMNS:
+			reg = (reg << 1) | (bin(reg0 & col).count('1') & 1)
+
+		s = [0] * XORMASK_BITS
+		for i in range(XORMASK_BITS):
+			if reg >> 43:
+				s[i] = 1
+				reg = ((reg << 1) & REG_MASK) ^ REG_TAPS
+			else:
+				reg = (reg << 1) & REG_MASK
+		return s
 
-		M = np.array(np.mat('1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0 0 0; 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0 0; 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0; 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0; 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0; 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1'))
-		reg = mk_int(np.dot(reg,M))
+class xormask_cache(object):
+	# Phase 2 xor masks keyed by (nac, sysid, wacn).  Masks are kept in memory and
+	# mirrored to a json file so they are not recomputed after a restart.
+	def __init__(self, filename = XORMASK_CACHE_FILE):
+		self.filename = filename
+		self.masks = None
 
-		s = []
-		for i in range(4320):
-			s.append((reg >> 43) & 1)
-			reg = self.cyc_reg(reg)
+	def key(self, nac, sysid, wacn):
+		return '%03x-%03x-%05x' % (nac, sysid, wacn)
 
-		return s
+	def load(self):
+		self.masks = {}
+		if self.filename is None or not os.access(self.filename, os.R_OK):
+			return
+		try:
+			with open(self.filename) as f:
+				d = json.load(f)
+			for k in d:
+				if len(d[k]) == XORMASK_BITS // 2 and set(d[k]) <= set('0123'):
+					self.masks[k] = ''.join([chr(int(c)) for c in d[k]])
+		except (IOError, OSError, ValueError, AttributeError, TypeError):
+			sys.stderr.write('xormask_cache: ignoring unreadable cache file %s\n' % self.filename)
 
-if __name__ == '__main__':
-	import sys
+	def save(self):
+		if self.filename is None:
+			return
+		d = {}
+		for k in self.masks:
+			d[k] = ''.join(['%d' % ord(c) for c in self.masks[k]])
+		tmp = '%s.tmp' % self.filename
+		try:
+			with open(tmp, 'w') as f:
+				json.dump(d, f)
+			os.replace(tmp, self.filename)		# readers never see a partial file
+		except (IOError, OSError):
+			sys.stderr.write('xormask_cache: unable to write cache file %s\n' % self.filename)
 
-	xor_cache = {}
-	params = {}
-	params['nac'] = 0x293
-	params['sysid'] = 0x18
-	params['wacn'] = 0x1
+	def get(self, nac, sysid, wacn):	# returns the mask as xor_chars
+		if self.masks is None:
+			self.load()
+		k = self.key(nac, sysid, wacn)
+		if k not in self.masks:
+			self.masks[k] = p25p2_lfsr(nac, sysid, wacn).xor_chars
+			self.save()
+		return self.masks[k]
 
-	hash = '%x%x%x' % (params['nac'], params['sysid'], params['wacn'])
-	if hash not in xor_cache:
-		xor_cache[hash] = p25p2_lfsr(params['nac'], params['sysid'], params['wacn']).xor_chars
+xor_masks = xormask_cache()
 
-	sys.stdout.write(xor_cache[hash])
+if __name__ == '__main__':
+	xor_masks.filename = None	# don't leave a cache file behind
+	sys.stdout.write(xor_masks.get(0x293, 0x18, 0x1))
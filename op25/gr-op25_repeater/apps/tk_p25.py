@@ -21,6 +21,8 @@
 #
 
 import sys
+import bisect
+import heapq
 import collections
 import ctypes
 import time
@@ -29,8 +31,10 @@ import codecs
 import ast
 import threading
 from helper_funcs import *
-from log_ts import log_ts
+from log_ts import log_ts, vclock
 from gnuradio import gr
+import event_journal
+import call_recorder
 import gnuradio.op25_repeater as op25_repeater
 
 #################
@@ -42,7 +46,7 @@ TGID_HOLD_TIME = 2.0     # Number of seconds to give previously active tgid excl
 TGID_SKIP_TIME = 4.0     # Number of seconds to blacklist a previously skipped tgid
 TGID_EXPIRY_TIME = 1.0   # Number of seconds to allow tgid to remain active with no updates received
 FREQ_EXPIRY_TIME = 1.2   # Number of seconds to allow freq to remain active with no updates received
-EXPIRY_TIMER = 0.2       # Number of seconds between checks for tgid/freq expiry
+EXPIRY_TIMER = 0.2       # Number of seconds before re-checking a freq whose tgid is still being followed
 PATCH_EXPIRY_TIME = 20.0 # Number of seconds until patch expiry
 CLEANUP_TIMER = 0.5       # Number of seconds between cleanup intervals
 
@@ -83,6 +87,7 @@ def add_default_tgid(tgs, tgid):
         tgs[tgid]['algid'] = -1
         tgs[tgid]['keyid'] = -1
         tgs[tgid]['receiver'] = None
+        tgs[tgid]['order'] = len(tgs) - 1   # insertion order used to break priority ties
 
 def add_default_rid(srcids, rid):
     if srcids is None:
@@ -117,7 +122,9 @@ class rx_ctl(object):
         self.receivers = {}
         self.systems = {}
         self.chans = chans
-        self.cleanup_timer = time.time()
+        self.cleanup_timer = vclock.time()
+        self.status_json = (None, None)     # (system status serials, serialized trunk_update)
+        self.chan_status_json = (None, None) # (receiver status keys, serialized channel_update)
 
         for chan in self.chans:
             sysname = chan['sysname']
@@ -168,34 +175,45 @@ class rx_ctl(object):
 
     # process_qmsg is the main message dispatch handler connecting the 'radios' to python
     def process_qmsg(self, msg):
-        curr_time = time.time()
-        m_proto = ctypes.c_int16(msg.type() >> 16).value    # upper 16 bits of msg.type() is signed protocol
-        if m_proto != 0: # P25 m_proto=0
-            return
+        self.process_qmsgs([msg])
+
+    # process_qmsgs handles all messages delivered by a single queue wakeup; receiver
+    # assignment checks are made once per batch instead of once per message
+    def process_qmsgs(self, msgs):
+        curr_time = vclock.time()
+        updated_systems = []
+        for msg in msgs:
+            m_proto = ctypes.c_int16(msg.type() >> 16).value    # upper 16 bits of msg.type() is signed protocol
+            if m_proto != 0: # P25 m_proto=0
+                continue
 
-        m_type = ctypes.c_int16(msg.type() & 0xffff).value  # lower 16 bits is p25 duid
-        m_rxid = int(msg.arg1()) >> 1                       # receiver's msgq_id
-        m_ts = float(msg.arg2())                            # receive timestamp from frame_assembler
+            m_type = ctypes.c_int16(msg.type() & 0xffff).value  # lower 16 bits is p25 duid
+            m_rxid = int(msg.arg1()) >> 1                       # receiver's msgq_id
+            m_ts = float(msg.arg2())                            # receive timestamp from frame_assembler
 
-        updated = 0
-        if m_rxid in self.receivers and self.receivers[m_rxid]['rx_rcvr'] is not None:
-            if m_type in [7, 12, 18, 19]:                                                   # send signaling messages to p25_system object
-                updated += self.systems[self.receivers[m_rxid]['sysname']]['system'].process_qmsg(msg, curr_time)
-            else:
-                updated += self.receivers[m_rxid]['rx_rcvr'].process_qmsg(msg, curr_time)   # send in-call messaging to p25_receiver objects
+            updated = 0
+            if m_rxid in self.receivers and self.receivers[m_rxid]['rx_rcvr'] is not None:
+                if m_type in [7, 12, 18, 19]:                                                   # send signaling messages to p25_system object
+                    updated += self.systems[self.receivers[m_rxid]['sysname']]['system'].process_qmsg(msg, curr_time)
+                else:
+                    updated += self.receivers[m_rxid]['rx_rcvr'].process_qmsg(msg, curr_time)   # send in-call messaging to p25_receiver objects
+
+                if updated > 0 and self.receivers[m_rxid]['sysname'] not in updated_systems:
+                    updated_systems.append(self.receivers[m_rxid]['sysname'])
 
-            if updated > 0:
-                # Check for voice receiver assignments
-                for rx in self.systems[self.receivers[m_rxid]['sysname']]['receivers']:
+        if len(updated_systems) > 0:
+            # Check for voice receiver assignments
+            for sysname in updated_systems:
+                for rx in self.systems[sysname]['receivers']:
                     rx.scan_for_talkgroups(curr_time)
 
-                # Check for control channel reassignment
-                self.check_cc_assignments()
+            # Check for control channel reassignment
+            self.check_cc_assignments()
 
         if curr_time > (self.cleanup_timer + CLEANUP_TIMER):
             for rcvr in self.receivers:
                 if self.receivers[rcvr]['rx_rcvr'] is not None:
-                    self.receivers[rcvr]['rx_rcvr'].check_expired_hold(time.time())
+                    self.receivers[rcvr]['rx_rcvr'].check_expired_hold(vclock.time())
             self.cleanup_timer = curr_time
 
     # Check for control channel assignments to idle receivers
@@ -220,20 +238,28 @@ class rx_ctl(object):
 
     # ui_command handles all requests from user interface
     def ui_command(self, cmd, data, msgq_id):
-        curr_time = time.time()
+        curr_time = vclock.time()
         if msgq_id in self.receivers and self.receivers[msgq_id]['rx_rcvr'] is not None:
             self.receivers[msgq_id]['rx_rcvr'].ui_command(cmd = cmd, data = data, curr_time = curr_time)    # Dispatch message to the intended receiver
         # Check for control channel reassignment
         self.check_cc_assignments()
 
     def to_json(self):
+        snapshots = [self.systems[system]['system'].to_dict() for system in self.systems]
+        serials = [self.systems[system]['system'].status_serial for system in self.systems]
+        cached_serials, js = self.status_json
+        if serials == cached_serials:
+            return js                           # no system has changed since last serialized
+
         d = {'json_type': 'trunk_update'}
         syid = 0;
-        for system in self.systems:
-            d[syid] = json.loads(self.systems[system]['system'].to_json())
+        for snapshot in snapshots:
+            d[syid] = snapshot
             syid += 1
         d['nac'] = 0
-        return json.dumps(d)
+        js = json.dumps(d)
+        self.status_json = (serials, js)
+        return js
 
     def dump_tgids(self):
         for system in self.systems:
@@ -242,17 +268,25 @@ class rx_ctl(object):
             self.systems[system]['system'].dump_rids()
             self.systems[system]['system'].sourceid_history.dump()
 
-    def get_chan_status(self):
+    def get_chan_status_dict(self):
         d = {'json_type': 'channel_update'}
         rcvr_ids = []
         for rcvr in self.receivers:
             if self.receivers[rcvr]['rx_rcvr'] is not None:
                 rcvr_name = from_dict(self.receivers[rcvr]['config'], 'name', "")
-                d[str(rcvr)] = json.loads(self.receivers[rcvr]['rx_rcvr'].get_status())
+                d[str(rcvr)] = self.receivers[rcvr]['rx_rcvr'].get_status_dict()
                 d[str(rcvr)]['name'] = rcvr_name
                 rcvr_ids.append(str(rcvr))
         d['channels'] = rcvr_ids
-        return json.dumps(d)
+        return d
+
+    def get_chan_status(self):
+        keys = [(rcvr, self.receivers[rcvr]['rx_rcvr'].status_key()) for rcvr in self.receivers if self.receivers[rcvr]['rx_rcvr'] is not None]
+        cached_keys, js = self.chan_status_json
+        if keys != cached_keys:                 # only rebuild and re-encode when a channel has changed
+            js = json.dumps(self.get_chan_status_dict())
+            self.chan_status_json = (keys, js)
+        return js
 
     def set_debug(self, dbglvl):
         self.debug = dbglvl
@@ -273,11 +307,15 @@ class p25_system(object):
         self.voice_frequencies = {}
         self.talkgroups = {}
         self.talkgroups_mutex = threading.Lock()
+        self.active_tgids = []          # (prio, order, tgid) of recently updated talkgroups, kept sorted
+        self.active_tgid_set = set()
         self.sourceids = {}
         self.sourceid_history = rid_history(self.sourceids, 10)
         self.patches = {}
         self.patches_mutex = threading.Lock()
-        self.blacklist = {}
+        self.freq_expiry = deadline_scheduler()
+        self.patch_expiry = deadline_scheduler()
+        self.blacklist = id_list()
         self.whitelist = None
         self.crypt_behavior = 1
         self.crypt_keys = {}
@@ -304,9 +342,12 @@ class p25_system(object):
         self.sysname = config['sysname']
         self.callsign = ""
         self.nac = int(ast.literal_eval(from_dict(config, "nac", "0")))
-        self.last_expiry_check = 0.0
         self.stats = {}
         self.stats['tsbk_count'] = 0
+        self.status_serial = 0          # bumped whenever state reported by to_dict() changes
+        self.status_snapshot = (None, None)
+        self.status_top_line = ""       # top_line of the snapshot less its tsbk count
+        self.status_freqs = []          # (frequency, chan_type, f_type) listed in the snapshot
 
         sys.stderr.write("%s [%s] Initializing P25 system\n" % (log_ts.get(), self.sysname))
 
@@ -474,6 +515,7 @@ class p25_system(object):
             return None 
 
     def next_cc(self):
+        self.status_serial += 1
         self.cc_retries = 0
         self.cc_index += 1
         if self.cc_index >= len(self.cc_list):
@@ -528,6 +570,7 @@ class p25_system(object):
         nac = get_ordinals(s[:2])                           # first two bytes are NAC
         self.set_nac(nac)
         s = s[2:]
+        status_fields = self.status_fields()
 
         updated = 0
         if m_type == 7:                                     # TSBK
@@ -555,11 +598,23 @@ class p25_system(object):
             updated += self.decode_fdma_lcw(m_rxid, s, curr_time)
 
         updated += self.expire_patches()
+        if self.status_fields() != status_fields:
+            self.status_serial += 1
         return updated
 
+    # site and network fields shown by to_dict(), compared across each message to detect changes
+    def status_fields(self):
+        return (self.nac, self.callsign, self.rfss_syid, self.rfss_rfid, self.rfss_stid, self.rfss_chan, self.rfss_txchan,
+                self.ns_syid, self.ns_wacn, len(self.secondary))
+
+    def set_adjacent_data(self, f, data):
+        if self.adjacent_data.get(f) != data:
+            self.adjacent_data[f] = data
+            self.status_serial += 1
+
     def decode_mbt_data(self, m_rxid, opcode, src, header, mbt_data):
         self.cc_timeouts = 0
-        self.last_tsbk = time.time()
+        self.last_tsbk = vclock.time()
         self.stats['tsbk_count'] += 1
         updated = 0
         if opcode == 0x0:  # grp voice channel grant
@@ -607,7 +662,7 @@ class p25_system(object):
             f2 = self.channel_id_to_frequency(ch2)
             if f1 and f2:
                 self.adjacent[f1] = 'rfid: %d stid:%d uplink:%f' % (rfid, stid, f2 / 1000000.0)
-                self.adjacent_data[f1] = {'rfid': rfid, 'stid':stid, 'uplink': f2, 'table': None}
+                self.set_adjacent_data(f1, {'rfid': rfid, 'stid':stid, 'uplink': f2, 'table': None})
             if self.debug >= 10:
                 sys.stderr.write('%s [%d] mbt(0x3c) adj_sts_bcst: syid: %x rfid: %x stid: %x ch1: %x ch2: %x f1: %s f2: %s\n' % (log_ts.get(), m_rxid, syid, rfid, stid, ch1, ch2, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2)))
         elif opcode == 0x3b:  # network status
@@ -648,7 +703,7 @@ class p25_system(object):
 
     def decode_tsbk(self, m_rxid, tsbk):
         self.cc_timeouts = 0
-        self.last_tsbk = time.time()
+        self.last_tsbk = vclock.time()
         self.stats['tsbk_count'] += 1
         updated = 0
         tsbk = tsbk << 16    # for missing crc
@@ -931,7 +986,7 @@ class p25_system(object):
             f1 = self.channel_id_to_frequency(ch1)
             if f1 and table in self.freq_table:
                 self.adjacent[f1] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (rfid, stid, (f1 + self.freq_table[table]['offset']) / 1000000.0, table)
-                self.adjacent_data[f1] = {'rfid': rfid, 'stid':stid, 'uplink': f1 + self.freq_table[table]['offset'], 'table': table}
+                self.set_adjacent_data(f1, {'rfid': rfid, 'stid':stid, 'uplink': f1 + self.freq_table[table]['offset'], 'table': table})
             if self.debug >= 10:
                 sys.stderr.write('%s [%d] tsbk(0x3c) adj_sts_bcst: rfid: %x stid: %d ch1: %x(%s)\n' %(log_ts.get(), m_rxid, rfid, stid, ch1, self.channel_id_to_string(ch1)))
                 if table in self.freq_table:
@@ -942,7 +997,7 @@ class p25_system(object):
         return updated
 
     def decode_tdma_ptt(self, m_rxid, msg, curr_time):
-        self.last_tsbk = time.time()
+        self.last_tsbk = vclock.time()
         self.stats['tsbk_count'] += 1
         mi    = get_ordinals(msg[0:9])
         algid = get_ordinals(msg[9:10])
@@ -954,7 +1009,7 @@ class p25_system(object):
         return self.update_talkgroup_srcaddr(curr_time, ga, sa)
 
     def decode_tdma_endptt(self, m_rxid, msg, curr_time):
-        self.last_tsbk = time.time()
+        self.last_tsbk = vclock.time()
         self.stats['tsbk_count'] += 1
         mi    = get_ordinals(msg[0:9])
         sa    = get_ordinals(msg[12:15])
@@ -966,7 +1021,7 @@ class p25_system(object):
     def decode_tdma_msg(self, m_rxid, msg, curr_time):
         updated = 0
         self.cc_timeouts = 0
-        self.last_tsbk = time.time()
+        self.last_tsbk = vclock.time()
         self.stats['tsbk_count'] += 1
         mfid = 0
         op = get_ordinals(msg[:1])
@@ -1272,7 +1327,7 @@ class p25_system(object):
             f     = self.channel_id_to_frequency(ch_t)
             if f and table in self.freq_table:
                 self.adjacent[f] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (rfid, stid, (f + self.freq_table[table]['offset']) / 1000000.0, table)
-                self.adjacent_data[f] = {'rfid': rfid, 'stid':stid, 'uplink': f + self.freq_table[table]['offset'], 'table': table}
+                self.set_adjacent_data(f, {'rfid': rfid, 'stid':stid, 'uplink': f + self.freq_table[table]['offset'], 'table': table})
             if self.debug >= 10:
                 sys.stderr.write('%s [%d] tdma(0xfc) adj_sts_bcst: syid: %x rfid: %x stid: %x ch %x(%s)\n' % (log_ts.get(), m_rxid, syid, rfid, stid, ch_t, self.channel_id_to_string(ch_t)))
                 if table in self.freq_table:
@@ -1288,7 +1343,7 @@ class p25_system(object):
             f     = self.channel_id_to_frequency(ch_t)
             if f and table in self.freq_table:
                 self.adjacent[f] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (rfid, stid, (f + self.freq_table[table]['offset']) / 1000000.0, table)
-                self.adjacent_data[f] = {'rfid': rfid, 'stid':stid, 'uplink': f + self.freq_table[table]['offset'], 'table': table}
+                self.set_adjacent_data(f, {'rfid': rfid, 'stid':stid, 'uplink': f + self.freq_table[table]['offset'], 'table': table})
             if self.debug >= 10:
                 sys.stderr.write('%s [%d] tdma(0xfe) adj_sts_bcst: wacn: %x syid: %x rfid: %x stid: %x ch %x(%s)\n' % (log_ts.get(), m_rxid, wacn, syid, rfid, stid, ch_t, self.channel_id_to_string(ch_t)))
                 if table in self.freq_table:
@@ -1301,7 +1356,7 @@ class p25_system(object):
 
     def decode_fdma_lcw(self, m_rxid, msg, curr_time):
         updated = 0
-        self.last_tsbk = time.time()
+        self.last_tsbk = vclock.time()
         self.stats['tsbk_count'] += 1
         pb_sf_lco = get_ordinals(msg[0:1])
 
@@ -1390,6 +1445,8 @@ class p25_system(object):
             self.voice_frequencies[frequency] = {'counter':0}
             sorted_freqs = collections.OrderedDict(sorted(self.voice_frequencies.items()))
             self.voice_frequencies = sorted_freqs
+            event_journal.log('new_freq', sys=self.sysname, freq=frequency)
+            self.status_serial += 1
             if self.debug >= 5:
                 sys.stderr.write('%s [%s] new freq=%f\n' % (log_ts.get(), self.sysname, frequency/1000000.0))
         if 'tgid' not in self.voice_frequencies[frequency]:
@@ -1402,7 +1459,7 @@ class p25_system(object):
                 self.voice_frequencies[prev_freq]['tgid'] = [None, None]
             else:
                 self.voice_frequencies[prev_freq]['tgid'][prev_slot] = None
-        curr_time = time.time()
+        curr_time = vclock.time()
         self.voice_frequencies[frequency]['time'] = curr_time
         self.voice_frequencies[frequency]['counter'] += 1
         if tdma_slot is None:   # FDMA mark both slots with same info
@@ -1416,18 +1473,22 @@ class p25_system(object):
                 sys.stderr.write("%s [%s] VF ts ph2: tgid: %s, freq: %f, slot: %s\n" % (log_ts.get(), self.sysname, tgid, frequency/1000000.0, tdma_slot))
             self.voice_frequencies[frequency]['tgid'][tdma_slot] = tgid
             self.voice_frequencies[frequency]['ts'][tdma_slot] = curr_time
+        for slot in ([0, 1] if tdma_slot is None else [tdma_slot]):
+            self.freq_expiry.schedule((frequency, slot), curr_time + FREQ_EXPIRY_TIME)
 
     def expire_voice_frequencies(self, curr_time):
-        if curr_time < self.last_expiry_check + EXPIRY_TIMER:
-            return
-        self.last_expiry_check = curr_time
-        for frequency in self.voice_frequencies:
-            for slot in [0, 1]:
-                tgid = self.voice_frequencies[frequency]['tgid'][slot]
-                if tgid is not None and self.talkgroups[tgid]['receiver'] is None and curr_time >= self.voice_frequencies[frequency]['ts'][slot] + FREQ_EXPIRY_TIME:
-                    if self.debug >= 10:
-                        sys.stderr.write("%s [%s] VF expire: tgid: %s, freq: %f, slot: %s, ts: %s\n" % (log_ts.get(), self.sysname, tgid, frequency/1000000.0, slot, log_ts.get(self.voice_frequencies[frequency]['ts'][slot])))
-                    self.voice_frequencies[frequency]['tgid'][slot] = None
+        for frequency, slot in self.freq_expiry.pop_due(curr_time):
+            tgid = self.voice_frequencies[frequency]['tgid'][slot]
+            if tgid is None:
+                continue
+            if self.talkgroups[tgid]['receiver'] is not None:   # call still being followed; look again later
+                self.freq_expiry.schedule((frequency, slot), curr_time + EXPIRY_TIMER)
+                continue
+            if curr_time >= self.voice_frequencies[frequency]['ts'][slot] + FREQ_EXPIRY_TIME:
+                if self.debug >= 10:
+                    sys.stderr.write("%s [%s] VF expire: tgid: %s, freq: %f, slot: %s, ts: %s\n" % (log_ts.get(), self.sysname, tgid, frequency/1000000.0, slot, log_ts.get(self.voice_frequencies[frequency]['ts'][slot])))
+                self.voice_frequencies[frequency]['tgid'][slot] = None
+                self.status_serial += 1
 
     def update_talkgroups(self, frequency, tgid, tdma_slot, srcaddr, svcopts):
         self.update_talkgroup(frequency, tgid, tdma_slot, srcaddr, svcopts)
@@ -1449,9 +1510,15 @@ class p25_system(object):
         
             if tgid not in self.talkgroups:
                 add_default_tgid(self.talkgroups, tgid)
+                event_journal.log('new_tgid', sys=self.sysname, tg=tgid)
                 if self.debug >= 5:
                     sys.stderr.write('%s [%s] new tgid=%s %s prio %d\n' % (log_ts.get(), self.sysname, tgid, self.talkgroups[tgid]['tag'], self.talkgroups[tgid]['prio']))
-            self.talkgroups[tgid]['time'] = time.time()
+            curr_time = vclock.time()
+            if (frequency != self.talkgroups[tgid]['frequency'] or tdma_slot != self.talkgroups[tgid]['tdma_slot'] or
+                curr_time > self.talkgroups[tgid]['time'] + TGID_EXPIRY_TIME):    # journal the first grant of a call, not every repeat
+                event_journal.log('grant', sys=self.sysname, tg=tgid, rid=(srcaddr or None), freq=frequency, slot=tdma_slot)
+            self.talkgroups[tgid]['time'] = curr_time
+            self.activate_talkgroup(tgid)
             self.talkgroups[tgid]['counter'] += 1
             self.talkgroups[tgid]['frequency'] = frequency
             self.talkgroups[tgid]['tdma_slot'] = tdma_slot
@@ -1464,6 +1531,20 @@ class p25_system(object):
                 else:
                     self.talkgroups[tgid]['srcaddr'] = srcaddr
 
+    # activate_talkgroup adds tgid to the priority ordered index of active talkgroups (talkgroups_mutex must be held)
+    def activate_talkgroup(self, tgid):
+        if tgid in self.active_tgid_set:
+            return
+        self.active_tgid_set.add(tgid)
+        bisect.insort(self.active_tgids, (self.talkgroups[tgid]['prio'], self.talkgroups[tgid]['order'], tgid))
+
+    # get_active_talkgroups returns the index pruned of talkgroups not updated since start_time (talkgroups_mutex must be held)
+    def get_active_talkgroups(self, start_time):
+        if any(self.talkgroups[tg[2]]['time'] < start_time for tg in self.active_tgids):
+            self.active_tgids = [tg for tg in self.active_tgids if self.talkgroups[tg[2]]['time'] >= start_time]
+            self.active_tgid_set = set(tg[2] for tg in self.active_tgids)
+        return self.active_tgids
+
     def update_talkgroup_srcaddr(self, curr_time, tgid, srcaddr, svcopts=None):
         if (tgid is None or tgid <= 0 or srcaddr is None or srcaddr <= 0 or
             tgid not in self.talkgroups or self.talkgroups[tgid]['receiver'] is None):
@@ -1472,6 +1553,9 @@ class p25_system(object):
         with self.talkgroups_mutex:
             if svcopts is not None:
                 self.talkgroups[tgid]['svcopts'] = svcopts
+            if srcaddr != self.talkgroups[tgid]['srcaddr']:
+                event_journal.log('rid', sys=self.sysname, tg=tgid, rid=srcaddr)
+                call_recorder.call_update(self.talkgroups[tgid]['receiver'].msgq_id, srcaddr)
             self.talkgroups[tgid]['srcaddr'] = srcaddr
             add_default_rid(self.sourceids, srcaddr)
             self.sourceids[srcaddr]['counter'] += 1
@@ -1484,10 +1568,6 @@ class p25_system(object):
         return 1
 
     def expire_talkgroups(self, curr_time):
-        if curr_time < self.last_expiry_check + EXPIRY_TIMER:
-            return
-
-        self.last_expiry_check = curr_time
         tg_expire_list = []
         # done in two steps so the critical sections can be decoupled
         # step 1 - build an expiry list with the talkgroups_mutex locked
@@ -1508,18 +1588,22 @@ class p25_system(object):
             if sg not in self.patches:
                 self.patches[sg] = {}
                 self.patches[sg]['ga'] = set()
-                self.patches[sg]['ts'] = time.time()
+                self.patches[sg]['ts'] = vclock.time()
 
             for ga in ga_list:
                 if (ga != sg):
-                    self.patches[sg]['ts'] = time.time() # update timestamp
+                    self.patches[sg]['ts'] = vclock.time() # update timestamp
                     if ga not in self.patches[sg]['ga']:
                         self.patches[sg]['ga'].add(ga)
+                        self.status_serial += 1
                         if self.debug >= 5:
                             sys.stderr.write("%s [%s] add_patch: tgid(%d) is patched to sg(%d)\n" % (log_ts.get(), self.sysname, ga, sg))
 
             if len(self.patches[sg]['ga']) == 0:
                 del self.patches[sg]
+                self.patch_expiry.cancel(sg)
+            else:
+                self.patch_expiry.schedule(sg, self.patches[sg]['ts'] + PATCH_EXPIRY_TIME)
 
     def del_patch(self, sg, ga_list):
         if sg not in self.patches:
@@ -1529,24 +1613,32 @@ class p25_system(object):
             for ga in ga_list:
                 if ga in self.patches[sg]['ga']:
                     self.patches[sg]['ga'].discard(ga)
+                    self.status_serial += 1
                     if self.debug >= 5:
                         sys.stderr.write("%s [%s] del_patch: tgid(%d) is unpatched from sg(%d)\n" % (log_ts.get(), self.sysname, ga, sg))
 
             if (sg in ga_list) or (len(self.patches[sg]['ga']) == 0):
                 del self.patches[sg]
+                self.patch_expiry.cancel(sg)
+                self.status_serial += 1
                 if self.debug >= 5:
                     sys.stderr.write("%s del_patch: deleting patch sg(%d)\n" % (log_ts.get(), sg))
 
     def expire_patches(self):
         updated = 0
         with self.patches_mutex:
-            time_now = time.time()
-            for sg in list(self.patches):
+            time_now = vclock.time()
+            for sg in self.patch_expiry.pop_due(time_now):
+                if sg not in self.patches:
+                    continue
                 if time_now > (self.patches[sg]['ts'] + PATCH_EXPIRY_TIME):
                     updated += 1
                     del self.patches[sg]
                     if self.debug >= 5:
                         sys.stderr.write("%s [%s] expire_patches: expiring patch sg(%d)\n" % (log_ts.get(), self.sysname, sg))
+                else:
+                    self.patch_expiry.schedule(sg, self.patches[sg]['ts'] + PATCH_EXPIRY_TIME)
+            self.status_serial += updated
         return updated
 
     def get_rid_tag(self, srcaddr):
@@ -1574,19 +1666,35 @@ class p25_system(object):
         sys.stderr.write("}\n") 
 
     def to_json(self):  # ugly but required for compatibility with P25 trunking and terminal modules
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):  # rebuilds the snapshot only after status_serial moves, otherwise refreshes its times and counters
+        t = vclock.time()
+        self.expire_voice_frequencies(t)
+        self.expire_patches()
+        if self.status_snapshot[0] != self.status_serial:
+            self.status_snapshot = (self.status_serial, self.build_status())
+        d = self.status_snapshot[1]
+        if self.refresh_status(d, t):
+            self.status_serial += 1     # displayed values moved, callers compare serials to see it
+            self.status_snapshot = (self.status_serial, d)
+        return d
+
+    def build_status(self):
         wacn_system_id_str = "%05X.%03X" % (self.ns_wacn, self.ns_syid) if self.ns_syid is not None else "---------"
         rfss_site_id_str   = "%d.%d" % (self.rfss_rfid, self.rfss_stid) if (self.rfss_rfid is not None and self.rfss_stid is not None) else "--"
 
+        self.status_top_line  = 'P25'
+        self.status_top_line += ' %s' % self.callsign if self.callsign != "" else ''
+        self.status_top_line += '  System %s' % (wacn_system_id_str)
+        self.status_top_line += '  Site %s' % (rfss_site_id_str)
+        self.status_top_line += '  NAC %3X' % (self.nac)
+        self.status_top_line += '  CC %f' % ((self.rfss_chan if self.rfss_chan is not None else self.cc_list[self.cc_index]) / 1e6)
+
         d = {}
         d['type']           = 'p25'
         d['system']         = self.sysname
-        d['top_line']       = 'P25'
-        d['top_line']      += ' %s' % self.callsign if self.callsign != "" else ''
-        d['top_line']      += '  System %s' % (wacn_system_id_str)
-        d['top_line']      += '  Site %s' % (rfss_site_id_str)
-        d['top_line']      += '  NAC %3X' % (self.nac)
-        d['top_line']      += '  CC %f' % ((self.rfss_chan if self.rfss_chan is not None else self.cc_list[self.cc_index]) / 1e6)
-        d['top_line']      += '  tsbks %d' % (self.stats['tsbk_count'])
+        d['top_line']       = None      # filled in by refresh_status()
         d['callsign']       = self.callsign
         d['nac']            = self.nac
         d['syid']           = self.rfss_syid
@@ -1600,28 +1708,59 @@ class p25_system(object):
         d['frequencies']    = {}
         d['frequency_data'] = {}
         d['patch_data']     = {}
-        d['last_tsbk']      = self.last_tsbk
-
-        t = time.time()
+        d['last_tsbk']      = None
 
         # Get all current frequencies we know about (CC, alternate CC, VC)
-        self.expire_voice_frequencies(t)
         all_freqs = list(self.voice_frequencies.keys()) + list(self.secondary.keys())
         if self.rfss_chan != None:
             all_freqs += [int(self.rfss_chan)]
 
+        self.status_freqs = []
         for f in all_freqs:
-            # Type-specific parameters
-            time_ago = None
-            count = 0
             if f in self.voice_frequencies:
                 chan_type = "voice"
-                time_ago = t - self.voice_frequencies[f]['time']
-                count = self.voice_frequencies[f]['counter']
             if f in self.secondary:
                 chan_type = "alternate"
             if f == self.rfss_chan:
                 chan_type = "control"
+            if chan_type == "control":
+                f_type = "pri-cc"
+            elif chan_type == "alternate":
+                f_type = "alt-cc"
+            else:
+                f_type = "voice "
+            self.status_freqs.append((f, chan_type, f_type))
+
+        # Patches
+        for sg in sorted(self.patches.keys()):
+            d['patch_data'][sg] = {}
+            for ga in sorted(self.patches[sg]['ga']):
+                sg_dec = "%5d" % (sg)
+                ga_dec = "%5d" % (ga)
+                d['patch_data'][sg][ga] = {'sg': sg_dec, 'ga': ga_dec}
+
+        # Adjacent sites
+        d['adjacent_data'] = self.adjacent_data
+
+        return d
+
+    # refresh_status updates the time and counter fields of a snapshot in place, returns True if any changed
+    def refresh_status(self, d, t):
+        changed = False
+        top_line = self.status_top_line + '  tsbks %d' % (self.stats['tsbk_count'])
+        if d['top_line'] != top_line or d['last_tsbk'] != self.last_tsbk:
+            d['top_line'] = top_line
+            d['last_tsbk'] = self.last_tsbk
+            changed = True
+
+        for f, chan_type, f_type in self.status_freqs:
+            # Type-specific parameters
+            time_ago = None
+            count = 0
+            if f in self.voice_frequencies:
+                time_ago = t - self.voice_frequencies[f]['time']
+                count = self.voice_frequencies[f]['counter']
+            if chan_type == "control":
                 time_ago = t - self.last_tsbk
                 count = self.stats['tsbk_count']
 
@@ -1643,25 +1782,15 @@ class p25_system(object):
             else:
                 time_ago_str = "%4.1fd" % (time_ago / 60.0 / 60.0 / 24.0)
 
+            # The easy part: send pure JSON and let the display layer handle formatting
+            frequency_data = {'type': chan_type, 'tgids': tgids, 'last_activity': time_ago_str, 'counter': count}
+            if d['frequency_data'].get(f) == frequency_data:
+                continue
+            d['frequency_data'][f] = frequency_data
+            changed = True
+
             # Format here to show in theses console viewer
             time_ago_ncurses_str = time_ago_str + " ago" if time_ago_str != "Never" and time_ago_str != "  Now" else time_ago_str + "    "
-
-            #if chan_type == "control":
-            #    d['frequencies'][f] = '- %f       [--- Control ---]  %s' % ((f / 1e6), time_ago_ncurses_str)
-            #elif chan_type == "alternate" and len(tgids) == 0:
-            #    d['frequencies'][f] = '- %f  tgid [   Secondary   ]  %s  count %d' % ((f / 1e6), time_ago_ncurses_str, count)
-            #elif len(tgids) == 1 or (len(tgids) == 2 and tgids[0] == tgids[1]):
-            #    d['frequencies'][f] = '- %f  tgid [     %5s     ]  %s  count %d' % ((f / 1e6), tgids[0], time_ago_ncurses_str, count)
-            #elif len(tgids) == 2:
-            #    d['frequencies'][f] = '- %f  tgid [ %5s | %5s ]  %s  count %d' % ((f / 1e6), tgids[1], tgids[0], time_ago_ncurses_str, count)
-            #else:
-            #    d['frequencies'][f] = '- %f  tgid [               ]  %s  count %d' % ((f / 1e6), time_ago_ncurses_str, count)
-            if chan_type == "control":
-                f_type = "pri-cc"
-            elif chan_type == "alternate":
-                f_type = "alt-cc"
-            else:
-                f_type = "voice "
             if len(tgids) == 1 or (len(tgids) == 2 and tgids[0] == tgids[1]):
                 d['frequencies'][f] = '- %f  %s [     %5s     ]  %s  count %d' % ((f / 1e6), f_type, tgids[0], time_ago_ncurses_str, count)
             elif len(tgids) == 2:
@@ -1669,22 +1798,49 @@ class p25_system(object):
             else:
                 d['frequencies'][f] = '- %f  %s [               ]  %s  count %d' % ((f / 1e6), f_type, time_ago_ncurses_str, count)
 
-            # The easy part: send pure JSON and let the display layer handle formatting
-            d['frequency_data'][f] = {'type': chan_type, 'tgids': tgids, 'last_activity': time_ago_str, 'counter': count}
-
-        # Patches
-        self.expire_patches()
-        for sg in sorted(self.patches.keys()):
-            d['patch_data'][sg] = {}
-            for ga in sorted(self.patches[sg]['ga']):
-                sg_dec = "%5d" % (sg)
-                ga_dec = "%5d" % (ga)
-                d['patch_data'][sg][ga] = {'sg': sg_dec, 'ga': ga_dec}
-
-        # Adjacent sites
-        d['adjacent_data'] = self.adjacent_data
+        return changed
 
-        return json.dumps(d)
+#################
+# Deadline scheduler class
+#   min-heap of expiry deadlines so that housekeeping only visits entries which are due;
+#   a deadline pushed back by an update is re-queued lazily when its stale heap entry surfaces
+class deadline_scheduler(object):
+    def __init__(self):
+        self.heap = []
+        self.deadlines = {}     # key -> current deadline
+        self.queued = {}        # key -> deadline of the entry sitting in the heap
+        self.seq = 0            # tie-breaker so keys never need to be comparable
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def schedule(self, key, deadline):
+        self.deadlines[key] = deadline
+        if key not in self.queued or deadline < self.queued[key]:
+            self.queued[key] = deadline
+            self.seq += 1
+            heapq.heappush(self.heap, (deadline, self.seq, key))
+
+    def cancel(self, key):
+        self.deadlines.pop(key, None)
+
+    def pop_due(self, curr_time):
+        due = []
+        while self.heap and self.heap[0][0] <= curr_time:
+            deadline, seq, key = heapq.heappop(self.heap)
+            if self.queued.get(key) != deadline:    # superseded by an earlier entry for the same key
+                continue
+            del self.queued[key]
+            if key not in self.deadlines:           # cancelled
+                continue
+            if self.deadlines[key] > curr_time:     # extended since being queued
+                self.queued[key] = self.deadlines[key]
+                self.seq += 1
+                heapq.heappush(self.heap, (self.deadlines[key], self.seq, key))
+                continue
+            del self.deadlines[key]
+            due.append(key)
+        return due
 
 #################
 # Radio Id history class
@@ -1732,8 +1888,8 @@ class p25_receiver(object):
         self.tuned_frequency = freq
         self.tuner_idle = False
         self.talkgroups = self.system.get_talkgroups()
-        self.skiplist = {}
-        self.blacklist = {}
+        self.skiplist = id_list()
+        self.blacklist = id_list()
         self.whitelist = None
         self.crypt_behavior = self.system.get_crypt_behavior()
         self.current_nac = 0
@@ -1745,6 +1901,7 @@ class p25_receiver(object):
         self.tgid_hold_time = TGID_HOLD_TIME
         self.vc_retries = 0
         self.tune_ts = None
+        self.call_start = None
         
         self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'crypt_behavior', 'behavior': self.crypt_behavior})
         sys.stderr.write("%s crypt behavior: %d\n" % (log_ts.get(), self.crypt_behavior))
@@ -1808,6 +1965,7 @@ class p25_receiver(object):
             if self.fa_ctrl is not None:
                 self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'set_slotid', 'slotid': 0})     # enable receiver
             self.tuner_idle = False
+        event_journal.log('cc', sys=self.system.sysname, rx=self.msgq_id, freq=freq)
         if self.debug >= 5:
             sys.stderr.write("%s [%d] set control channel=%f\n" % (log_ts.get(), self.msgq_id, freq/1e6))
         tune_params = {'tuner':   self.msgq_id,
@@ -1823,7 +1981,7 @@ class p25_receiver(object):
         if freq is None or int(freq) == 0:
             return
 
-        self.tune_ts = time.time()                                                          # save timestamp at start of tuning
+        self.tune_ts = vclock.time()                                                          # save timestamp at start of tuning
 
         if self.tuner_idle:
             if self.fa_ctrl is not None:
@@ -1860,9 +2018,12 @@ class p25_receiver(object):
         self.vc_retries = 0
         self.current_tgid = tgid
         self.current_slot = slot
+        self.call_start = vclock.time()
+        event_journal.log('call_start', sys=self.system.sysname, rx=self.msgq_id, tg=tgid, freq=freq, slot=slot)
+        call_recorder.call_start(self.msgq_id, tgid, self.talkgroups[tgid]['srcaddr'], self.system.sysname)
         if not self.hold_mode:
             self.hold_tgid = None
-            self.hold_until = time.time()
+            self.hold_until = vclock.time()
         with self.system.talkgroups_mutex:
             self.talkgroups[tgid]['receiver'] = self
 
@@ -1882,7 +2043,7 @@ class p25_receiver(object):
             elif data > 0:
                 self.add_blacklist(int(data))
         elif cmd == 'reload':
-            self.blacklist = {}
+            self.blacklist = id_list()
             self.whitelist = None
             self.load_bl_wl()
 
@@ -1900,10 +2061,14 @@ class p25_receiver(object):
             updated += 1
             if self.current_tgid is None:
                 if self.system.has_cc(self.msgq_id):
+                    if self.system.cc_retries == 0:     # journal once per loss, not every repeated timeout
+                        event_journal.log('sync_loss', sys=self.system.sysname, rx=self.msgq_id, freq=self.tuned_frequency)
                     if ((self.debug > 0) and (self.system.cc_retries == 0)) or (self.debug > 10):  # only log once per timeout unless log level > 10
                         sys.stderr.write("%s [%d] control channel timeout, freq(%f)\n" % (log_ts.get(), self.msgq_id, (self.tuned_frequency/1e6)))
                     self.tune_cc(self.system.timeout_cc(self.msgq_id))
             else:
+                if self.vc_retries == 0:
+                    event_journal.log('sync_loss', sys=self.system.sysname, rx=self.msgq_id, tg=self.current_tgid, freq=self.tuned_frequency)
                 if self.debug > 1:
                     sys.stderr.write("%s [%d] voice channel timeout, freq(%f)\n" % (log_ts.get(), self.msgq_id, (self.tuned_frequency/1e6)))
                 self.vc_retries += 1
@@ -1926,6 +2091,8 @@ class p25_receiver(object):
 
             if encrypted >= 0 and algid >= 0 and keyid >= 0: # log and save encryption information
                 with self.system.talkgroups_mutex:
+                    if algid != self.talkgroups[self.current_tgid]['algid'] or keyid != self.talkgroups[self.current_tgid]['keyid']:
+                        event_journal.log('encrypt', sys=self.system.sysname, rx=self.msgq_id, tg=self.current_tgid, algid=algid, keyid=keyid)
                     if self.debug >= 5 and (algid != self.talkgroups[self.current_tgid]['algid'] or keyid != self.talkgroups[self.current_tgid]['keyid']):
                         sys.stderr.write('%s [%d] encrypt info: tg=%d, algid=0x%x, keyid=0x%x\n' % (log_ts.get(), self.msgq_id, self.current_tgid, algid, keyid))
                     self.talkgroups[self.current_tgid]['encrypted'] = encrypted
@@ -1946,7 +2113,7 @@ class p25_receiver(object):
         elif m_type == -4: # P25 sync established
             if self.tune_ts is not None:
                 if self.debug > 1:
-                    sys.stderr.write('%s [%d] sync established, tuning time %f seconds\n' % (log_ts.get(), self.msgq_id, (time.time() - self.tune_ts)))
+                    sys.stderr.write('%s [%d] sync established, tuning time %f seconds\n' % (log_ts.get(), self.msgq_id, (vclock.time() - self.tune_ts)))
                 self.tune_ts = None
 
             if self.current_tgid is None:
@@ -1982,6 +2149,8 @@ class p25_receiver(object):
                 if algid != 0x80: # log and save encryption information
                     with self.system.talkgroups_mutex:
                         if ga in self.talkgroups:
+                            if algid != self.talkgroups[ga]['algid'] or keyid != self.talkgroups[ga]['keyid']:
+                                event_journal.log('encrypt', sys=self.system.sysname, rx=self.msgq_id, tg=ga, algid=algid, keyid=keyid)
                             if self.debug >= 5 and (algid != self.talkgroups[ga]['algid'] or keyid != self.talkgroups[ga]['keyid']):
                                 sys.stderr.write('%s [%d] encrypt info: tg=%d, algid=0x%x, keyid=0x%x\n' % (log_ts.get(), self.msgq_id, ga, algid, keyid))
                             self.talkgroups[ga]['encrypted'] = 1
@@ -2021,7 +2190,7 @@ class p25_receiver(object):
             self.expire_talkgroup(reason = "skiplisted")
             self.hold_mode = False
             self.hold_tgid = None
-            self.hold_until = time.time()
+            self.hold_until = vclock.time()
 
     def add_blacklist(self, tgid, end_time=None):
         if not tgid or (tgid <= 0) or (tgid > 65534):
@@ -2055,7 +2224,7 @@ class p25_receiver(object):
             if self.debug > 1:
                 sys.stderr.write("%s [%d] de-blacklisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
         if self.whitelist is None:
-            self.whitelist = {}
+            self.whitelist = id_list()
         if tgid in self.whitelist:
             return
         self.whitelist[tgid] = None
@@ -2065,23 +2234,15 @@ class p25_receiver(object):
             self.expire_talkgroup(reason = "not whitelisted")
             self.hold_mode = False
             self.hold_tgid = None
-            self.hold_until = time.time()
+            self.hold_until = vclock.time()
 
     def blacklist_update(self, start_time):
-        expired_tgs = [tg for tg in list(self.blacklist.keys())
-                            if self.blacklist[tg] is not None
-                            and self.blacklist[tg] < start_time]
-        for tg in expired_tgs:
-            self.blacklist.pop(tg)
+        for tg, tg_end in self.blacklist.expire(start_time):
             if self.debug > 1:
                 sys.stderr.write("%s [%d] removing expired blacklist: tg(%d)\n" % (log_ts.get(), self.msgq_id, tg));
 
     def skiplist_update(self, start_time):
-        expired_tgs = [tg for tg in list(self.skiplist.keys())
-                            if self.skiplist[tg] is not None
-                            and self.skiplist[tg] < start_time]
-        for tg in expired_tgs:
-            self.skiplist.pop(tg)
+        for tg, tg_end in self.skiplist.expire(start_time):
             if self.debug > 1:
                 sys.stderr.write("%s [%d] removing expired skiplist: tg(%d)\n" % (log_ts.get(), self.msgq_id, tg));
 
@@ -2094,11 +2255,7 @@ class p25_receiver(object):
             if (tgid is not None) and (tgid in self.talkgroups) and ((self.talkgroups[tgid]['receiver'] is None) or (self.talkgroups[tgid]['receiver'] == self)):
                 tgt_tgid = tgid
 
-            for active_tgid in self.talkgroups:
-                if hold:
-                    break
-                if self.talkgroups[active_tgid]['time'] < start_time:
-                    continue
+            for prio, order, active_tgid in ([] if hold else self.system.get_active_talkgroups(start_time)):
                 if active_tgid in self.skiplist:
                     continue
                 if active_tgid in self.blacklist and (not self.whitelist or active_tgid not in self.whitelist):
@@ -2107,13 +2264,12 @@ class p25_receiver(object):
                     continue
                 if (self.crypt_behavior > 1) and ((self.talkgroups[active_tgid]['svcopts'] & 0x40) == 0x40):
                     continue
-                if tgt_tgid is None:
-                    if self.talkgroups[active_tgid]['receiver'] is None:
-                        tgt_tgid = active_tgid
-                        continue
-                elif (self.talkgroups[active_tgid]['prio'] < self.talkgroups[tgt_tgid]['prio']) and (self.talkgroups[active_tgid]['receiver'] is None):
+                if self.talkgroups[active_tgid]['receiver'] is not None:
+                    continue
+                if (tgt_tgid is None) or (prio < self.talkgroups[tgt_tgid]['prio']):
                     tgt_tgid = active_tgid
-                   
+                break   # index is priority ordered so only the first eligible talkgroup need be considered
+
             if tgt_tgid is not None and self.talkgroups[tgt_tgid]['time'] >= start_time:
                 return self.talkgroups[tgt_tgid]['frequency'], tgt_tgid, self.talkgroups[tgt_tgid]['tdma_slot'], self.talkgroups[tgt_tgid]['srcaddr']
         return None, None, None, None
@@ -2158,6 +2314,11 @@ class p25_receiver(object):
             return
             
         with self.system.talkgroups_mutex:
+            event_journal.log('call_end', sys=self.system.sysname, rx=self.msgq_id, tg=self.current_tgid, rid=(self.talkgroups[self.current_tgid]['srcaddr'] or None),
+                              freq=self.tuned_frequency, slot=self.current_slot, reason=reason,
+                              dur=(None if self.call_start is None else round(vclock.time() - self.call_start, 3)))
+            self.call_start = None
+            call_recorder.call_end(self.msgq_id)
             self.talkgroups[self.current_tgid]['receiver'] = None
             self.talkgroups[self.current_tgid]['frequency'] = None
             self.talkgroups[self.current_tgid]['tdma_slot'] = None
@@ -2169,10 +2330,10 @@ class p25_receiver(object):
             # Commanded tgid hold inactive
             if auto_hold:
                 self.hold_tgid = self.current_tgid
-                self.hold_until = time.time() + self.tgid_hold_time
+                self.hold_until = vclock.time() + self.tgid_hold_time
             else:
                 self.hold_tgid = None
-                self.hold_until = time.time()
+                self.hold_until = vclock.time()
         else:
             # Commanded tgid hold active
             pass
@@ -2232,6 +2393,19 @@ class p25_receiver(object):
                 meta_update(self.meta_q, msgq_id=self.msgq_id, debug=self.debug)
 
     def get_status(self):
+        return json.dumps(self.get_status_dict())
+
+    # status_key changes whenever get_status_dict() would return different content
+    def status_key(self):
+        with self.system.talkgroups_mutex:
+            _tgid = self.hold_tgid if self.hold_tgid is not None else self.current_tgid
+            tg = self.talkgroups[self.current_tgid] if self.current_tgid is not None else None
+            return (self.tuned_frequency, self.current_slot, _tgid, self.hold_tgid, self.system.has_cc(self.msgq_id), self.tuner_idle,
+                    self.talkgroups[_tgid]['tag'] if _tgid is not None else None,
+                    (tg['srcaddr'], tg['svcopts'], tg['encrypted'], self.system.get_rid_tag(tg['srcaddr'])) if tg is not None else None,
+                    self.meta_stream)
+
+    def get_status_dict(self):
         with self.system.talkgroups_mutex:
             _tgid = self.hold_tgid if self.hold_tgid is not None else self.current_tgid
             cc_tag = "Control Channel" if self.system.has_cc(self.msgq_id) else "Idle" if self.tuner_idle else None
@@ -2250,5 +2424,5 @@ class p25_receiver(object):
             d['mode'] = None
             d['stream'] = self.meta_stream
             d['msgqid'] = self.msgq_id
-            return json.dumps(d)
+            return d
 
@@ -23,11 +23,10 @@
 import sys
 import collections
 import ctypes
-import time
 import json
 import threading
 from helper_funcs import *
-from log_ts import log_ts
+from log_ts import log_ts, vclock
 from collections import deque
 from gnuradio import gr
 import gnuradio.op25_repeater as op25_repeater
@@ -44,6 +43,51 @@ M_SMARTNET_END_PTT      = 15
 OSW_QUEUE_SIZE          = 5 + 1 # Some messages can be 3 OSWs long, plus up to two IDLEs can be inserted in between
                                 # useful messages. Additionally, keep one slot for a QUEUE RESET message.
 OSW_QUEUE_RESET_CMD     = 0xffe # OSW command representing QUEUE RESET took place; not a valid cmd so it won't conflict
+OSW_CHAN_TABLE_SIZE     = 0x400 # Channel numbers are 10 bits; size of the compiled bandplan tables
+
+# Commands which continue a multi-OSW message; an IDLE followed by one of these was delayed into the middle of it
+OSW_ANALOG_CONTINUATIONS  = (0x30a, 0x30b, 0x30d, 0x310, 0x311, 0x317, 0x318, 0x319, 0x31a, 0x320, 0x322, 0x32e, 0x340)
+OSW_DIGITAL_CONTINUATIONS = (0x317, 0x318)
+
+OSW_DAYS_OF_WEEK = ("Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday")
+
+# Individual extended functions (second OSW 0x30b) identified by a single opcode: (description, radio id label)
+OSW_INDIVIDUAL_FUNCTIONS = {
+    0x261b: ("RADIO CHECK",                             "tgt"),
+    0x261c: ("DEAFFILIATION",                           "src"),
+    0x26e8: ("EMERGENCY ALARM ACK",                     "src"),
+    0x2c04: ("DENIED INVALID TALKGROUP",                "src"),  # e.g. TGID 0xfff
+    0x2c11: ("DENIED ANNOUNCEMENT LISTEN ONLY",         "src"),
+    0x2c12: ("DENIED CLEAR TX ONLY",                    "src"),
+    0x2c13: ("DENIED LISTEN ONLY",                      "src"),
+    0x2c14: ("DENIED NO PRIVATE CALL",                  "src"),
+    0x2c15: ("DENIED PRIVATE CALL INVALID ID",          "src"),
+    0x2c16: ("DENIED NO INTERCONNECT",                  "src"),
+    0x2c20: ("DENIED UNSUPPORTED MODE",                 "src"),  # CVSD, digital
+    0x2c41: ("DENIED PRIVATE CALL TARGET OFFLINE",      "src"),
+    0x2c47: ("DENIED GROUP BUSY CALL IN PROGRESS",      "src"),
+    0x2c48: ("DENIED PRIVATE CALL RING TARGET OFFLINE", "src"),
+    0x2c4a: ("DENIED FORBIDDEN ON SITE",                "src"),  # radio id and/or talkgroup
+    0x2c4e: ("DENIED CALL ALERT INVALID ID",            "src"),
+    0x2c4f: ("DENIED CALL ALERT TARGET OFFLINE",        "src"),
+    0x2c56: ("DENIED RADIO WRONG MODULATION",           "src"),  # e.g. radio digital, talkgroup analog
+    0x2c60: ("DENIED OMNILINK TRESPASS",                "src"),
+    0x2c65: ("DENIED RADIO ID",                         "src"),
+    0x2c66: ("DENIED TALKGROUP ID",                     "src"),
+    0x2c90: ("DENIED GROUP BUSY CALL STARTING",         "src"),
+    0x2c96: ("DENIED PRIVATE CALL TARGET BUSY",         "src"),
+    0x8301: ("FAILSOFT ASSIGN",                         "tgt"),
+    0x8302: ("SELECTOR UNLOCKED",                       "src"),
+    0x8303: ("SELECTOR LOCKED",                         "src"),
+    0x8305: ("FAILSOFT CANCELED",                       "src"),
+    0x8307: ("RADIO INHIBITED",                         "src"),
+    0x8308: ("RADIO UNINHIBITED",                       "src"),
+    0x8312: ("SELECTOR UNLOCK",                         "tgt"),
+    0x8313: ("SELECTOR LOCK",                           "tgt"),
+    0x8315: ("FAILSOFT CANCEL",                         "tgt"),
+    0x8317: ("RADIO INHIBIT",                           "tgt"),
+    0x8318: ("RADIO UNINHIBIT",                         "tgt"),
+}
 
 # SmartNet trunking constants
 CC_TIMEOUT_RETRIES      = 3     # Number of control channel framing timeouts before hunting
@@ -66,7 +110,7 @@ def meta_update(meta_q, tgid = None, tag = None):
     d = {'json_type': 'meta_update'}
     d['tgid'] = tgid
     d['tag'] = tag
-    msg = gr.message().make_from_string(json.dumps(d), -2, time.time(), 0)
+    msg = gr.message().make_from_string(json.dumps(d), -2, vclock.time(), 0)
     if not meta_q.full_p():
         meta_q.insert_tail(msg)
 
@@ -142,17 +186,26 @@ class rx_ctl(object):
 
     # process_qmsg is the main message dispatch handler connecting the 'radios' to python
     def process_qmsg(self, msg):
-        curr_time = time.time()
-        m_rxid = int(msg.arg1()) >> 1
-        if (m_rxid in self.receivers and
-            self.receivers[m_rxid]['rx_sys'] is not None and
-            self.receivers[m_rxid]['rx_sys'].process_qmsg(msg, curr_time)):
-            for rx in self.systems[self.receivers[m_rxid]['sysname']]['voice']: # Scan for voice activity if the arriving OSW caused a change
+        self.process_qmsgs([msg])
+
+    # process_qmsgs handles all messages delivered by a single queue wakeup
+    def process_qmsgs(self, msgs):
+        curr_time = vclock.time()
+        updated_systems = []
+        for msg in msgs:
+            m_rxid = int(msg.arg1()) >> 1
+            if (m_rxid in self.receivers and
+                self.receivers[m_rxid]['rx_sys'] is not None and
+                self.receivers[m_rxid]['rx_sys'].process_qmsg(msg, curr_time) and
+                self.receivers[m_rxid]['sysname'] not in updated_systems):
+                updated_systems.append(self.receivers[m_rxid]['sysname'])
+        for sysname in updated_systems:
+            for rx in self.systems[sysname]['voice']: # Scan for voice activity if the arriving OSW caused a change
                 rx.scan_for_talkgroups(curr_time)
 
     # ui_command handles all requests from user interface
     def ui_command(self, cmd, data, msgq_id):
-        curr_time = time.time()
+        curr_time = vclock.time()
         if msgq_id in self.receivers and self.receivers[msgq_id]['rx_sys'] is not None:
             self.receivers[msgq_id]['rx_sys'].ui_command(cmd = cmd, data = data, curr_time = curr_time)    # Dispatch message to the intended receiver
 
@@ -196,8 +249,8 @@ class osw_receiver(object):
         self.talkgroups_mutex = threading.Lock()
         self.patches = {}
         self.patches_mutex = threading.Lock()
-        self.skiplist = {}
-        self.blacklist = {}
+        self.skiplist = id_list()
+        self.blacklist = id_list()
         self.whitelist = None
         self.alternate_cc_freqs = {}
         self.adjacent_sites = {}
@@ -212,6 +265,8 @@ class osw_receiver(object):
         self.stats = {}
         self.stats['osw_count'] = 0
         self.sysname = config['sysname']
+        self.compile_bandplan()
+        self.osw_table = self.build_osw_table()
 
     def set_debug(self, dbglvl):
         self.debug = dbglvl
@@ -239,7 +294,7 @@ class osw_receiver(object):
 
     def post_init(self):
         if self.msgq_id < 0:
-            sys.stderr.write("%f Smartnet system has no channel assigned!\n" % (time.time()))
+            sys.stderr.write("%f Smartnet system has no channel assigned!\n" % (vclock.time()))
             return
 
         if self.debug >= 1:
@@ -424,8 +479,30 @@ class osw_receiver(object):
         # Unknown frequency range, so we can't get an expected value
         return 0.0
 
+    # Compile the bandplan into per-channel frequency tables (None marks an invalid channel) so that resolving a
+    # channel is a single lookup. Must be called again whenever the bandplan related config changes.
+    def compile_bandplan(self):
+        self.obt_system = self.is_obt_system()
+        self.rx_chan_freqs = [self.calc_freq(chan) if self.calc_is_chan(chan) else None for chan in range(OSW_CHAN_TABLE_SIZE)]
+        self.tx_chan_freqs = [self.calc_freq(chan, is_tx=True) if self.calc_is_chan(chan, is_tx=True) else None for chan in range(OSW_CHAN_TABLE_SIZE)]
+
     # Is the 'chan' a valid frequency; uplink channel if is_tx=True (mostly applicable for OBT systems with explicit tx channel assignments)
     def is_chan(self, chan, is_tx=False):
+        chan_freqs = self.tx_chan_freqs if is_tx else self.rx_chan_freqs
+        return chan >= 0 and chan < OSW_CHAN_TABLE_SIZE and chan_freqs[chan] is not None
+
+    # Convert 'chan' into band-dependent frequency; uplink frequency if is_tx=True (mostly applicable for OBT systems with explicit tx channel assignments)
+    def get_freq(self, chan, is_tx=False):
+        chan_freqs = self.tx_chan_freqs if is_tx else self.rx_chan_freqs
+        if chan < 0 or chan >= OSW_CHAN_TABLE_SIZE or chan_freqs[chan] is None:
+            if self.debug >= 5:
+                type_str = "transmit" if is_tx else "receive"
+                sys.stderr.write("%s [%d] SMARTNET %s chan %d out of range\n" % (log_ts.get(), self.msgq_id, type_str, chan))
+            return 0.0
+        return chan_freqs[chan]
+
+    # Compute whether 'chan' is valid under the configured bandplan (used to compile the channel tables)
+    def calc_is_chan(self, chan, is_tx=False):
         band, is_rebanded, is_international, _, is_shuffled = self.get_bandplan_details()
 
         # Negative channels are obviously invalid
@@ -469,15 +546,8 @@ class osw_receiver(object):
 
         return False
 
-    # Convert 'chan' into band-dependent frequency; uplink frequency if is_tx=True (mostly applicable for OBT systems with explicit tx channel assignments)
-    def get_freq(self, chan, is_tx=False):
-        # Short-circuit invalid frequencies
-        if not self.is_chan(chan, is_tx):
-            if self.debug >= 5:
-                type_str = "transmit" if is_tx else "receive"
-                sys.stderr.write("%s [%d] SMARTNET %s chan %d out of range\n" % (log_ts.get(), self.msgq_id, type_str, chan))
-            return 0.0
-
+    # Compute the frequency of a valid 'chan' under the configured bandplan (used to compile the channel tables)
+    def calc_freq(self, chan, is_tx=False):
         freq = 0.0
         band, is_rebanded, is_international, is_splinter, is_shuffled = self.get_bandplan_details()
 
@@ -754,15 +824,18 @@ class osw_receiver(object):
     def enqueue(self, addr, grp, cmd, ts):
         grp_str = self.get_group_str(grp)
 
-        is_rx_chan = self.is_chan(cmd)
-        is_tx_chan = self.is_chan(cmd, is_tx=True)
+        rx_freq = None
+        tx_freq = None
+        if cmd < OSW_CHAN_TABLE_SIZE:
+            rx_freq = self.rx_chan_freqs[cmd]
+            tx_freq = self.tx_chan_freqs[cmd]
 
-        rx_freq = 0.0
-        tx_freq = 0.0
-        if is_rx_chan:
-            rx_freq = self.get_freq(cmd)
-        if is_tx_chan:
-            tx_freq = self.get_freq(cmd, is_tx=True)
+        is_rx_chan = rx_freq is not None
+        is_tx_chan = tx_freq is not None
+        if not is_rx_chan:
+            rx_freq = 0.0
+        if not is_tx_chan:
+            tx_freq = 0.0
 
         if self.debug >= 13:
             if is_rx_chan and is_tx_chan:
@@ -776,965 +849,815 @@ class osw_receiver(object):
 
         self.osw_q.append((addr, (grp != 0), cmd, is_rx_chan, is_tx_chan, rx_freq, tx_freq, ts))
 
+    # Build the OSW dispatch table keyed on (command, is_chan, group flag) of the first OSW of a message
+    def build_osw_table(self):
+        table = {}
+        def add(cmds, grps, handler):
+            for cmd in cmds:
+                for grp in grps:
+                    for is_chan in [False, True]:
+                        table[(cmd, is_chan, grp)] = handler
+
+        add([0x2f8],                [False],        self.decode_idle)
+        add([0x300],                [True],         self.decode_group_busy_queued)
+        add([0x303],                [True],         self.decode_emergency_busy_queued)
+        add([0x308],                [False, True],  self.decode_analog_osws)
+        add([0x321],                [False, True],  self.decode_digital_osws)
+        add([0x324],                [False],        self.decode_interconnect_reject)
+        add([0x32a],                [True],         self.decode_send_affiliation_request)
+        add([0x32b],                [False],        self.decode_system_id)
+        add([0x32c],                [False],        self.decode_roaming)
+        add(range(0x360, 0x3a0),    [False, True],  self.decode_amss)
+        add([0x3a0],                [True],         self.decode_bsi)
+        add([0x3bf, 0x3c0],         [False, True],  self.decode_system_status)
+
+        # Channel numbers take precedence over commands sharing the same value
+        for cmd in range(0x400):
+            table[(cmd, True, True)]  = self.decode_group_update
+            table[(cmd, True, False)] = self.decode_cc_broadcast
+        return table
+
+    def log_unknown_osws(self, osws, is_queue_reset, prefix="SMARTNET"):
+        if self.debug >= 11:
+            ts = log_ts.get()
+            type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
+            for osw in osws:
+                sys.stderr.write("%s [%d] %s %s (0x%04x,%s,0x%03x)\n" % (ts, self.msgq_id, prefix, type_str, osw[0], self.get_group_str(osw[1]), osw[2]))
+
+    # The OSW queue is used as a fixed lookahead window: w[0] is the first OSW of the message being decoded (OSW2),
+    # w[1] the next one (OSW1) and so on. Decoders return (rc, used, is_unknown) where 'used' lists the window
+    # positions they consumed; everything else is left in place for the next pass.
     def process_osws(self):
         if len(self.osw_q) < OSW_QUEUE_SIZE:
             return False
 
-        rc = False
-        osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t = self.osw_q.popleft()
-        grp2_str = self.get_group_str(osw2_grp)
-
-        is_unknown_osw = False
-        is_queue_reset = False
+        w = self.osw_q
 
         # Identify the QUEUE RESET message if present. This means that we have received a bad OSW (lost sync or bad CRC)
         # that caused us to dump the queue. If we see one (and sometimes there are several in a row), we should treat
         # any unknown OSWs that follow specially for logging - identify them as potentially due to a missing first OSW
         # in a multi-OSW sequence rather than just being unknown.
-        while osw2_cmd == OSW_QUEUE_RESET_CMD:
-            is_queue_reset = True
-
+        queue_reset = None
+        while w[0][2] == OSW_QUEUE_RESET_CMD:
             # Save the queue reset message for later - if we end up with an unknown OSW, we'll keep putting it back at
             # the head of the queue until we successfully parse an OSW, since that is the likely cause of unknown OSWs
-            queue_reset_addr  = osw2_addr
-            queue_reset_grp   = osw2_grp
-            queue_reset_cmd   = osw2_cmd
-            queue_reset_ch_rx = osw2_ch_rx
-            queue_reset_ch_tx = osw2_ch_tx
-            queue_reset_f_rx  = osw2_f_rx
-            queue_reset_f_tx  = osw2_f_tx
-            queue_reset_t     = osw2_t
-
-            # Get the next message until it is a good OSW
-            osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t = self.osw_q.popleft()
-            grp2_str = self.get_group_str(osw2_grp)
+            queue_reset = w.popleft()
 
+        is_queue_reset = queue_reset is not None
         if is_queue_reset:
             # If we only had a single queue reset message, continue to process the OSWs (queue was sized accordingly)
-            if len(self.osw_q) == OSW_QUEUE_SIZE - 2:
+            if len(w) == OSW_QUEUE_SIZE - 1:
                 if self.debug >= 11:
                     sys.stderr.write("%s [%d] SMARTNET QUEUE RESET DUE TO BAD OSW\n" % (log_ts.get(), self.msgq_id))
             # If we only had more than one queue reset message, we need to put one back and wait for more OSWs
             else:
-                self.osw_q.appendleft((queue_reset_addr, queue_reset_grp, queue_reset_cmd, queue_reset_ch_rx, queue_reset_ch_tx, queue_reset_f_rx, queue_reset_f_tx, queue_reset_t))
-                return rc
+                w.appendleft(queue_reset)
+                return False
 
         # Parsing for OBT-specific messages. OBT systems sometimes (always?) use explicit messages that provide tx and
         # rx channels separately for certain system information, and for voice grants. Check for them specifically
         # first, but then fall back to non-OBT-specific parsing if that fails.
-        if self.is_obt_system() and osw2_ch_tx:
-            # Get next OSW in the queue
-            osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t = self.osw_q.popleft()
-            grp1_str = self.get_group_str(osw1_grp)
-
-            # Three-OSW system information
-            if osw1_cmd == 0x320 and osw2_grp and osw1_grp:
-                # Get OSW0
-                osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-
-                # The information returned here may be for this site, or may be for other adjacent sites
-                if osw0_cmd == 0x30b and osw0_addr & 0xfc00 == 0x6000:
-                    type_str = "ADJACENT SITE" if osw0_grp else "ALTERNATE CONTROL CHANNEL"
-                    system = osw2_addr
-                    # Sites are encoded as 0-indexed but usually referred to as 1-indexed
-                    site = ((osw1_addr & 0xfc00) >> 10) + 1
-                    band = (osw1_addr & 0x380) >> 7
-                    feat = (osw1_addr & 0x3f)
-                    cc_rx_chan = osw0_addr & 0x3ff
-                    cc_rx_freq = self.get_freq(cc_rx_chan)
-                    cc_tx_freq = osw2_f_tx
-                    self.rx_sys_id = system
-                    if osw0_grp:
-                        self.add_adjacent_site(osw1_t, site, cc_rx_freq, cc_tx_freq)
-                    else:
-                        self.rx_site_id = site
-                        self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET OBT %s sys(0x%04x) site(%02d) band(%s) features(%s) cc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, type_str, system, site, self.get_band_str(band), self.get_features_str(feat), cc_rx_freq))
-                        if cc_tx_freq != 0.0:
-                            sys.stderr.write(" cc_tx_freq(%f)" % (cc_tx_freq))
-                        sys.stderr.write("\n")
+        osw2 = w[0]
+        if self.obt_system and osw2[4]:
+            decoder = self.decode_obt_osws
+        else:
+            decoder = self.osw_table.get((osw2[2], osw2[3], osw2[1]), self.decode_unknown)
+        rc, used, is_unknown_osw = decoder(w, is_queue_reset)
+
+        if used == (0,):
+            w.popleft()
+        else:
+            for i in reversed(used):
+                del w[i]
+
+        # If we got an unknown OSW after a queue reset, put back the queue reset message so that we know the next
+        # unknown OSW is likely caused by the queue reset as well
+        if is_unknown_osw and is_queue_reset:
+            w.appendleft(queue_reset)
+
+        return rc
+
+    def decode_unknown(self, w, is_queue_reset):
+        # Track that we got an unknown OSW
+        self.log_unknown_osws([w[0]], is_queue_reset)
+        return False, (0,), True
+
+    def decode_obt_osws(self, w, is_queue_reset):
+        rc = False
+        osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t = w[0]
+        osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t = w[1]
+        grp1_str = self.get_group_str(osw1_grp)
+
+        # Three-OSW system information
+        if osw1_cmd == 0x320 and osw2_grp and osw1_grp:
+            osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = w[2]
+
+            # The information returned here may be for this site, or may be for other adjacent sites
+            if osw0_cmd == 0x30b and osw0_addr & 0xfc00 == 0x6000:
+                type_str = "ADJACENT SITE" if osw0_grp else "ALTERNATE CONTROL CHANNEL"
+                system = osw2_addr
+                # Sites are encoded as 0-indexed but usually referred to as 1-indexed
+                site = ((osw1_addr & 0xfc00) >> 10) + 1
+                band = (osw1_addr & 0x380) >> 7
+                feat = (osw1_addr & 0x3f)
+                cc_rx_chan = osw0_addr & 0x3ff
+                cc_rx_freq = self.get_freq(cc_rx_chan)
+                cc_tx_freq = osw2_f_tx
+                self.rx_sys_id = system
+                if osw0_grp:
+                    self.add_adjacent_site(osw1_t, site, cc_rx_freq, cc_tx_freq)
                 else:
-                    # Track that we got an unknown OSW and put back unused OSW0
-                    is_unknown_osw = True
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-
-                    if self.debug >= 11:
-                        ts = log_ts.get()
-                        type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                        sys.stderr.write("%s [%d] SMARTNET OBT %s (0x%04x,%s,0x%03x)\n" % (ts, self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
-                        sys.stderr.write("%s [%d] SMARTNET OBT %s (0x%04x,%s,0x%03x)\n" % (ts, self.msgq_id, type_str, osw1_addr, grp1_str, osw1_cmd))
-            # Two-OSW system idle
-            elif osw1_cmd == 0x2f8 and osw2_ch_tx:
-                type_str = "ANALOG" if osw2_grp else "DIGITAL"
-                src_rid = osw2_addr
-                grp_str = grp1_str
-                data = osw1_addr
-                vc_tx_freq = osw2_f_tx
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET OBT IDLE %s src(%05d) data(%s,0x%04x)" % (log_ts.get(), self.msgq_id, type_str, src_rid, grp_str, data))
-                    if vc_tx_freq != 0.0:
-                        sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
-                    sys.stderr.write("\n")
-            # Two-OSW group voice grant
-            elif osw2_ch_tx and osw1_ch_rx and osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
-                mode = 0 if osw2_grp else 1
-                type_str = "ANALOG" if osw2_grp else "DIGITAL"
-                src_rid = osw2_addr
-                dst_tgid = osw1_addr
-                vc_rx_freq = osw1_f_rx
-                vc_tx_freq = osw2_f_tx
-                rc |= self.update_voice_frequency(osw1_t, vc_rx_freq, dst_tgid, src_rid, mode=mode)
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET OBT %s %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, type_str, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_rx_freq))
-                    if vc_tx_freq != 0.0:
-                        sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
-                    sys.stderr.write("\n")
-            # Two-OSW private call voice grant/update (sent for duration of the call)
-            elif osw2_ch_tx and osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
-                type_str = "ENCRYPTED" if osw2_grp else "CLEAR"
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                vc_rx_freq = osw1_f_rx
-                vc_tx_freq = osw2_f_tx
+                    self.rx_site_id = site
+                    self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET OBT %s PRIVATE CALL src(%05d) dst(%05d) vc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, type_str, src_rid, dst_rid, vc_rx_freq))
-                    if vc_tx_freq != 0.0:
-                        sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
+                    sys.stderr.write("%s [%d] SMARTNET OBT %s sys(0x%04x) site(%02d) band(%s) features(%s) cc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, type_str, system, site, self.get_band_str(band), self.get_features_str(feat), cc_rx_freq))
+                    if cc_tx_freq != 0.0:
+                        sys.stderr.write(" cc_tx_freq(%f)" % (cc_tx_freq))
                     sys.stderr.write("\n")
-            # Two-OSW interconnect call voice grant/update (sent for duration of the call)
-            elif osw2_ch_tx and osw1_ch_rx and not osw2_grp and not osw1_grp and (osw1_addr != 0) and (osw2_addr == 0):
-                src_rid = osw1_addr
-                vc_rx_freq = osw1_f_rx
-                vc_tx_freq = osw2_f_tx
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET OBT INTERCONNECT CALL src(%05d) vc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, src_rid, vc_rx_freq))
-                    if vc_tx_freq != 0.0:
-                        sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
-                    sys.stderr.write("\n")
-            else:
-                # Track that we got an unknown OSW and put back unused OSW1
-                is_unknown_osw = True
-                self.osw_q.appendleft((osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t))
+                return rc, (0, 1, 2), False
 
-                if self.debug >= 11:
-                    type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                    sys.stderr.write("%s [%d] SMARTNET OBT %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
-        # One-OSW voice update
-        elif osw2_ch_rx and osw2_grp:
-            dst_tgid = osw2_addr
-            vc_freq = osw2_f_rx
-            rc |= self.update_voice_frequency(osw2_t, vc_freq, dst_tgid)
+            # Track that we got an unknown OSW; OSW0 is left unused
+            self.log_unknown_osws([w[0], w[1]], is_queue_reset, prefix="SMARTNET OBT")
+            return rc, (0, 1), True
+
+        # Two-OSW system idle
+        elif osw1_cmd == 0x2f8 and osw2_ch_tx:
+            type_str = "ANALOG" if osw2_grp else "DIGITAL"
+            src_rid = osw2_addr
+            grp_str = grp1_str
+            data = osw1_addr
+            vc_tx_freq = osw2_f_tx
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET %s GROUP UPDATE tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), dst_tgid, dst_tgid >> 4, vc_freq))
-        # One-OSW control channel broadcast
-        elif osw2_ch_rx and not osw2_grp and ((osw2_addr & 0xff00) == 0x1f00):
-            cc_freq = osw2_f_rx
-            self.rx_cc_freq = cc_freq * 1e6
+                sys.stderr.write("%s [%d] SMARTNET OBT IDLE %s src(%05d) data(%s,0x%04x)" % (log_ts.get(), self.msgq_id, type_str, src_rid, grp_str, data))
+                if vc_tx_freq != 0.0:
+                    sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
+                sys.stderr.write("\n")
+        # Two-OSW group voice grant
+        elif osw2_ch_tx and osw1_ch_rx and osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
+            mode = 0 if osw2_grp else 1
+            type_str = "ANALOG" if osw2_grp else "DIGITAL"
+            src_rid = osw2_addr
+            dst_tgid = osw1_addr
+            vc_rx_freq = osw1_f_rx
+            vc_tx_freq = osw2_f_tx
+            rc |= self.update_voice_frequency(osw1_t, vc_rx_freq, dst_tgid, src_rid, mode=mode)
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 1 cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, cc_freq))
-        # One-OSW system idle
-        elif osw2_cmd == 0x2f8 and not osw2_grp:
-            grp_str = grp2_str
-            data = osw2_addr
+                sys.stderr.write("%s [%d] SMARTNET OBT %s %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, type_str, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_rx_freq))
+                if vc_tx_freq != 0.0:
+                    sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
+                sys.stderr.write("\n")
+        # Two-OSW private call voice grant/update (sent for duration of the call)
+        elif osw2_ch_tx and osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
+            type_str = "ENCRYPTED" if osw2_grp else "CLEAR"
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            vc_rx_freq = osw1_f_rx
+            vc_tx_freq = osw2_f_tx
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET IDLE data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
-        # One-OSW group busy queued
-        elif osw2_cmd == 0x300 and osw2_grp:
-            tgid = osw2_addr
+                sys.stderr.write("%s [%d] SMARTNET OBT %s PRIVATE CALL src(%05d) dst(%05d) vc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, type_str, src_rid, dst_rid, vc_rx_freq))
+                if vc_tx_freq != 0.0:
+                    sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
+                sys.stderr.write("\n")
+        # Two-OSW interconnect call voice grant/update (sent for duration of the call)
+        elif osw2_ch_tx and osw1_ch_rx and not osw2_grp and not osw1_grp and (osw1_addr != 0) and (osw2_addr == 0):
+            src_rid = osw1_addr
+            vc_rx_freq = osw1_f_rx
+            vc_tx_freq = osw2_f_tx
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET GROUP BUSY QUEUED tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4))
-        # One-OSW emergency busy queued
-        elif osw2_cmd == 0x303 and osw2_grp:
-            tgid = osw2_addr
+                sys.stderr.write("%s [%d] SMARTNET OBT INTERCONNECT CALL src(%05d) vc_rx_freq(%f)" % (log_ts.get(), self.msgq_id, src_rid, vc_rx_freq))
+                if vc_tx_freq != 0.0:
+                    sys.stderr.write(" vc_tx_freq(%f)" % (vc_tx_freq))
+                sys.stderr.write("\n")
+        else:
+            # Track that we got an unknown OSW; OSW1 is left unused
+            self.log_unknown_osws([w[0]], is_queue_reset, prefix="SMARTNET OBT")
+            return rc, (0,), True
+
+        return rc, (0, 1), False
+
+    # One-OSW voice update
+    def decode_group_update(self, w, is_queue_reset):
+        osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t = w[0]
+        dst_tgid = osw2_addr
+        vc_freq = osw2_f_rx
+        rc = self.update_voice_frequency(osw2_t, vc_freq, dst_tgid)
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET %s GROUP UPDATE tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), dst_tgid, dst_tgid >> 4, vc_freq))
+        return rc, (0,), False
+
+    # One-OSW control channel broadcast
+    def decode_cc_broadcast(self, w, is_queue_reset):
+        osw2_addr, osw2_grp, osw2_cmd = w[0][0:3]
+        if (osw2_addr & 0xff00) != 0x1f00:      # not a broadcast; decode as a command instead
+            return self.osw_table.get((osw2_cmd, False, osw2_grp), self.decode_unknown)(w, is_queue_reset)
+        cc_freq = w[0][5]
+        self.rx_cc_freq = cc_freq * 1e6
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 1 cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, cc_freq))
+        return False, (0,), False
+
+    # One-OSW system idle
+    def decode_idle(self, w, is_queue_reset):
+        grp_str = self.get_group_str(w[0][1])
+        data = w[0][0]
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET IDLE data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+        return False, (0,), False
+
+    # One-OSW group busy queued
+    def decode_group_busy_queued(self, w, is_queue_reset):
+        tgid = w[0][0]
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET GROUP BUSY QUEUED tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4))
+        return False, (0,), False
+
+    # One-OSW emergency busy queued
+    def decode_emergency_busy_queued(self, w, is_queue_reset):
+        tgid = w[0][0]
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET EMERGENCY BUSY QUEUED tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4))
+        return False, (0,), False
+
+    # Two- or three-OSW message
+    def decode_analog_osws(self, w, is_queue_reset):
+        rc = False
+        used = (0, 1)
+        osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t = w[0]
+        osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t = w[1]
+        grp1_str = self.get_group_str(osw1_grp)
+
+        # Two-OSW system ID + control channel broadcast
+        if osw1_ch_rx and not osw1_grp and ((osw1_addr & 0xff00) == 0x1f00):
+            system = osw2_addr
+            cc_freq = osw1_f_rx
+            data = osw1_addr & 0xff
+            self.rx_sys_id = system
+            self.rx_cc_freq = cc_freq * 1e6
+            if self.debug == 11:
+                sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f) data(0x%02x)\n" % (log_ts.get(), self.msgq_id, system, cc_freq, data))
+        # Two-OSW analog group voice grant
+        elif osw1_ch_rx and osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
+            src_rid = osw2_addr
+            dst_tgid = osw1_addr
+            vc_freq = osw1_f_rx
+            rc |= self.update_voice_frequency(osw1_t, vc_freq, dst_tgid, src_rid, mode=0)
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET EMERGENCY BUSY QUEUED tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4))
-        # Two- or three-OSW message
-        elif osw2_cmd == 0x308:
-            # Get next OSW in the queue
-            osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t = self.osw_q.popleft()
-            grp1_str = self.get_group_str(osw1_grp)
-
-            # Two-OSW system ID + control channel broadcast
-            if osw1_ch_rx and not osw1_grp and ((osw1_addr & 0xff00) == 0x1f00):
-                system = osw2_addr
-                cc_freq = osw1_f_rx
-                data = osw1_addr & 0xff
-                self.rx_sys_id = system
-                self.rx_cc_freq = cc_freq * 1e6
-                if self.debug == 11:
-                    sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f) data(0x%02x)\n" % (log_ts.get(), self.msgq_id, system, cc_freq, data))
-            # Two-OSW analog group voice grant
-            elif osw1_ch_rx and osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
-                src_rid = osw2_addr
-                dst_tgid = osw1_addr
-                vc_freq = osw1_f_rx
-                rc |= self.update_voice_frequency(osw1_t, vc_freq, dst_tgid, src_rid, mode=0)
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq))
-            # Two-OSW analog private call voice grant/update (sent for duration of the call)
-            elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                vc_freq = osw1_f_rx
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid, vc_freq))
-            # Two-OSW interconnect call voice grant/update (sent for duration of the call)
-            elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr == 0):
-                src_rid = osw1_addr
-                vc_freq = osw1_f_rx
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET INTERCONNECT CALL src(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, vc_freq))
-            # One- or two-OSW system idle
-            elif osw1_cmd == 0x2f8:
-                # Get next OSW in the queue
-                osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-                grp0_str = self.get_group_str(osw0_grp)
-
-                # Valid two-OSW system idle (next command is not the continuation of a two- or three-OSW message)
-                if osw0_cmd not in [0x30a, 0x30b, 0x30d, 0x310, 0x311, 0x317, 0x318, 0x319, 0x31a, 0x320, 0x322, 0x32e, 0x340]:
-                    # Put back unused OSW0
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-
-                    src_rid = osw2_addr
-                    grp_str = grp1_str
-                    data = osw1_addr
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE ANALOG src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
-                # One-OSW system idle that was delayed by one OSW and is now stuck in the middle of a different two- or
-                # three-OSW message.
-                #
-                # Example:
-                #   [OSW A-1] [OSW A-2] [OSW B-1] [IDLE] [OSW B-2] [OSW C-1] [OSW C-2]
-                #
-                # Reorder it (process it after OSW A-2 and before OSW B-1) and put back the message it was inside to try
-                # processing the message again.
-                else:
-                    # Put back unused OSW0 and OSW2
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-                    self.osw_q.appendleft((osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t))
-
-                    grp_str = grp1_str
-                    data = osw1_addr
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 1-1 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
-            # Two-OSW group busy queued
-            elif osw1_cmd == 0x300 and osw1_grp:
-                src_rid = osw2_addr
-                tgid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET GROUP BUSY QUEUED src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
-            # Two-OSW private call busy queued
-            elif osw1_cmd == 0x302 and not osw1_grp:
-                src_rid = osw2_addr
-                tgt_rid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET PRIVATE CALL BUSY QUEUED src(%05d) tgt(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, tgt_rid))
-            # Two-OSW emergency busy queued
-            elif osw1_cmd == 0x303 and osw1_grp:
-                src_rid = osw2_addr
-                tgid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET EMERGENCY BUSY QUEUED src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
-            # Possible out-of-order two-OSW system idle
-            elif osw1_cmd == 0x308:
-                # Get next OSW in the queue
-                osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-                grp0_str = self.get_group_str(osw0_grp)
-
-                # Two-OSW system idle that got separated and interleaved with a different two- or three-OSW message.
-                #
-                # Example:
-                #   [OSW A-1] [OSW A-2] [IDLE-1] [OSW B-1] [IDLE-2] [OSW B-2] [OSW C-1] [OSW C-2]
-                #
-                # Reorder it (process it after OSW A-2 and before OSW B-1) and put back the message that it was
-                # interleaved with to try processing the message again in the next pass.
-                if osw0_cmd == 0x2f8:
-                    # Put back unused OSW1 (that this idle was interleaved with)
-                    self.osw_q.appendleft((osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t))
-
-                    src_rid = osw2_addr
-                    grp_str = grp0_str
-                    data = osw0_addr
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE INTERLEAVED src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
-                # It's beyond repair, just mark it unknown
-                else:
-                    # Track that we got an unknown OSW and put back unused OSW0 and OSW1
-                    is_unknown_osw = True
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-                    self.osw_q.appendleft((osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t))
-
-                    if self.debug >= 11:
-                        type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                        sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
-            # Two-OSW dynamic regroup
-            elif osw1_cmd == 0x30a and not osw2_grp and not osw1_grp:
-                src_rid = osw2_addr
-                tgid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DYNAMIC REGROUP src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
-            # One of many possible two- or three-OSW meanings...
-            elif osw1_cmd == 0x30b:
-                # Get next OSW in the queue
-                osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-                grp0_str = self.get_group_str(osw0_grp)
-
-                # One-OSW system idle that was delayed by two OSWs and is now stuck between the last two OSWs of a
-                # of a different three-OSW message.
-                #
-                # Example:
-                #   [OSW A-1] [OSW A-2] [OSW B-1] [OSW B-2] [IDLE] [OSW B-3] [OSW C-1] [OSW C-2]
-                #
-                # Reorder it (process it after OSW A-2 and before OSW B-1) and continue processing using the following
-                # OSW.
-                if osw0_cmd == 0x2f8 and not osw0_grp:
-                    grp_str = grp0_str
-                    data = osw0_addr
-                    osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-                    grp0_str = self.get_group_str(osw0_grp)
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 2-1 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
-
-                # Three-OSW system ID + control channel broadcast
-                if (
-                    osw1_grp and not osw0_grp and osw0_ch_rx and
-                    (osw0_addr & 0xff00) == 0x1f00 and
-                    (osw1_addr & 0xfc00) == 0x2800 and
-                    (osw1_addr & 0x3ff) == osw0_cmd
-                ):
-                    system = osw2_addr
-                    cc_freq = osw0_f_rx
-                    data = osw0_addr & 0xff
-                    self.rx_sys_id = system
-                    self.rx_cc_freq = cc_freq * 1e6
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 3 sys(0x%04x) cc_freq(%f) data(0x%02x)\n" % (log_ts.get(), self.msgq_id, system, cc_freq, data))
-                # Two-OSW messages
-                else:
-                    # Put back unused OSW0
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-
-                    # System ID + control channel broadcast
-                    if (osw1_addr & 0xfc00) == 0x2800 and osw1_grp:
-                        system = osw2_addr
-                        cc_freq = self.get_freq(osw1_addr & 0x3ff)
-                        self.rx_sys_id = system
-                        self.rx_cc_freq = cc_freq * 1e6
-                        if self.debug >= 11:
-                            sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, system, cc_freq))
-                    # System ID + adjacent/alternate control channel broadcast
-                    elif (osw1_addr & 0xfc00) == 0x6000:
-                        type_str = "ADJACENT" if osw1_grp else "ALTERNATE"
-                        system = osw2_addr
-                        cc_chan = osw1_addr & 0x3ff
-                        cc_rx_freq = self.get_freq(cc_chan)
-                        cc_tx_freq = self.get_freq(cc_chan, is_tx=True)
-                        self.rx_sys_id = system
-                        if not osw1_grp:
-                            self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
-                        if self.debug >= 11:
-                            sys.stderr.write("%s [%d] SMARTNET %s CONTROL CHANNEL sys(0x%04x) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, type_str, system, cc_rx_freq))
-                    # Extended functions on groups
-                    elif osw1_grp:
-                        # Patch/multiselect cancel
-                        if osw1_addr == 0x2021 and (self.is_patch_group(osw2_addr) or self.is_multiselect_group(osw2_addr)):
-                            type_str = self.get_call_options_str(osw2_addr, include_clear=False)
-                            tgid = osw2_addr & 0xfff0
-                            rc |= self.delete_patches(tgid)
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET %s CANCEL tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4))
-                        # Unknown extended function
-                        else:
-                            tgid = osw2_addr
-                            opcode = osw1_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET GROUP EXTENDED FUNCTION tgid(%05d/0x%03x) opcode(0x%04x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4, opcode))
-                    # Extended functions on individuals
-                    else:
-                        # Radio check
-                        if osw1_addr == 0x261b:
-                            tgt_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO CHECK tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-                        # Deaffiliation
-                        elif osw1_addr == 0x261c:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DEAFFILIATION src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Status acknowledgement
-                        elif osw1_addr >= 0x26e0 and osw1_addr <= 0x26e7:
-                            src_rid = osw2_addr
-                            status = (osw1_addr & 0x7) + 1
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET STATUS ACK src(%05d) status(%01d)\n" % (log_ts.get(), self.msgq_id, src_rid, status))
-                        # Emergency acknowledgement
-                        elif osw1_addr == 0x26e8:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET EMERGENCY ALARM ACK src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Message acknowledgement
-                        elif osw1_addr >= 0x26f0 and osw1_addr <= 0x26ff:
-                            src_rid = osw2_addr
-                            message = (osw0_addr & 0xf) + 1
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET MESSAGE ACK src(%05d) msg(%d)\n" % (log_ts.get(), self.msgq_id, src_rid, message))
-                        # Invalid talkgroup (e.g. TGID 0xfff)
-                        elif osw1_addr == 0x2c04:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED INVALID TALKGROUP src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Announcement listen only
-                        elif osw1_addr == 0x2c11:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED ANNOUNCEMENT LISTEN ONLY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Clear TX only
-                        elif osw1_addr == 0x2c12:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED CLEAR TX ONLY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Listen only
-                        elif osw1_addr == 0x2c13:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED LISTEN ONLY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # No private call
-                        elif osw1_addr == 0x2c14:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED NO PRIVATE CALL src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Private call invalid ID
-                        elif osw1_addr == 0x2c15:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL INVALID ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # No interconnect
-                        elif osw1_addr == 0x2c16:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED NO INTERCONNECT src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Unsupported mode (CVSD, digital)
-                        elif osw1_addr == 0x2c20:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED UNSUPPORTED MODE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Private call target offline
-                        elif osw1_addr == 0x2c41:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL TARGET OFFLINE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Group busy (call in progress)
-                        elif osw1_addr == 0x2c47:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED GROUP BUSY CALL IN PROGRESS src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Private call ring target offline
-                        elif osw1_addr == 0x2c48:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL RING TARGET OFFLINE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Radio ID and/or talkgroup forbidden on site
-                        elif osw1_addr == 0x2c4a:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED FORBIDDEN ON SITE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Call alert invalid ID
-                        elif osw1_addr == 0x2c4e:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED CALL ALERT INVALID ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Call alert target offline
-                        elif osw1_addr == 0x2c4f:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED CALL ALERT TARGET OFFLINE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Denied radio wrong modulation (e.g. radio digital, talkgroup analog)
-                        elif osw1_addr == 0x2c56:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED RADIO WRONG MODULATION src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # OmniLink trespass rejected
-                        elif osw1_addr == 0x2c60:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED OMNILINK TRESPASS src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Denied radio ID
-                        elif osw1_addr == 0x2c65:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED RADIO ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Denied talkgroup ID
-                        elif osw1_addr == 0x2c66:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED TALKGROUP ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Group busy (call is just starting)
-                        elif osw1_addr == 0x2c90:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED GROUP BUSY CALL STARTING src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Private call target busy
-                        elif osw1_addr == 0x2c96:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL TARGET BUSY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Failsoft assign
-                        elif osw1_addr == 0x8301:
-                            tgt_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET FAILSOFT ASSIGN tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-                        # Selector unlocked
-                        elif osw1_addr == 0x8302:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR UNLOCKED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Selector locked
-                        elif osw1_addr == 0x8303:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR LOCKED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Failsoft canceled
-                        elif osw1_addr == 0x8305:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET FAILSOFT CANCELED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Radio inhibited
-                        elif osw1_addr == 0x8307:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO INHIBITED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Radio uninhibited
-                        elif osw1_addr == 0x8308:
-                            src_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO UNINHIBITED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-                        # Selector unlock
-                        elif osw1_addr == 0x8312:
-                            tgt_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR UNLOCK tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-                        # Selector lock
-                        elif osw1_addr == 0x8313:
-                            tgt_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR LOCK tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-                        # Failsoft cancel
-                        elif osw1_addr == 0x8315:
-                            tgt_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET FAILSOFT CANCEL tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-                        # Radio inhibit
-                        elif osw1_addr == 0x8317:
-                            tgt_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO INHIBIT tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-                        # Radio uninhibit
-                        elif osw1_addr == 0x8318:
-                            tgt_rid = osw2_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO UNINHIBIT tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-                        # Denial
-                        elif (osw1_addr & 0xfc00) == 0x2c00:
-                            src_rid = osw2_addr
-                            reason = osw1_addr & 0x3ff
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED src(%05d) code(0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, reason))
-                        # Unknown extended function
-                        else:
-                            src_rid = osw2_addr
-                            opcode = osw1_addr
-                            if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET INDIVIDUAL EXTENDED FUNCTION src(%05d) opcode(0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, opcode))
-            # Two-OSW status / emergency / dynamic regroup acknowledgement
-            elif osw1_cmd == 0x30d and not osw2_grp and not osw1_grp:
-                src_rid = osw2_addr
-                dst_tgid = osw1_addr & 0xfff0
-                opcode = osw1_addr & 0xf
-                if self.debug >= 11:
-                    if opcode < 0x8:
-                        status = opcode + 1
-                        sys.stderr.write("%s [%d] SMARTNET STATUS src(%05d) tgid(%05d/0x%03x) status(%01d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, status))
-                    elif opcode == 0x8:
-                        sys.stderr.write("%s [%d] SMARTNET EMERGENCY ALARM src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
-                    elif opcode == 0xa:
-                        sys.stderr.write("%s [%d] SMARTNET DYNAMIC REGROUP ACK src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
-                    else:
-                        sys.stderr.write("%s [%d] SMARTNET UNKNOWN STATUS src(%05d) tgid(%05d/0x%03x) opcode(%02d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, opcode))
-            # Two-OSW affiliation
-            elif osw1_cmd == 0x310 and not osw2_grp and not osw1_grp:
-                src_rid = osw2_addr
-                dst_tgid = osw1_addr & 0xfff0
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET AFFILIATION src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
-            # Two-OSW message
-            elif osw1_cmd == 0x311 and not osw2_grp and not osw1_grp:
-                src_rid = osw2_addr
-                dst_tgid = osw1_addr & 0xfff0
-                message = (osw1_addr & 0xf) + 1
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET MESSAGE src(%05d) tgid(%05d/0x%03x) msg(%02d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, message))
-            # Two-OSW encrypted private call ring
-            elif osw1_cmd == 0x315 and not osw2_grp and not osw1_grp:
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
-            # Two-OSW clear private call ring
-            elif osw1_cmd == 0x317 and not osw2_grp and not osw1_grp:
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG CLEAR PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
-            # Two-OSW private call ring acknowledgement
-            elif osw1_cmd == 0x318 and not osw2_grp and not osw1_grp:
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET PRIVATE CALL RING ACK src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
-            # Two-OSW call alert
-            elif osw1_cmd == 0x319 and not osw2_grp and not osw1_grp:
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET CALL ALERT src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
-            # Two-OSW call alert acknowledgement
-            elif osw1_cmd == 0x31a and not osw2_grp and not osw1_grp:
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET CALL ALERT ACK src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
-            # Two-OSW OmniLink trespass permitted
-            elif osw1_cmd == 0x31b and not osw2_grp and not osw1_grp:
-                src_rid = osw2_addr
-                system = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET OMNILINK TRESPASS PERMITTED sys(0x%04x) src(%05d)\n" % (log_ts.get(), self.msgq_id, system, src_rid))
-            # Three-OSW system information
-            elif osw1_cmd == 0x320:
-                # Get OSW0
-                osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-                grp0_str = self.get_group_str(osw0_grp)
-
-                # One-OSW system idle that was delayed by two OSWs and is now stuck between the last two OSWs of a
-                # of a different three-OSW message.
-                #
-                # Example:
-                #   [OSW A-1] [OSW A-2] [OSW B-1] [OSW B-2] [IDLE] [OSW B-3] [OSW C-1] [OSW C-2]
-                #
-                # Reorder it (process it after OSW A-2 and before OSW B-1) and continue processing using the following
-                # OSW.
-                if osw0_cmd == 0x2f8 and not osw0_grp:
-                    grp_str = grp0_str
-                    data = osw0_addr
-                    osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-                    grp0_str = self.get_group_str(osw0_grp)
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 2-2 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
-
-                # The information returned here may be for this site, or may be for other adjacent sites
-                if osw0_cmd == 0x30b and osw0_addr & 0xfc00 == 0x6000:
-                    type_str = "ADJACENT SITE" if osw0_grp else "ALTERNATE CONTROL CHANNEL"
-                    system = osw2_addr
-                    # Sites are encoded as 0-indexed but usually referred to as 1-indexed
-                    site = ((osw1_addr & 0xfc00) >> 10) + 1
-                    band = (osw1_addr & 0x380) >> 7
-                    feat = (osw1_addr & 0x3f)
-                    cc_chan = osw0_addr & 0x03ff
-                    cc_rx_freq = self.get_freq(cc_chan)
-                    cc_tx_freq = self.get_freq(cc_chan, is_tx=True)
-                    self.rx_sys_id = system
-                    if osw0_grp:
-                        self.add_adjacent_site(osw1_t, site, cc_rx_freq, cc_tx_freq)
-                    else:
-                        self.rx_site_id = site
-                        self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET %s sys(0x%04x) site(%02d) band(%s) features(%s) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, type_str, system, site, self.get_band_str(band), self.get_features_str(feat), cc_rx_freq))
-                else:
-                    # Track that we got an unknown OSW and put back unused OSW0
-                    is_unknown_osw = True
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-
-                    if self.debug >= 11:
-                        ts = log_ts.get()
-                        type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                        sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (ts, self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
-                        sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (ts, self.msgq_id, type_str, osw1_addr, grp1_str, osw1_cmd))
-            # Two-OSW date/time
-            elif osw1_cmd == 0x322 and osw2_grp and osw1_grp:
-                year      = ((osw2_addr & 0xfe00) >> 9) + 2000
-                month     = (osw2_addr & 0x1e0) >> 5
-                day       = (osw2_addr & 0x1f)
-                dayofweek = (osw1_addr & 0xe000) >> 13
-                if dayofweek == 0:
-                    dayofweek_str = "Sunday"
-                elif dayofweek == 1:
-                    dayofweek_str = "Monday"
-                elif dayofweek == 2:
-                    dayofweek_str = "Tuesday"
-                elif dayofweek == 3:
-                    dayofweek_str = "Wednesday"
-                elif dayofweek == 4:
-                    dayofweek_str = "Thursday"
-                elif dayofweek == 5:
-                    dayofweek_str = "Friday"
-                elif dayofweek == 6:
-                    dayofweek_str = "Saturday"
-                else:
-                    dayofweek_str = "unknown day of week"
-                hour      = (osw1_addr & 0x1f00) >> 8
-                minute    = osw1_addr & 0xff
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DATE/TIME %04d-%02d-%02d %02d:%02d (%s)\n" % (log_ts.get(), self.msgq_id, year, month, day, hour, minute, dayofweek_str))
-            # Two-OSW emergency PTT
-            elif osw1_cmd == 0x32e and osw2_grp and osw1_grp:
+                sys.stderr.write("%s [%d] SMARTNET ANALOG %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq))
+        # Two-OSW analog private call voice grant/update (sent for duration of the call)
+        elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            vc_freq = osw1_f_rx
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET ANALOG PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid, vc_freq))
+        # Two-OSW interconnect call voice grant/update (sent for duration of the call)
+        elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr == 0):
+            src_rid = osw1_addr
+            vc_freq = osw1_f_rx
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET INTERCONNECT CALL src(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, vc_freq))
+        # One- or two-OSW system idle
+        elif osw1_cmd == 0x2f8:
+            osw0_cmd = w[2][2]
+
+            # Valid two-OSW system idle (next command is not the continuation of a two- or three-OSW message)
+            if osw0_cmd not in OSW_ANALOG_CONTINUATIONS:
                 src_rid = osw2_addr
-                dst_tgid = osw1_addr & 0xfff0
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET EMEREGENCY PTT src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
-            # Two-OSW patch/multiselect
-            elif osw1_cmd == 0x340 and osw2_grp and osw1_grp and (self.is_patch_group(osw2_addr) or self.is_multiselect_group(osw2_addr)):
-                type_str = self.get_call_options_str(osw2_addr, include_clear=False)
-                tgid = (osw1_addr & 0xfff) << 4
-                sub_tgid = osw2_addr & 0xfff0
-                mode = osw2_addr & 0xf
-                rc |= self.add_patch(osw1_t, tgid, sub_tgid, mode)
+                grp_str = grp1_str
+                data = osw1_addr
                 if self.debug >= 11:
-                    if tgid == sub_tgid:
-                        sys.stderr.write("%s [%d] SMARTNET %s tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4))
-                    else:
-                        sys.stderr.write("%s [%d] SMARTNET %s tgid(%05d/0x%03x) sub_tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4, sub_tgid, sub_tgid >> 4))
+                    sys.stderr.write("%s [%d] SMARTNET IDLE ANALOG src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
+            # One-OSW system idle that was delayed by one OSW and is now stuck in the middle of a different two- or
+            # three-OSW message.
+            #
+            # Example:
+            #   [OSW A-1] [OSW A-2] [OSW B-1] [IDLE] [OSW B-2] [OSW C-1] [OSW C-2]
+            #
+            # Reorder it (process it after OSW A-2 and before OSW B-1) and leave the message it was inside in place to
+            # try processing the message again.
             else:
-                # Track that we got an unknown OSW; OSW1 did not match, so put it back in the queue
-                is_unknown_osw = True
-                self.osw_q.appendleft((osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t))
-
+                used = (1,)
+                grp_str = grp1_str
+                data = osw1_addr
                 if self.debug >= 11:
-                    type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                    sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
-        # Two-OSW message
-        elif osw2_cmd == 0x321:
-            # Get next OSW in the queue
-            osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t = self.osw_q.popleft()
-            grp1_str = self.get_group_str(osw1_grp)
-            # Two-OSW digital group voice grant
-            if osw1_ch_rx and osw2_grp and osw1_grp and (osw1_addr != 0):
+                    sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 1-1 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+        # Two-OSW group busy queued
+        elif osw1_cmd == 0x300 and osw1_grp:
+            src_rid = osw2_addr
+            tgid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET GROUP BUSY QUEUED src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
+        # Two-OSW private call busy queued
+        elif osw1_cmd == 0x302 and not osw1_grp:
+            src_rid = osw2_addr
+            tgt_rid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET PRIVATE CALL BUSY QUEUED src(%05d) tgt(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, tgt_rid))
+        # Two-OSW emergency busy queued
+        elif osw1_cmd == 0x303 and osw1_grp:
+            src_rid = osw2_addr
+            tgid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET EMERGENCY BUSY QUEUED src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
+        # Possible out-of-order two-OSW system idle
+        elif osw1_cmd == 0x308:
+            osw0_addr, osw0_grp, osw0_cmd = w[2][0:3]
+
+            # Two-OSW system idle that got separated and interleaved with a different two- or three-OSW message.
+            #
+            # Example:
+            #   [OSW A-1] [OSW A-2] [IDLE-1] [OSW B-1] [IDLE-2] [OSW B-2] [OSW C-1] [OSW C-2]
+            #
+            # Reorder it (process it after OSW A-2 and before OSW B-1) and leave the message that it was interleaved
+            # with in place to try processing the message again in the next pass.
+            if osw0_cmd == 0x2f8:
+                used = (0, 2)
                 src_rid = osw2_addr
-                dst_tgid = osw1_addr
-                vc_freq = osw1_f_rx
-                rc |= self.update_voice_frequency(osw1_t, vc_freq, dst_tgid, src_rid, mode=1)
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq))
-            # Two-OSW digital private call voice grant/update (sent for duration of the call)
-            elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                vc_freq = osw1_f_rx
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid, vc_freq))
-            # One- or two-OSW system idle
-            elif osw1_cmd == 0x2f8:
-                # Get next OSW in the queue
-                osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
-                grp0_str = self.get_group_str(osw0_grp)
-
-                # Valid two-OSW system idle (next command is not a continuation)
-                if osw0_cmd not in [0x317, 0x318]:
-                    # Put back unused OSW0
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-
-                    src_rid = osw2_addr
-                    grp_str = grp1_str
-                    data = osw1_addr
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DIGITAL src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
-                # One-OSW system idle that was delayed by one OSW and is now stuck in the middle of a different two- or
-                # three-OSW message.
-                #
-                # Example:
-                #   [OSW A-1] [OSW A-2] [OSW B-1] [OSW B-2] [IDLE] [OSW B-3] [OSW C-1] [OSW C-2]
-                #
-                # Reorder it (process it after OSW A-2 and before OSW B-1) and put back the message it was inside to try
-                # processing the message again.
-                else:
-                    # Put back unused OSW0 and OSW2
-                    self.osw_q.appendleft((osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t))
-                    self.osw_q.appendleft((osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t))
-
-                    grp_str = grp1_str
-                    data = osw1_addr
-                    if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 1-2 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
-            # Two-OSW encrypted private call ring
-            elif osw1_cmd == 0x315 and not osw2_grp and not osw1_grp:
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
+                grp_str = self.get_group_str(osw0_grp)
+                data = osw0_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
-            # Two-OSW clear private call ring
-            elif osw1_cmd == 0x317 and not osw2_grp and not osw1_grp:
-                dst_rid = osw2_addr
-                src_rid = osw1_addr
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL CLEAR PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    sys.stderr.write("%s [%d] SMARTNET IDLE INTERLEAVED src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
+            # It's beyond repair, just mark it unknown
             else:
-                # Track that we got an unknown OSW; OSW1 did not match, so put it back in the queue
-                is_unknown_osw = True
-                self.osw_q.appendleft((osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t))
-
-                if self.debug >= 11:
-                    type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                    sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
-        # One-OSW interconnect reject
-        elif osw2_cmd == 0x324 and not osw2_grp:
+                self.log_unknown_osws([w[0]], is_queue_reset)
+                return rc, (0,), True
+        # Two-OSW dynamic regroup
+        elif osw1_cmd == 0x30a and not osw2_grp and not osw1_grp:
             src_rid = osw2_addr
+            tgid = osw1_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET INTERCONNECT REJECT src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-        # One-OSW send affiliation request
-        elif osw2_cmd == 0x32a and osw2_grp:
-            tgt_rid = osw2_addr
+                sys.stderr.write("%s [%d] SMARTNET DYNAMIC REGROUP src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
+        # One of many possible two- or three-OSW meanings...
+        elif osw1_cmd == 0x30b:
+            rc, used = self.decode_extended_osws(w)
+        # Two-OSW status / emergency / dynamic regroup acknowledgement
+        elif osw1_cmd == 0x30d and not osw2_grp and not osw1_grp:
+            src_rid = osw2_addr
+            dst_tgid = osw1_addr & 0xfff0
+            opcode = osw1_addr & 0xf
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET SEND AFFILIATION REQUEST tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
-        # One-OSW system ID / scan marker
-        elif osw2_cmd == 0x32b and not osw2_grp:
-            system   = osw2_addr
-            type_str = "II"
-            self.rx_sys_id = system
+                if opcode < 0x8:
+                    status = opcode + 1
+                    sys.stderr.write("%s [%d] SMARTNET STATUS src(%05d) tgid(%05d/0x%03x) status(%01d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, status))
+                elif opcode == 0x8:
+                    sys.stderr.write("%s [%d] SMARTNET EMERGENCY ALARM src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+                elif opcode == 0xa:
+                    sys.stderr.write("%s [%d] SMARTNET DYNAMIC REGROUP ACK src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+                else:
+                    sys.stderr.write("%s [%d] SMARTNET UNKNOWN STATUS src(%05d) tgid(%05d/0x%03x) opcode(%02d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, opcode))
+        # Two-OSW affiliation
+        elif osw1_cmd == 0x310 and not osw2_grp and not osw1_grp:
+            src_rid = osw2_addr
+            dst_tgid = osw1_addr & 0xfff0
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET AFFILIATION src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+        # Two-OSW message
+        elif osw1_cmd == 0x311 and not osw2_grp and not osw1_grp:
+            src_rid = osw2_addr
+            dst_tgid = osw1_addr & 0xfff0
+            message = (osw1_addr & 0xf) + 1
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET MESSAGE src(%05d) tgid(%05d/0x%03x) msg(%02d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, message))
+        # Two-OSW encrypted private call ring
+        elif osw1_cmd == 0x315 and not osw2_grp and not osw1_grp:
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET ANALOG ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+        # Two-OSW clear private call ring
+        elif osw1_cmd == 0x317 and not osw2_grp and not osw1_grp:
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET SYSTEM sys(0x%04x) type(%s)\n" % (log_ts.get(), self.msgq_id, system, type_str))
-        # One-OSW roaming
-        elif osw2_cmd == 0x32c and not osw2_grp:
+                sys.stderr.write("%s [%d] SMARTNET ANALOG CLEAR PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+        # Two-OSW private call ring acknowledgement
+        elif osw1_cmd == 0x318 and not osw2_grp and not osw1_grp:
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET PRIVATE CALL RING ACK src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+        # Two-OSW call alert
+        elif osw1_cmd == 0x319 and not osw2_grp and not osw1_grp:
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET CALL ALERT src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+        # Two-OSW call alert acknowledgement
+        elif osw1_cmd == 0x31a and not osw2_grp and not osw1_grp:
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET CALL ALERT ACK src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+        # Two-OSW OmniLink trespass permitted
+        elif osw1_cmd == 0x31b and not osw2_grp and not osw1_grp:
             src_rid = osw2_addr
+            system = osw1_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET ROAMING src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
-        # One-OSW AMSS (Automatic Multiple Site Select) message
-        elif osw2_cmd >= 0x360 and osw2_cmd <= 0x39f:
-            # Sites are encoded as 0-indexed but usually referred to as 1-indexed
-            site = osw2_cmd - 0x360 + 1
-            if osw2_grp and (osw2_addr == 0x00000 or osw2_addr == 0xffff):
-                data_str = ""
+                sys.stderr.write("%s [%d] SMARTNET OMNILINK TRESPASS PERMITTED sys(0x%04x) src(%05d)\n" % (log_ts.get(), self.msgq_id, system, src_rid))
+        # Three-OSW system information
+        elif osw1_cmd == 0x320:
+            osw0_pos = 2
+            osw0_addr, osw0_grp, osw0_cmd = w[osw0_pos][0:3]
+
+            # One-OSW system idle that was delayed by two OSWs and is now stuck between the last two OSWs of a
+            # of a different three-OSW message.
+            #
+            # Example:
+            #   [OSW A-1] [OSW A-2] [OSW B-1] [OSW B-2] [IDLE] [OSW B-3] [OSW C-1] [OSW C-2]
+            #
+            # Reorder it (process it after OSW A-2 and before OSW B-1) and continue processing using the following
+            # OSW.
+            if osw0_cmd == 0x2f8 and not osw0_grp:
+                grp_str = self.get_group_str(osw0_grp)
+                data = osw0_addr
+                osw0_pos = 3
+                osw0_addr, osw0_grp, osw0_cmd = w[osw0_pos][0:3]
+                if self.debug >= 11:
+                    sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 2-2 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+
+            # The information returned here may be for this site, or may be for other adjacent sites
+            if osw0_cmd == 0x30b and osw0_addr & 0xfc00 == 0x6000:
+                used = tuple(range(osw0_pos + 1))
+                type_str = "ADJACENT SITE" if osw0_grp else "ALTERNATE CONTROL CHANNEL"
+                system = osw2_addr
+                # Sites are encoded as 0-indexed but usually referred to as 1-indexed
+                site = ((osw1_addr & 0xfc00) >> 10) + 1
+                band = (osw1_addr & 0x380) >> 7
+                feat = (osw1_addr & 0x3f)
+                cc_chan = osw0_addr & 0x03ff
+                cc_rx_freq = self.get_freq(cc_chan)
+                cc_tx_freq = self.get_freq(cc_chan, is_tx=True)
+                self.rx_sys_id = system
+                if osw0_grp:
+                    self.add_adjacent_site(osw1_t, site, cc_rx_freq, cc_tx_freq)
+                else:
+                    self.rx_site_id = site
+                    self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
+                if self.debug >= 11:
+                    sys.stderr.write("%s [%d] SMARTNET %s sys(0x%04x) site(%02d) band(%s) features(%s) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, type_str, system, site, self.get_band_str(band), self.get_features_str(feat), cc_rx_freq))
             else:
-                # No idea what the data means if it's marked as individual, or group with a value
-                data_str = " data(%s,0x%04x)" % (grp2_str, osw2_addr)
-            self.rx_site_id = site
+                # Track that we got an unknown OSW; OSW0 is left unused
+                self.log_unknown_osws([w[0], w[1]], is_queue_reset)
+                return rc, tuple(range(osw0_pos)), True
+        # Two-OSW date/time
+        elif osw1_cmd == 0x322 and osw2_grp and osw1_grp:
+            year      = ((osw2_addr & 0xfe00) >> 9) + 2000
+            month     = (osw2_addr & 0x1e0) >> 5
+            day       = (osw2_addr & 0x1f)
+            dayofweek = (osw1_addr & 0xe000) >> 13
+            dayofweek_str = OSW_DAYS_OF_WEEK[dayofweek] if dayofweek < len(OSW_DAYS_OF_WEEK) else "unknown day of week"
+            hour      = (osw1_addr & 0x1f00) >> 8
+            minute    = osw1_addr & 0xff
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET DATE/TIME %04d-%02d-%02d %02d:%02d (%s)\n" % (log_ts.get(), self.msgq_id, year, month, day, hour, minute, dayofweek_str))
+        # Two-OSW emergency PTT
+        elif osw1_cmd == 0x32e and osw2_grp and osw1_grp:
+            src_rid = osw2_addr
+            dst_tgid = osw1_addr & 0xfff0
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET EMEREGENCY PTT src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+        # Two-OSW patch/multiselect
+        elif osw1_cmd == 0x340 and osw2_grp and osw1_grp and (self.is_patch_group(osw2_addr) or self.is_multiselect_group(osw2_addr)):
+            type_str = self.get_call_options_str(osw2_addr, include_clear=False)
+            tgid = (osw1_addr & 0xfff) << 4
+            sub_tgid = osw2_addr & 0xfff0
+            mode = osw2_addr & 0xf
+            rc |= self.add_patch(osw1_t, tgid, sub_tgid, mode)
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET AMSS site(%02d)%s\n" % (log_ts.get(), self.msgq_id, site, data_str))
-        # One-OSW BSI / diagnostic
-        elif osw2_cmd == 0x3a0 and osw2_grp:
-            # Note that this is still highly speculative - it seems correct for the values that are defined below, but
-            # all other combinations are truly unknown
-            opcode = (osw2_addr & 0xf000) >> 12
-
-            if opcode == 0x8 or opcode == 0x9:
-                status = (osw2_addr & 0xf00) >> 8
-                if status == 0xa:
-                    status_str = "enabled"
-                elif status == 0xb:
-                    status_str = "disabled"
-                elif status == 0xc:
-                    status_str = "malfunction"
+                if tgid == sub_tgid:
+                    sys.stderr.write("%s [%d] SMARTNET %s tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4))
                 else:
-                    status_str = "unknown 0x%01x" % (status)
+                    sys.stderr.write("%s [%d] SMARTNET %s tgid(%05d/0x%03x) sub_tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4, sub_tgid, sub_tgid >> 4))
+        else:
+            # Track that we got an unknown OSW; OSW1 did not match, so it is left unused
+            self.log_unknown_osws([w[0]], is_queue_reset)
+            return rc, (0,), True
 
-                component = (osw2_addr & 0xff)
-                if component >= 0x30 and component <= 0x4b:
-                    component_str = "receiver %02d" % (component - 0x30 + 1)
-                elif component >= 0x60 and component <= 0x7b:
-                    component_str = "transmitter %02d" % (component - 0x60 + 1)
-                else:
-                    component_str = "unknown 0x%02x" % (component)
+        return rc, used, False
 
+    # Two- or three-OSW messages whose second OSW is 0x30b
+    def decode_extended_osws(self, w):
+        rc = False
+        osw2_addr, osw2_grp = w[0][0:2]
+        osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t = w[1]
+        osw0_pos = 2
+        osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx = w[osw0_pos][0:4]
+
+        # One-OSW system idle that was delayed by two OSWs and is now stuck between the last two OSWs of a
+        # of a different three-OSW message.
+        #
+        # Example:
+        #   [OSW A-1] [OSW A-2] [OSW B-1] [OSW B-2] [IDLE] [OSW B-3] [OSW C-1] [OSW C-2]
+        #
+        # Reorder it (process it after OSW A-2 and before OSW B-1) and continue processing using the following
+        # OSW.
+        if osw0_cmd == 0x2f8 and not osw0_grp:
+            grp_str = self.get_group_str(osw0_grp)
+            data = osw0_addr
+            osw0_pos = 3
+            osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx = w[osw0_pos][0:4]
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 2-1 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+
+        # Three-OSW system ID + control channel broadcast
+        if (
+            osw1_grp and not osw0_grp and osw0_ch_rx and
+            (osw0_addr & 0xff00) == 0x1f00 and
+            (osw1_addr & 0xfc00) == 0x2800 and
+            (osw1_addr & 0x3ff) == osw0_cmd
+        ):
+            system = osw2_addr
+            cc_freq = w[osw0_pos][5]
+            data = osw0_addr & 0xff
+            self.rx_sys_id = system
+            self.rx_cc_freq = cc_freq * 1e6
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 3 sys(0x%04x) cc_freq(%f) data(0x%02x)\n" % (log_ts.get(), self.msgq_id, system, cc_freq, data))
+            return rc, tuple(range(osw0_pos + 1))
+
+        # Two-OSW messages; OSW0 is left unused
+        used = tuple(range(osw0_pos))
+
+        # System ID + control channel broadcast
+        if (osw1_addr & 0xfc00) == 0x2800 and osw1_grp:
+            system = osw2_addr
+            cc_freq = self.get_freq(osw1_addr & 0x3ff)
+            self.rx_sys_id = system
+            self.rx_cc_freq = cc_freq * 1e6
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, system, cc_freq))
+        # System ID + adjacent/alternate control channel broadcast
+        elif (osw1_addr & 0xfc00) == 0x6000:
+            type_str = "ADJACENT" if osw1_grp else "ALTERNATE"
+            system = osw2_addr
+            cc_chan = osw1_addr & 0x3ff
+            cc_rx_freq = self.get_freq(cc_chan)
+            cc_tx_freq = self.get_freq(cc_chan, is_tx=True)
+            self.rx_sys_id = system
+            if not osw1_grp:
+                self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET %s CONTROL CHANNEL sys(0x%04x) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, type_str, system, cc_rx_freq))
+        # Extended functions on groups
+        elif osw1_grp:
+            # Patch/multiselect cancel
+            if osw1_addr == 0x2021 and (self.is_patch_group(osw2_addr) or self.is_multiselect_group(osw2_addr)):
+                type_str = self.get_call_options_str(osw2_addr, include_clear=False)
+                tgid = osw2_addr & 0xfff0
+                rc |= self.delete_patches(tgid)
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIAGNOSTIC STATUS opcode(0x%01x) component(%s) status(%s)\n" % (log_ts.get(), self.msgq_id, opcode, component_str, status_str))
-            elif opcode == 0xe or opcode == 0xf:
-                action_str = "BSI" if opcode == 0xf else "END BSI"
-                if self.debug >= 11:
-                    if self.is_chan(osw2_addr & 0x3ff):
-                        data = (osw2_addr & 0xc00) >> 10
-                        vc_freq = self.get_freq(osw2_addr & 0x3ff)
-                        sys.stderr.write("%s [%d] SMARTNET %s data(0x%01x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, action_str, data, vc_freq))
-                    else:
-                        data = osw2_addr & 0xfff
-                        sys.stderr.write("%s [%d] SMARTNET %s data(0x%03x)\n" % (log_ts.get(), self.msgq_id, action_str, data, vc_freq))
+                    sys.stderr.write("%s [%d] SMARTNET %s CANCEL tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4))
+            # Unknown extended function
             else:
-                data = osw2_addr & 0x3ff
+                tgid = osw2_addr
+                opcode = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIAGNOSTIC opcode(0x%01x) data(0x%03x)\n" % (log_ts.get(), self.msgq_id, opcode, data))
-        # One-OSW system status update
-        elif osw2_cmd == 0x3bf or osw2_cmd == 0x3c0:
-            scope = "SYSTEM" if osw2_cmd == 0x3c0 else "NETWORK"
-            opcode = (osw2_addr & 0xe000) >> 13
-            data = osw2_addr & 0x1fff
-            bitG = grp2_str
-            if opcode == 1:
-                type_ii              = (data & 0x1000) >> 12
-                type_str             = "II" if type_ii else "I"
-                dispatch_timeout     = (data & 0xe00) >> 9
-                connect_tone         = (data & 0xe0) >> 5
-                connect_tone_str     = self.get_connect_tone(connect_tone)
-                interconnect_timeout = (data & 0x1f)
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET %s STATUS type(%s) connect_tone(%.02f) dispatch_timeout(%d) interconnect_timeout(%d) bitG(%s)\n" % (log_ts.get(), self.msgq_id, scope, type_str, connect_tone_str, dispatch_timeout, interconnect_timeout, bitG))
-            elif opcode == 2:
-                no_secure        = (data & 0x1000) >> 12
-                secure_upgrade   = (data & 0x800) >> 11
-                full_data        = (data & 0x400) >> 10
-                no_data          = (data & 0x200) >> 9
-                reduced_otar     = (data & 0x100) >> 8
-                multikey_buf_b   = (data & 0x80) >> 7
-                bit6             = (data & 0x40) >> 6
-                cvsd_echo_delay  = (data & 0x3e) >> 1
-                bit0             = (data & 0x1)
-                # Try to make it more human-readable
-                secure_str       = "none" if no_secure else ("upgraded" if secure_upgrade else "standard")
-                data_str         = "none" if no_data else ("full" if full_data else "reduced")
-                otar_str         = "reduced" if reduced_otar else "full"
-                multikey_buf_str = "B" if multikey_buf_b else "A"
-                if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET %s STATUS data(%s) secure(%s)" % (log_ts.get(), self.msgq_id, scope, data_str, secure_str))
-                    # If we have secure enabled
-                    if no_secure == 0:
-                        # If we have data enabled
-                        if no_data == 0:
-                            sys.stderr.write(" otar(%s)" % (otar_str))
-                        sys.stderr.write(" multikey_buf(%s) cvsd_echo_delay(%02d)" % (multikey_buf_str, cvsd_echo_delay))
-                    sys.stderr.write(" bit6(%d) bit0(%d) bitG(%s)\n" % (bit6, bit0, bitG))
-            elif opcode == 3:
-                rotation     = (data & 0x800) >> 11
-                wide_pulse   = (data & 0x400) >> 10
-                cvsd_mod_4   = (data & 0x200) >> 9
-                cvsd_mod_str = "4" if cvsd_mod_4 else "2"
-                trespass     = (data & 0x100) >> 8
-                voc          = (data & 0x80) >> 7
-                bit6_5       = (data & 0x60) >> 5
-                # Occurs immediately before and after voice grant on VOC
-                voc_active   = (data & 0x10) >> 4
-                bit3         = (data & 0x8) >> 3
-                simulcast    = (data & 0x4) >> 2
-                site_trunk   = (data & 0x2) >> 1
-                bit0         = (data & 0x1)
+                    sys.stderr.write("%s [%d] SMARTNET GROUP EXTENDED FUNCTION tgid(%05d/0x%03x) opcode(0x%04x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4, opcode))
+        # Extended functions on individuals
+        elif self.debug >= 11:
+            rid = osw2_addr
+            # Known single-opcode functions
+            if osw1_addr in OSW_INDIVIDUAL_FUNCTIONS:
+                func_str, rid_str = OSW_INDIVIDUAL_FUNCTIONS[osw1_addr]
+                sys.stderr.write("%s [%d] SMARTNET %s %s(%05d)\n" % (log_ts.get(), self.msgq_id, func_str, rid_str, rid))
+            # Status acknowledgement
+            elif osw1_addr >= 0x26e0 and osw1_addr <= 0x26e7:
+                status = (osw1_addr & 0x7) + 1
+                sys.stderr.write("%s [%d] SMARTNET STATUS ACK src(%05d) status(%01d)\n" % (log_ts.get(), self.msgq_id, rid, status))
+            # Message acknowledgement
+            elif osw1_addr >= 0x26f0 and osw1_addr <= 0x26ff:
+                message = (osw0_addr & 0xf) + 1
+                sys.stderr.write("%s [%d] SMARTNET MESSAGE ACK src(%05d) msg(%d)\n" % (log_ts.get(), self.msgq_id, rid, message))
+            # Denial
+            elif (osw1_addr & 0xfc00) == 0x2c00:
+                reason = osw1_addr & 0x3ff
+                sys.stderr.write("%s [%d] SMARTNET DENIED src(%05d) code(0x%03x)\n" % (log_ts.get(), self.msgq_id, rid, reason))
+            # Unknown extended function
+            else:
+                opcode = osw1_addr
+                sys.stderr.write("%s [%d] SMARTNET INDIVIDUAL EXTENDED FUNCTION src(%05d) opcode(0x%04x)\n" % (log_ts.get(), self.msgq_id, rid, opcode))
+
+        return rc, used
+
+    # Two-OSW message
+    def decode_digital_osws(self, w, is_queue_reset):
+        rc = False
+        used = (0, 1)
+        osw2_addr, osw2_grp, osw2_cmd, osw2_ch_rx, osw2_ch_tx, osw2_f_rx, osw2_f_tx, osw2_t = w[0]
+        osw1_addr, osw1_grp, osw1_cmd, osw1_ch_rx, osw1_ch_tx, osw1_f_rx, osw1_f_tx, osw1_t = w[1]
+        grp1_str = self.get_group_str(osw1_grp)
+
+        # Two-OSW digital group voice grant
+        if osw1_ch_rx and osw2_grp and osw1_grp and (osw1_addr != 0):
+            src_rid = osw2_addr
+            dst_tgid = osw1_addr
+            vc_freq = osw1_f_rx
+            rc |= self.update_voice_frequency(osw1_t, vc_freq, dst_tgid, src_rid, mode=1)
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET DIGITAL %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq))
+        # Two-OSW digital private call voice grant/update (sent for duration of the call)
+        elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            vc_freq = osw1_f_rx
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET DIGITAL PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid, vc_freq))
+        # One- or two-OSW system idle
+        elif osw1_cmd == 0x2f8:
+            osw0_cmd = w[2][2]
+
+            # Valid two-OSW system idle (next command is not a continuation)
+            if osw0_cmd not in OSW_DIGITAL_CONTINUATIONS:
+                src_rid = osw2_addr
+                grp_str = grp1_str
+                data = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET %s STATUS rotation(%d) wide_pulse(%d) cvsd_mod(%s) trespass(%d) voc(%d)" % (log_ts.get(), self.msgq_id, scope, rotation, wide_pulse, cvsd_mod_str, trespass, voc))
-                    if voc or voc_active:
-                        sys.stderr.write(" voc_active(%d)" % (voc_active))
-                    sys.stderr.write(" simulcast(%d) site_trunk(%d) bit6_5(0x%01x) bit3(%d) bit0(%d) bitG(%s)\n" % (simulcast, site_trunk, bit6_5, bit3, bit0, bitG))
+                    sys.stderr.write("%s [%d] SMARTNET IDLE DIGITAL src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
+            # One-OSW system idle that was delayed by one OSW and is now stuck in the middle of a different two- or
+            # three-OSW message.
+            #
+            # Example:
+            #   [OSW A-1] [OSW A-2] [OSW B-1] [OSW B-2] [IDLE] [OSW B-3] [OSW C-1] [OSW C-2]
+            #
+            # Reorder it (process it after OSW A-2 and before OSW B-1) and leave the message it was inside in place to
+            # try processing the message again.
             else:
+                used = (1,)
+                grp_str = grp1_str
+                data = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET %s STATUS opcode(0x%x) data(0x%04x) bitG(%s)\n" % (log_ts.get(), self.msgq_id, scope, grp2_str, opcode, data, bitG))
-        else:
-            # Track that we got an unknown OSW
-            is_unknown_osw = True
+                    sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 1-2 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+        # Two-OSW encrypted private call ring
+        elif osw1_cmd == 0x315 and not osw2_grp and not osw1_grp:
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET DIGITAL ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+        # Two-OSW clear private call ring
+        elif osw1_cmd == 0x317 and not osw2_grp and not osw1_grp:
+            dst_rid = osw2_addr
+            src_rid = osw1_addr
             if self.debug >= 11:
-                type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
+                sys.stderr.write("%s [%d] SMARTNET DIGITAL CLEAR PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+        else:
+            # Track that we got an unknown OSW; OSW1 did not match, so it is left unused
+            self.log_unknown_osws([w[0]], is_queue_reset)
+            return rc, (0,), True
+
+        return rc, used, False
+
+    # One-OSW interconnect reject
+    def decode_interconnect_reject(self, w, is_queue_reset):
+        src_rid = w[0][0]
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET INTERCONNECT REJECT src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+        return False, (0,), False
+
+    # One-OSW send affiliation request
+    def decode_send_affiliation_request(self, w, is_queue_reset):
+        tgt_rid = w[0][0]
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET SEND AFFILIATION REQUEST tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+        return False, (0,), False
+
+    # One-OSW system ID / scan marker
+    def decode_system_id(self, w, is_queue_reset):
+        system   = w[0][0]
+        type_str = "II"
+        self.rx_sys_id = system
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET SYSTEM sys(0x%04x) type(%s)\n" % (log_ts.get(), self.msgq_id, system, type_str))
+        return False, (0,), False
+
+    # One-OSW roaming
+    def decode_roaming(self, w, is_queue_reset):
+        src_rid = w[0][0]
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET ROAMING src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+        return False, (0,), False
+
+    # One-OSW AMSS (Automatic Multiple Site Select) message
+    def decode_amss(self, w, is_queue_reset):
+        osw2_addr, osw2_grp, osw2_cmd = w[0][0:3]
+        # Sites are encoded as 0-indexed but usually referred to as 1-indexed
+        site = osw2_cmd - 0x360 + 1
+        if osw2_grp and (osw2_addr == 0x00000 or osw2_addr == 0xffff):
+            data_str = ""
+        else:
+            # No idea what the data means if it's marked as individual, or group with a value
+            data_str = " data(%s,0x%04x)" % (self.get_group_str(osw2_grp), osw2_addr)
+        self.rx_site_id = site
+        if self.debug >= 11:
+            sys.stderr.write("%s [%d] SMARTNET AMSS site(%02d)%s\n" % (log_ts.get(), self.msgq_id, site, data_str))
+        return False, (0,), False
+
+    # One-OSW BSI / diagnostic
+    def decode_bsi(self, w, is_queue_reset):
+        osw2_addr = w[0][0]
+        # Note that this is still highly speculative - it seems correct for the values that are defined below, but
+        # all other combinations are truly unknown
+        opcode = (osw2_addr & 0xf000) >> 12
+
+        if opcode == 0x8 or opcode == 0x9:
+            status = (osw2_addr & 0xf00) >> 8
+            if status == 0xa:
+                status_str = "enabled"
+            elif status == 0xb:
+                status_str = "disabled"
+            elif status == 0xc:
+                status_str = "malfunction"
+            else:
+                status_str = "unknown 0x%01x" % (status)
 
-        # If we got an unknown OSW after a queue reset, put back the queue reset message so that we know the next
-        # unknown OSW is likely caused by the queue reset as well
-        if is_unknown_osw and is_queue_reset:
-            self.osw_q.appendleft((queue_reset_addr, queue_reset_grp, queue_reset_cmd, queue_reset_ch_rx, queue_reset_ch_tx, queue_reset_f_rx, queue_reset_f_tx, queue_reset_t))
+            component = (osw2_addr & 0xff)
+            if component >= 0x30 and component <= 0x4b:
+                component_str = "receiver %02d" % (component - 0x30 + 1)
+            elif component >= 0x60 and component <= 0x7b:
+                component_str = "transmitter %02d" % (component - 0x60 + 1)
+            else:
+                component_str = "unknown 0x%02x" % (component)
 
-        return rc
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET DIAGNOSTIC STATUS opcode(0x%01x) component(%s) status(%s)\n" % (log_ts.get(), self.msgq_id, opcode, component_str, status_str))
+        elif opcode == 0xe or opcode == 0xf:
+            action_str = "BSI" if opcode == 0xf else "END BSI"
+            if self.debug >= 11:
+                if self.is_chan(osw2_addr & 0x3ff):
+                    data = (osw2_addr & 0xc00) >> 10
+                    vc_freq = self.get_freq(osw2_addr & 0x3ff)
+                    sys.stderr.write("%s [%d] SMARTNET %s data(0x%01x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, action_str, data, vc_freq))
+                else:
+                    data = osw2_addr & 0xfff
+                    sys.stderr.write("%s [%d] SMARTNET %s data(0x%03x)\n" % (log_ts.get(), self.msgq_id, action_str, data))
+        else:
+            data = osw2_addr & 0x3ff
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET DIAGNOSTIC opcode(0x%01x) data(0x%03x)\n" % (log_ts.get(), self.msgq_id, opcode, data))
+        return False, (0,), False
+
+    # One-OSW system status update
+    def decode_system_status(self, w, is_queue_reset):
+        osw2_addr, osw2_grp, osw2_cmd = w[0][0:3]
+        scope = "SYSTEM" if osw2_cmd == 0x3c0 else "NETWORK"
+        opcode = (osw2_addr & 0xe000) >> 13
+        data = osw2_addr & 0x1fff
+        bitG = self.get_group_str(osw2_grp)
+        if opcode == 1:
+            type_ii              = (data & 0x1000) >> 12
+            type_str             = "II" if type_ii else "I"
+            dispatch_timeout     = (data & 0xe00) >> 9
+            connect_tone         = (data & 0xe0) >> 5
+            connect_tone_str     = self.get_connect_tone(connect_tone)
+            interconnect_timeout = (data & 0x1f)
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET %s STATUS type(%s) connect_tone(%.02f) dispatch_timeout(%d) interconnect_timeout(%d) bitG(%s)\n" % (log_ts.get(), self.msgq_id, scope, type_str, connect_tone_str, dispatch_timeout, interconnect_timeout, bitG))
+        elif opcode == 2:
+            no_secure        = (data & 0x1000) >> 12
+            secure_upgrade   = (data & 0x800) >> 11
+            full_data        = (data & 0x400) >> 10
+            no_data          = (data & 0x200) >> 9
+            reduced_otar     = (data & 0x100) >> 8
+            multikey_buf_b   = (data & 0x80) >> 7
+            bit6             = (data & 0x40) >> 6
+            cvsd_echo_delay  = (data & 0x3e) >> 1
+            bit0             = (data & 0x1)
+            # Try to make it more human-readable
+            secure_str       = "none" if no_secure else ("upgraded" if secure_upgrade else "standard")
+            data_str         = "none" if no_data else ("full" if full_data else "reduced")
+            otar_str         = "reduced" if reduced_otar else "full"
+            multikey_buf_str = "B" if multikey_buf_b else "A"
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET %s STATUS data(%s) secure(%s)" % (log_ts.get(), self.msgq_id, scope, data_str, secure_str))
+                # If we have secure enabled
+                if no_secure == 0:
+                    # If we have data enabled
+                    if no_data == 0:
+                        sys.stderr.write(" otar(%s)" % (otar_str))
+                    sys.stderr.write(" multikey_buf(%s) cvsd_echo_delay(%02d)" % (multikey_buf_str, cvsd_echo_delay))
+                sys.stderr.write(" bit6(%d) bit0(%d) bitG(%s)\n" % (bit6, bit0, bitG))
+        elif opcode == 3:
+            rotation     = (data & 0x800) >> 11
+            wide_pulse   = (data & 0x400) >> 10
+            cvsd_mod_4   = (data & 0x200) >> 9
+            cvsd_mod_str = "4" if cvsd_mod_4 else "2"
+            trespass     = (data & 0x100) >> 8
+            voc          = (data & 0x80) >> 7
+            bit6_5       = (data & 0x60) >> 5
+            # Occurs immediately before and after voice grant on VOC
+            voc_active   = (data & 0x10) >> 4
+            bit3         = (data & 0x8) >> 3
+            simulcast    = (data & 0x4) >> 2
+            site_trunk   = (data & 0x2) >> 1
+            bit0         = (data & 0x1)
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET %s STATUS rotation(%d) wide_pulse(%d) cvsd_mod(%s) trespass(%d) voc(%d)" % (log_ts.get(), self.msgq_id, scope, rotation, wide_pulse, cvsd_mod_str, trespass, voc))
+                if voc or voc_active:
+                    sys.stderr.write(" voc_active(%d)" % (voc_active))
+                sys.stderr.write(" simulcast(%d) site_trunk(%d) bit6_5(0x%01x) bit3(%d) bit0(%d) bitG(%s)\n" % (simulcast, site_trunk, bit6_5, bit3, bit0, bitG))
+        else:
+            if self.debug >= 11:
+                sys.stderr.write("%s [%d] SMARTNET %s STATUS opcode(0x%x) data(0x%04x) bitG(%s)\n" % (log_ts.get(), self.msgq_id, scope, opcode, data, bitG))
+        return False, (0,), False
 
     def update_voice_frequency(self, ts, float_freq, tgid=None, srcaddr=-1, mode=-1):
         if not float_freq:    # e.g., channel identifier not yet known
@@ -1798,7 +1721,7 @@ class osw_receiver(object):
                 if self.debug >= 5:
                     sys.stderr.write('%s [%d] ignorning stale OSW for tgid=%s, time_diff=%f\n' % (log_ts.get(), self.msgq_id, base_tgid, (ts - self.talkgroups[base_tgid]['release_time'])))
                 return False
-            self.talkgroups[base_tgid]['time'] = time.time()
+            self.talkgroups[base_tgid]['time'] = vclock.time()
             self.talkgroups[base_tgid]['release_time'] = 0
             self.talkgroups[base_tgid]['frequency'] = frequency
             self.talkgroups[base_tgid]['status'] = tgid_stat
@@ -1943,7 +1866,7 @@ class osw_receiver(object):
         d['adjacent_data']  = {}
         d['last_tsbk']      = self.last_osw
 
-        t = time.time()
+        t = vclock.time()
 
         # Get all current frequencies we know about (CC, alternate CC, VC)
         all_freqs = list(self.voice_frequencies.keys()) + list(self.alternate_cc_freqs.keys())
@@ -2054,8 +1977,8 @@ class voice_receiver(object):
         self.hold_until = 0.0
         self.hold_mode = False
         self.tgid_hold_time = TGID_HOLD_TIME
-        self.blacklist = {}
-        self.skiplist = {}
+        self.blacklist = id_list()
+        self.skiplist = id_list()
         self.whitelist = None
         self.vc_retries = 0
 
@@ -2100,7 +2023,7 @@ class voice_receiver(object):
             elif data > 0:
                 self.add_blacklist(data)
         elif cmd == 'reload':
-            self.blacklist = {}
+            self.blacklist = id_list()
             self.whitelist = None
             self.load_bl_wl()
 
@@ -2140,7 +2063,7 @@ class voice_receiver(object):
             self.expire_talkgroup(reason = "skiplisted")
             self.hold_mode = False
             self.hold_tgid = None
-            self.hold_until = time.time()
+            self.hold_until = vclock.time()
 
     def add_blacklist(self, tgid, end_time=None):
         if not tgid or (tgid <= 0) or (tgid > 65534):
@@ -2164,7 +2087,7 @@ class voice_receiver(object):
             self.expire_talkgroup(reason = "blacklisted")
             self.hold_mode = False
             self.hold_tgid = None
-            self.hold_until = time.time()
+            self.hold_until = vclock.time()
 
     def add_whitelist(self, tgid):
         if not tgid or (tgid <= 0) or (tgid > 65534):
@@ -2176,7 +2099,7 @@ class voice_receiver(object):
             if self.debug > 1:
                 sys.stderr.write("%s [%d] de-blacklisting tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
         if self.whitelist is None:
-            self.whitelist = {}
+            self.whitelist = id_list()
         if tgid in self.whitelist:
             return
         self.whitelist[tgid] = None
@@ -2186,21 +2109,13 @@ class voice_receiver(object):
             self.expire_talkgroup(reason = "not whitelisted")
             self.hold_mode = False
             self.hold_tgid = None
-            self.hold_until = time.time()
+            self.hold_until = vclock.time()
 
     def blacklist_update(self, start_time):
-        expired_tgs = [tg for tg in list(self.blacklist.keys())
-                            if self.blacklist[tg] is not None
-                            and self.blacklist[tg] < start_time]
-        for tg in expired_tgs:
-            self.blacklist.pop(tg)
+        self.blacklist.expire(start_time)
 
     def skiplist_update(self, start_time):
-        expired_tgs = [tg for tg in list(self.skiplist.keys())
-                            if self.skiplist[tg] is not None
-                            and self.skiplist[tg] < start_time]
-        for tg in expired_tgs:
-            self.skiplist.pop(tg)
+        for tg, tg_end in self.skiplist.expire(start_time):
             if self.debug > 1:
                 sys.stderr.write("%s [%d] removing expired skiplist: tg(%d)\n" % (log_ts.get(), self.msgq_id, tg));
 
@@ -2302,7 +2217,7 @@ class voice_receiver(object):
         self.nbfm_ctrl(self.msgq_id, (self.talkgroups[tgid]['mode'] != 1) )     # enable nbfm unless mode is digital
 
     def expire_talkgroup(self, tgid=None, update_meta = True, reason="unk", auto_hold = True):
-        expire_time = time.time()
+        expire_time = vclock.time()
         self.nbfm_ctrl(self.msgq_id, False)                                     # disable nbfm
         self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'set_slotid', 'slotid': 4}) # disable p25cai
         if self.current_tgid is None:
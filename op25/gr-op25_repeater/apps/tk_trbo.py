@@ -22,11 +22,10 @@
 
 import sys
 import ctypes
-import time
 import json
 import traceback
 from helper_funcs import *
-from log_ts import log_ts
+from log_ts import log_ts, vclock
 
 CC_HUNT_TIMEOUTS = 3   # number of sync timeouts to wait until control channel hunt
 VC_SRCH_TIME     = 3.0 # seconds to wait from VC tuning until hunt
@@ -49,7 +48,7 @@ class dmr_chan:
         self.debug = dbglvl
 
 class dmr_receiver:
-    def __init__(self, msgq_id, frequency_set=None, fa_ctrl=None, chans={}, debug=0):
+    def __init__(self, msgq_id, frequency_set=None, fa_ctrl=None, chans={}, debug=0, config={}):
         class _states(object):
             IDLE = 0
             CC   = 1
@@ -70,6 +69,9 @@ class dmr_receiver:
         self.rest_lcn = 0
         self.active_tgids = {}
         self.tune_time = 0
+        self.config = config
+        self.blacklist = id_list()
+        self.whitelist = None
 
     def set_debug(self, dbglvl):
         self.debug = dbglvl
@@ -77,11 +79,26 @@ class dmr_receiver:
     def post_init(self):
         if self.debug >= 1:
             sys.stderr.write("%s [%d] Initializing DMR receiver\n" % (log_ts.get(), self.msgq_id))
+        self.load_bl_wl()
         if self.msgq_id == 0:
             self.tune_next_chan(msgq_id=0, chan=0, slot=0)
         else:
             self.tune_next_chan(msgq_id=1, chan=0, slot=4)
 
+    def load_bl_wl(self):
+        if 'blacklist' in self.config and self.config['blacklist'] != "":
+            sys.stderr.write("%s [%d] reading channel blacklist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['blacklist']))
+            self.blacklist = get_int_dict(self.config['blacklist'], self.msgq_id)
+
+        if 'whitelist' in self.config and self.config['whitelist'] != "":
+            sys.stderr.write("%s [%d] reading channel whitelist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['whitelist']))
+            self.whitelist = get_int_dict(self.config['whitelist'], self.msgq_id)
+
+    def tgid_allowed(self, tgid):
+        if self.whitelist:
+            return tgid in self.whitelist
+        return tgid not in self.blacklist
+
     def to_json(self):  # ugly but required for compatibility with P25 trunking and terminal modules
         d = {}
         d['type']           = 'trbo'
@@ -104,7 +121,10 @@ class dmr_receiver:
                 lcn_sl = (lcn << 1) + slot
                 if self.debug >= 9:
                     sys.stderr.write("%s [%d] CONNECT PLUS CHANNEL GRANT: srcAddr(%06x), grpAddr(%06x), lcn(%d), slot(%d), freq(%f)\n" % (log_ts.get(), self.msgq_id, src_addr, grp_addr, lcn, slot, (freq/1e6)))
-                if (grp_addr not in self.active_tgids) or ((grp_addr in self.active_tgids) and (lcn_sl != self.active_tgids[grp_addr])):
+                if not self.tgid_allowed(grp_addr):
+                    if self.debug >= 9:
+                        sys.stderr.write("%s [%d] Ignoring grant for blacklisted/non-whitelisted tg(%d)\n" % (log_ts.get(), self.msgq_id, grp_addr))
+                elif (grp_addr not in self.active_tgids) or ((grp_addr in self.active_tgids) and (lcn_sl != self.active_tgids[grp_addr])):
                     if self.debug >= 1:
                         sys.stderr.write("%s [%d] Voice update:  tg(%d), freq(%f), slot(%d), lcn(%d)\n" % (log_ts.get(), self.msgq_id, grp_addr, (freq/1e6), slot, lcn))
                     self.frequency_set({'tuner': 1,
@@ -113,9 +133,9 @@ class dmr_receiver:
                                         'chan': chan,
                                         'state': self.states.SRCH,
                                         'type': self.current_type,
-                                        'time': time.time()})
+                                        'time': vclock.time()})
                     self.active_tgids[grp_addr] = lcn_sl
-                self.chans[lcn].slot[slot].grant_time = time.time()
+                self.chans[lcn].slot[slot].grant_time = vclock.time()
                 self.chans[lcn].slot[slot].grp_addr = grp_addr
                 self.chans[lcn].slot[slot].src_addr = src_addr
             elif self.debug >=9:
@@ -140,7 +160,7 @@ class dmr_receiver:
         tune_params = {'tuner': self.msgq_id,
                        'freq': self.chans[self.chan_list[next_ch]].frequency,
                        'chan': next_ch,
-                       'time': time.time()}
+                       'time': vclock.time()}
 
         if msgq_id is not None:
             tune_params['tuner'] = msgq_id
@@ -153,8 +173,22 @@ class dmr_receiver:
         if (self.msgq_id == 0) and (self.debug >= 1):
             sys.stderr.write("%s [%d] Searching for control channel: lcn(%d), freq(%f)\n" % (log_ts.get(), self.msgq_id, self.chan_list[self.current_chan], (self.chans[self.chan_list[self.current_chan]].frequency/1e6)))
 
-    def ui_command(self, msg):
-        pass          # TODO: handle these requests
+    def ui_command(self, cmd, data, curr_time):
+        if cmd == 'whitelist' and data > 0:
+            self.blacklist.pop(int(data), None)
+            if self.whitelist is None:
+                self.whitelist = id_list()
+            self.whitelist[int(data)] = None
+        elif cmd == 'lockout' and data > 0:
+            if self.whitelist:
+                self.whitelist.pop(int(data), None)
+                if len(self.whitelist) == 0:
+                    self.whitelist = None
+            self.blacklist[int(data)] = None
+        elif cmd == 'reload':
+            self.blacklist = id_list()
+            self.whitelist = None
+            self.load_bl_wl()
 
     def process_qmsg(self, msg):
         m_type = ctypes.c_int16(msg.type() & 0xffff).value  # lower 16 bits of msg.type() is signed message type
@@ -181,7 +215,7 @@ class dmr_receiver:
                 self.cc_timeouts = 0
 
         # If voice channel not identified, begin LCN search
-        if (self.msgq_id > 0) and (self.current_state == self.states.SRCH) and (self.tune_time + VC_SRCH_TIME < time.time()):
+        if (self.msgq_id > 0) and (self.current_state == self.states.SRCH) and (self.tune_time + VC_SRCH_TIME < vclock.time()):
             self.tune_next_chan()
 
         # log received message
@@ -399,7 +433,12 @@ class rx_ctl(object):
             self.receivers[rx_id].post_init()
 
     def add_receiver(self, msgq_id, config, meta_q = None, freq = 0):
-        self.receivers[msgq_id] = dmr_receiver(msgq_id, self.frequency_set, self.fa_ctrl, self.chans, self.debug)
+        self.receivers[msgq_id] = dmr_receiver(msgq_id, self.frequency_set, self.fa_ctrl, self.chans, self.debug, config)
+
+    def ui_command(self, cmd, data, msgq_id):
+        curr_time = vclock.time()
+        for rx_id in self.receivers:        # grants are followed by receiver 0, so lists apply to all receivers
+            self.receivers[rx_id].ui_command(cmd, data, curr_time)
 
     def process_qmsg(self, msg):
         m_proto = ctypes.c_int16(msg.type() >> 16).value    # upper 16 bits of msg.type() is signed protocol
@@ -414,7 +453,7 @@ class rx_ctl(object):
             self.receivers[m_rxid].process_qmsg(msg)
 
     def check_expired_grants(self):
-        cur_time = time.time()
+        cur_time = vclock.time()
         for tgid in list(self.receivers[0].active_tgids):
             act_lcn = self.receivers[0].active_tgids[tgid] >> 1
             act_slot = self.receivers[0].active_tgids[tgid] & 1
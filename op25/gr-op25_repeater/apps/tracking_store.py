@@ -0,0 +1,128 @@
+# Persistent frequency tracking cache
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+
+"""
+Per-device, per-frequency tracking corrections that survive a restart.
+
+Entries are held in memory keyed by device serial and frequency (Hz).  A
+background thread rewrites the file whenever something has changed, at most
+once per save interval, via a temporary file and an atomic rename so that a
+crash or power loss leaves either the old or the new file, never a torn one.
+
+File format: {"version": 1, "devices": {"<serial>": {"<freq>": <tracking>, ...}}}
+"""
+
+import os
+import sys
+import json
+import threading
+from log_ts import log_ts
+
+_def_save_interval = 30.0   # seconds between background writes
+FILE_VERSION = 1
+
+def device_serial(args, name):
+    # Prefer an explicit hardware serial from the osmosdr args string, fall back to the device name
+    for tok in str(args).split(','):
+        k, sep, v = tok.strip().partition('=')
+        if sep and k in ('serial', 'rtl', 'hackrf', 'airspy', 'bladerf', 'soapy') and v != "":
+            return "%s=%s" % (k, v)
+    return str(name)
+
+class tracking_store(threading.Thread):
+    def __init__(self, filename, save_interval = _def_save_interval, debug = 0):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.filename = filename
+        self.save_interval = save_interval
+        self.debug = debug
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()   # serializes writers of the file itself
+        self.wake = threading.Event()
+        self.devices = {}
+        self.dirty = False
+        self.keep_running = True
+        self.load()
+        self.start()
+
+    def load(self):
+        if not os.access(self.filename, os.R_OK):
+            return
+        try:
+            with open(self.filename) as f:
+                d = json.load(f)
+            if d.get('version') != FILE_VERSION:
+                return
+            for dev in d['devices']:
+                self.devices[dev] = {int(freq): int(trk) for freq, trk in d['devices'][dev].items()}
+        except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError):
+            sys.stderr.write("%s tracking_store: ignoring unreadable file %s\n" % (log_ts.get(), self.filename))
+            self.devices = {}
+            return
+        if self.debug >= 5:
+            sys.stderr.write("%s tracking_store: loaded %d devices from %s\n" % (log_ts.get(), len(self.devices), self.filename))
+
+    def get(self, dev):        # returns a private copy of the cached {freq: tracking} for a device
+        with self.lock:
+            return dict(self.devices.get(dev, {}))
+
+    def update(self, dev, freq, tracking):
+        tracking = int(tracking)
+        with self.lock:
+            cache = self.devices.setdefault(dev, {})
+            if cache.get(freq) == tracking:
+                return
+            cache[freq] = tracking
+            self.dirty = True
+
+    def save(self):
+        with self.save_lock:
+            self.write_file()
+
+    def write_file(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            d = {'version': FILE_VERSION, 'devices': {dev: {str(freq): trk for freq, trk in self.devices[dev].items()} for dev in self.devices}}
+            self.dirty = False
+        tmp = "%s.tmp" % self.filename
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(d, f, separators=(',', ':'), sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.filename)
+        except (IOError, OSError) as e:
+            with self.lock:
+                self.dirty = True       # retry on the next pass
+            sys.stderr.write("%s tracking_store: unable to write %s: %s\n" % (log_ts.get(), self.filename, e))
+            return
+        if self.debug >= 9:
+            sys.stderr.write("%s tracking_store: saved %s\n" % (log_ts.get(), self.filename))
+
+    def run(self):
+        while self.keep_running:
+            self.wake.wait(self.save_interval)
+            self.save()
+
+    def kill(self):
+        self.keep_running = False
+        self.wake.set()
+        self.join(timeout=2.0)
+        self.save()             # final write in case the thread was mid-wait
@@ -1780,9 +1780,9 @@ class rx_ctl (object):
             else:
                 index = tdma_slot
                 symbol_rate = 6000
-                xorhash = '%x%x%x' % (self.current_nac, tsys.ns_syid, tsys.ns_wacn)
+                xorhash = lfsr.xor_masks.key(self.current_nac, tsys.ns_syid, tsys.ns_wacn)
                 if xorhash not in self.xor_cache:
-                    self.xor_cache[xorhash] = lfsr.p25p2_lfsr(self.current_nac, tsys.ns_syid, tsys.ns_wacn).xor_chars
+                    self.xor_cache[xorhash] = lfsr.xor_masks.get(self.current_nac, tsys.ns_syid, tsys.ns_wacn)
                 decoder.set_xormask(self.xor_cache[xorhash], xorhash, index=index)
             demod.set_omega(symbol_rate)
             decoder.set_output(filename, index=index)
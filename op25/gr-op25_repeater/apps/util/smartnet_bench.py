@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# SmartNet OSW decode micro-benchmark
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+
+# Feeds a synthetic OSW stream through tk_smartnet.osw_receiver for each bandplan
+# and reports channel resolution cost (compiled tables vs. bandplan arithmetic)
+# and overall decode throughput.  Before timing, every channel command 0..0x3ff
+# is checked against the bandplan arithmetic in both directions; any mismatch
+# makes the benchmark exit with status 1.  Run from the apps/util directory.
+
+import os
+import sys
+import random
+import time
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import tk_smartnet
+
+BANDPLANS = [
+    {'bandplan': '800_domestic'},
+    {'bandplan': '800_domestic_splinter'},
+    {'bandplan': '800_rebanded'},
+    {'bandplan': '800_international'},
+    {'bandplan': '900'},
+    {'bandplan': 'OBT', 'bp_base': '406.0', 'bp_base_spacing': '0.0125', 'bp_base_offset': '380', 'bp_tx_base_offset': '0'},
+]
+
+# command mix loosely modelled on a busy type II control channel
+COMMANDS = [0x2f8, 0x2f8, 0x2f8, 0x308, 0x308, 0x30b, 0x30d, 0x310, 0x320, 0x321, 0x322, 0x32b, 0x340, 0x365, 0x3c0]
+
+def osw_stream(count, seed):
+    rnd = random.Random(seed)
+    osws = []
+    for i in range(count):
+        if rnd.random() < 0.4:
+            cmd = rnd.randrange(0x2f8)                     # channel number (grant/update)
+        else:
+            cmd = rnd.choice(COMMANDS)
+        osws.append((rnd.randrange(0x10000), rnd.randrange(2), cmd))
+    return osws
+
+def make_receiver(cfg):
+    config = {'sysname': cfg['bandplan']}
+    config.update(cfg)
+    rx = tk_smartnet.osw_receiver(0, None, config)
+    rx.update_voice_frequency = lambda *args, **kwds: False   # decode only; no trunking side effects
+    return rx
+
+# returns the commands whose table lookup differs from the reference computation
+def verify(cfg):
+    rx = make_receiver(cfg)
+    mismatches = []
+    for is_tx in [False, True]:
+        for cmd in range(0x400):
+            ref_valid = rx.calc_is_chan(cmd, is_tx=is_tx)
+            ref_freq = rx.calc_freq(cmd, is_tx=is_tx) if ref_valid else 0.0
+            if rx.is_chan(cmd, is_tx=is_tx) != ref_valid or rx.get_freq(cmd, is_tx=is_tx) != ref_freq:
+                mismatches.append((cmd, is_tx, ref_valid, ref_freq, rx.is_chan(cmd, is_tx=is_tx), rx.get_freq(cmd, is_tx=is_tx)))
+    return mismatches
+
+def bench(cfg, osws):
+    rx = make_receiver(cfg)
+
+    cmds = [osw[2] for osw in osws]
+    t0 = time.perf_counter()
+    for cmd in cmds:
+        if rx.calc_is_chan(cmd):
+            rx.calc_freq(cmd)
+        if rx.calc_is_chan(cmd, is_tx=True):
+            rx.calc_freq(cmd, is_tx=True)
+    t_calc = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for cmd in cmds:
+        rx.get_freq(cmd)
+        rx.get_freq(cmd, is_tx=True)
+    t_table = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i, (addr, grp, cmd) in enumerate(osws):
+        rx.enqueue(addr, grp, cmd, float(i))
+        rx.process_osws()
+    t_decode = time.perf_counter() - t0
+
+    return t_calc, t_table, t_decode
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-n", "--count", type="int", default=200000, help="number of synthetic OSWs")
+    parser.add_option("-s", "--seed", type="int", default=1, help="random seed")
+    (options, args) = parser.parse_args()
+
+    failed = False
+    for cfg in BANDPLANS:
+        for cmd, is_tx, ref_valid, ref_freq, valid, freq in verify(cfg):
+            sys.stderr.write("%s: %s cmd 0x%03x table (%s, %s) != reference (%s, %s)\n" % (cfg['bandplan'], "tx" if is_tx else "rx", cmd, valid, freq, ref_valid, ref_freq))
+            failed = True
+    if failed:
+        sys.exit(1)
+    sys.stdout.write("channel tables match the bandplan arithmetic for all commands\n")
+
+    osws = osw_stream(options.count, options.seed)
+    sys.stdout.write("%d OSWs per bandplan\n" % options.count)
+    sys.stdout.write("%-24s %12s %12s %14s\n" % ("bandplan", "calc us/osw", "table us/osw", "decode osw/s"))
+    for cfg in BANDPLANS:
+        t_calc, t_table, t_decode = bench(cfg, osws)
+        sys.stdout.write("%-24s %12.3f %12.3f %14.0f\n" % (cfg['bandplan'], t_calc * 1e6 / len(osws), t_table * 1e6 / len(osws), len(osws) / t_decode))
+
+if __name__ == "__main__":
+    main()
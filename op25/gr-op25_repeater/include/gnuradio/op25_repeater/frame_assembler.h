@@ -26,6 +26,8 @@
 #include <gnuradio/block.h>
 #include <gnuradio/msg_queue.h>
 #include <string>
+#include <vector>
+#include <stdint.h>
 
 namespace gr {
     namespace op25_repeater {
@@ -51,6 +53,20 @@ namespace gr {
                 static sptr make(const char* options, int debug, int msgq_id, gr::msg_queue::sptr queue);
                 virtual void set_debug(int debug) {}
                 virtual void control(const std::string& args) {}
+
+                // typed equivalents of the control() commands
+                virtual void set_xormask(const std::string& xormask) {}
+                virtual void set_slotid(int slotid) {}
+                virtual void set_slotkey(int slotkey) {}
+                virtual void set_nac(int nac) {}
+                virtual void sync_reset() {}
+                virtual void call_end() {}
+                virtual void crypt_reset() {}
+                virtual void crypt_key(uint16_t keyid, uint8_t algid, const std::vector<uint8_t>& key) {}
+                virtual void crypt_behavior(int behavior) {}
+                virtual void dump_buffer() {}
+                virtual void set_protocols(const std::string& protocols) {}
+                virtual void set_replay_clock(double rate) {}
         };
 
     } // namespace op25_repeater
@@ -0,0 +1,189 @@
+/*
+ * Stand-alone benchmark for P25 voice decryption.
+ *
+ * Decrypts pseudo-random voice codewords for a run of superframes with
+ * each supported algorithm (DES-OFB, AES-256, ADP) and protocol, and
+ * reports the keystream generation rate and the voice path decrypt rate,
+ * both with the superframe keystream generated inline by prepare() and
+ * with it generated ahead of time by precompute().  The channel figure is
+ * how many voice channels (50 codewords/s each) one core could decrypt.
+ *
+ * This file is part of OP25
+ *
+ * OP25 is free software; you can redistribute it and/or modify it
+ * under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * OP25 is distributed in the hope that it will be useful, but WITHOUT
+ * ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+ * or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+ * License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with OP25; see the file COPYING. If not, write to the Free
+ * Software Foundation, Inc., 51 Franklin Street, Boston, MA
+ * 02110-1301, USA.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <unistd.h>
+#include <string.h>
+#include <time.h>
+#include <vector>
+
+#include "op25_crypt.h"
+#include "op25_crypt_algs.h"
+#include "log_ts.h"
+
+static const int CODEWORDS_PER_SF = 18;		// voice codewords per superframe, both protocols
+static const double CODEWORDS_PER_SEC = 50.0;	// per voice channel
+
+static const struct {
+	uint8_t algid;
+	uint16_t keyid;
+	int keylen;
+	const char* name;
+} ALGS[] = {
+	{ALG_DES_OFB, 1, 8,  "DES-OFB"},
+	{ALG_AES_256, 2, 32, "AES-256"},
+	{ALG_ADP_RC4, 3, 5,  "ADP"}
+};
+static const int N_ALGS = sizeof(ALGS) / sizeof(ALGS[0]);
+
+static double now()
+{
+	struct timespec ts;
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+// decrypts one superframe the way p25p1_fdma / p25p2_tdma do, returns a checksum of the plaintext
+static uint32_t decrypt_superframe(op25_crypt_algs& crypt, uint8_t algid, uint16_t keyid, protocol_type pr_type, uint8_t* mi, const std::vector<packed_codeword>& ct)
+{
+	uint32_t sum = 0;
+	int n = 0;
+	if (pr_type == PT_P25_PHASE1) {
+		for (int ldu = 0; ldu < 2; ldu++) {
+			crypt.prepare(algid, keyid, pr_type, mi);	// once per LDU
+			for (int i = 0; i < 9; i++) {
+				packed_codeword pcw(ct[n++]);
+				crypt.process(pcw, (ldu == 0) ? FT_LDU1 : FT_LDU2, i);
+				for (size_t j = 0; j < pcw.size(); j++)
+					sum = sum * 31 + pcw[j];
+			}
+		}
+	} else {
+		crypt.prepare(algid, keyid, pr_type, mi);
+		for (int ft = FT_2V; ft <= FT_4V_3; ft++) {
+			for (int i = 0; i < ((ft == FT_2V) ? 2 : 4); i++) {
+				packed_codeword pcw(ct[n++]);
+				crypt.process(pcw, (frame_type)ft, i);
+				for (size_t j = 0; j < pcw.size(); j++)
+					sum = sum * 31 + pcw[j];
+			}
+		}
+	}
+	return sum;
+}
+
+int main(int argc, char* argv[])
+{
+	int repeat = 5;
+	int nsf = 1000;
+	int opt;
+
+	while ((opt = getopt(argc, argv, "r:n:")) != -1) {
+		switch (opt) {
+		case 'r': repeat = atoi(optarg); break;
+		case 'n': nsf = atoi(optarg); break;
+		default:
+			fprintf(stderr, "Usage: crypt_bench [-r repeat] [-n superframes]\n");
+			return 1;
+		}
+	}
+	if (repeat < 1 || nsf < 1) {
+		fprintf(stderr, "Usage: crypt_bench [-r repeat] [-n superframes]\n");
+		return 1;
+	}
+
+	log_ts logts;
+	op25_crypt_algs crypt(logts, 0, 0);
+	for (int a = 0; a < N_ALGS; a++) {
+		std::vector<uint8_t> key;
+		for (int i = 0; i < ALGS[a].keylen; i++)
+			key.push_back(i * 7 + 3);
+		crypt.key(ALGS[a].keyid, ALGS[a].algid, key);
+	}
+
+	// more MIs than the keystream cache holds, so every pass generates afresh
+	std::vector<std::vector<uint8_t> > mis;
+	uint8_t mi[9] = {1, 2, 3, 4, 5, 6, 7, 8, 0};
+	for (int i = 0; i < nsf; i++) {
+		mis.push_back(std::vector<uint8_t>(mi, mi + 9));
+		op25_crypt_algs::cycle_p25_mi(mi);
+	}
+
+	uint32_t seed = 1;
+	std::vector<packed_codeword> ct[2];
+	for (int p = 0; p < 2; p++) {
+		for (int i = 0; i < CODEWORDS_PER_SF; i++) {
+			packed_codeword pcw((p == 0) ? 11 : 7);
+			for (size_t j = 0; j < pcw.size(); j++) {
+				seed = seed * 1103515245 + 12345;
+				pcw[j] = seed >> 16;
+			}
+			ct[p].push_back(pcw);
+		}
+	}
+
+	printf("%d superframes (%d codewords each), %d passes\n", nsf, CODEWORDS_PER_SF, repeat);
+	printf("%-8s %-3s %12s %14s %10s %14s %10s\n", "alg", "", "keystream/s", "inline cw/s", "channels", "ahead cw/s", "channels");
+	int rc = 0;
+	for (int a = 0; a < N_ALGS; a++) {
+		for (int p = 0; p < 2; p++) {
+			protocol_type pr_type = (p == 0) ? PT_P25_PHASE1 : PT_P25_PHASE2;
+			uint8_t algid = ALGS[a].algid;
+			uint16_t keyid = ALGS[a].keyid;
+
+			// keystream generation alone
+			double t0 = now();
+			for (int r = 0; r < repeat; r++)
+				for (int s = 0; s < nsf; s++)
+					crypt.precompute(algid, keyid, pr_type, &mis[s][0]);
+			double t_gen = (now() - t0) / repeat;
+
+			// voice path with the keystream generated inline by prepare()
+			uint32_t sum_inline = 0;
+			t0 = now();
+			for (int r = 0; r < repeat; r++)
+				for (int s = 0; s < nsf; s++)
+					sum_inline += decrypt_superframe(crypt, algid, keyid, pr_type, &mis[s][0], ct[p]);
+			double t_inline = (now() - t0) / repeat;
+
+			// voice path with the keystream generated ahead of time, outside the timed section
+			uint32_t sum_ahead = 0;
+			double t_ahead = 0;
+			for (int r = 0; r < repeat; r++) {
+				for (int s = 0; s < nsf; s++) {
+					crypt.precompute(algid, keyid, pr_type, &mis[s][0]);
+					t0 = now();
+					sum_ahead += decrypt_superframe(crypt, algid, keyid, pr_type, &mis[s][0], ct[p]);
+					t_ahead += now() - t0;
+				}
+			}
+			t_ahead /= repeat;
+
+			double cw = (double)nsf * CODEWORDS_PER_SF;
+			printf("%-8s %-3s %12.0f %14.0f %10.0f %14.0f %10.0f\n", ALGS[a].name, (p == 0) ? "P1" : "P2",
+				nsf / t_gen, cw / t_inline, cw / t_inline / CODEWORDS_PER_SEC, cw / t_ahead, cw / t_ahead / CODEWORDS_PER_SEC);
+			if (sum_inline != sum_ahead) {
+				fprintf(stderr, "crypt_bench: MISMATCH between inline and precomputed %s %s plaintext\n", ALGS[a].name, (p == 0) ? "P1" : "P2");
+				rc = 2;
+			}
+		}
+	}
+	return rc;
+}
@@ -44,6 +44,7 @@ dmr_cai::dmr_cai(log_ts& logger, int debug, int msgq_id, gr::msg_queue::sptr que
 	d_debug(debug),
 	d_msgq_id(msgq_id),
 	d_msg_queue(queue),
+	d_msgs_sent(0),
 	logts(logger)
 {
 	d_cach_sig.clear();
@@ -73,8 +74,10 @@ dmr_cai::send_msg(const std::string& m_buf, const int m_type) {
 		return;
 
 	gr::message::sptr msg = gr::message::make_from_string(m_buf, get_msg_type(PROTOCOL_DMR, m_type), (d_msgq_id << 1), logts.get_ts());
-	if (!d_msg_queue->full_p())
+	if (!d_msg_queue->full_p()) {
 	    d_msg_queue->insert_tail(msg);
+	    d_msgs_sent++;
+	}
 }
 
 bool
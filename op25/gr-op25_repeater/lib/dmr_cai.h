@@ -40,6 +40,7 @@ public:
     void set_debug(int debug);
 	inline int chan() { return d_chan; };
 	inline void set_slot_mask(int mask);
+	inline uint32_t msgs_sent() const { return d_msgs_sent + d_slot[0].msgs_sent() + d_slot[1].msgs_sent(); };
 
 private:
 	static const int FRAME_SIZE = 288; // frame length in bits
@@ -54,6 +55,7 @@ private:
 	int d_debug;
 	int d_msgq_id;
 	gr::msg_queue::sptr d_msg_queue;
+	uint32_t d_msgs_sent;	// messages queued by this decoder
 	log_ts& logts;
 
 	void extract_cach_fragment();
@@ -62,7 +62,8 @@ dmr_slot::dmr_slot(const int chan, log_ts& logger, const int debug, int msgq_id,
 	d_chan(chan),
 	d_slot_mask(3),
 	logts(logger),
-	d_msg_queue(queue)
+	d_msg_queue(queue),
+	d_msgs_sent(0)
 {
 	memset(d_slot, 0, sizeof(d_slot));
 	d_slot_type.clear();
@@ -82,8 +83,10 @@ dmr_slot::send_msg(const std::string& m_buf, const int m_type) {
 		return;
 
 	gr::message::sptr msg = gr::message::make_from_string(m_buf, get_msg_type(PROTOCOL_DMR, m_type), ((d_msgq_id << 1) + (d_chan & 0x1)), logts.get_ts());
-	if (!d_msg_queue->full_p())
+	if (!d_msg_queue->full_p()) {
 	    d_msg_queue->insert_tail(msg);
+	    d_msgs_sent++;
+	}
 }
 
 bool
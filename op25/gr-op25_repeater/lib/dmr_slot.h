@@ -70,6 +70,7 @@ public:
 	inline void set_debug(const int debug) { d_debug = debug; };
 	bool load_slot(const uint8_t slot[], uint64_t sl_type);
 	inline void set_slot_mask(int mask) { d_slot_mask = mask; };
+	inline uint32_t msgs_sent() const { return d_msgs_sent; };
 
 private:
 	uint8_t     d_slot[SLOT_SIZE];	// array of bits comprising the current slot
@@ -103,6 +104,7 @@ private:
 	CDMRTrellis trellis;
 	ezpwd::RS<255,252> rs12;	// Reed-Solomon(12,9) object for Link Control decode
 	gr::msg_queue::sptr d_msg_queue;
+	uint32_t d_msgs_sent;	// messages queued by this decoder
 
 	void send_msg(const std::string& m_buf, const int m_type);
 	bool decode_slot_type();
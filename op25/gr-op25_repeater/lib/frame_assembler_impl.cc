@@ -36,6 +36,7 @@
 #include <errno.h>
 #include <vector>
 #include <sys/time.h>
+#include <unistd.h>
 
 #include <nlohmann/json.hpp>
 using json = nlohmann::json;
@@ -43,7 +44,8 @@ using json = nlohmann::json;
 namespace gr {
     namespace op25_repeater {
 
-        // Accept and dispatch JSON formatted commands from python
+        // Accept and dispatch JSON formatted commands from python; the
+        // typed setters below do the same without the JSON round trip
         void frame_assembler_impl::control(const std::string& args) {
             json j = json::parse(args);
             std::string cmd = j["cmd"].get<std::string>();
@@ -51,39 +53,31 @@ namespace gr {
                 fprintf(stderr, "%s frame_assembler_impl::control: cmd(%s), args(%s)\n", logts.get(d_msgq_id), cmd.c_str(), args.c_str());
             }
             if        (cmd == "set_xormask") {
-                if (d_sync)
-                    d_sync->set_xormask(j["xormask"].get<std::string>().c_str());
+                set_xormask(j["xormask"].get<std::string>());
             } else if (cmd == "set_slotid") {
-                if (d_sync)
-                d_sync->set_slot_mask(j["slotid"].get<int>());
+                set_slotid(j["slotid"].get<int>());
             } else if (cmd == "set_slotkey") {
-                if (d_sync)
-                    d_sync->set_slot_key(j["slotkey"].get<int>());
+                set_slotkey(j["slotkey"].get<int>());
             } else if (cmd == "set_nac") {
-                if (d_sync)
-                    d_sync->set_nac(j["nac"].get<int>());
+                set_nac(j["nac"].get<int>());
             } else if (cmd == "sync_reset") {
-                if (d_sync)
-                    d_sync->sync_reset();
+                sync_reset();
             } else if (cmd == "call_end") {
-                if (d_sync)
-                    d_sync->call_end();
+                call_end();
             } else if (cmd == "crypt_reset") {
-                if (d_sync)
-                    d_sync->crypt_reset();
+                crypt_reset();
             } else if (cmd == "crypt_key") {
-                if (d_sync)
-                    d_sync->crypt_key(j["keyid"].get<uint16_t>(), j["algid"].get<uint8_t>(), j["key"].get<std::vector<uint8_t>>());
+                crypt_key(j["keyid"].get<uint16_t>(), j["algid"].get<uint8_t>(), j["key"].get<std::vector<uint8_t>>());
             } else if (cmd == "set_debug") {
-                d_debug = j["debug"].get<int>();
-                if (d_sync)
-                    d_sync->set_debug(j["debug"].get<int>());
+                set_debug(j["debug"].get<int>());
             } else if (cmd == "crypt_behavior") {
-			    if (d_sync)
-			        d_sync->crypt_behavior(j["behavior"].get<int>());	
-			} else if (cmd == "dump_buffer") {
-			    if (d_sync)
-                    d_sync->dump_buffer();
+                crypt_behavior(j["behavior"].get<int>());
+            } else if (cmd == "dump_buffer") {
+                dump_buffer();
+            } else if (cmd == "set_protocols") {
+                set_protocols(j["protocols"].get<std::string>());
+            } else if (cmd == "set_replay_clock") {
+                set_replay_clock(j["rate"].get<double>());
             } else {
                 if (d_debug >= 10) {
                     fprintf(stderr, "%s frame_assembler_impl::control: unhandled cmd(%s)\n", logts.get(d_msgq_id), cmd.c_str());
@@ -91,6 +85,65 @@ namespace gr {
             }
         }
 
+        void frame_assembler_impl::set_xormask(const std::string& xormask) {
+            if (d_sync)
+                d_sync->set_xormask(xormask.c_str());
+        }
+
+        void frame_assembler_impl::set_slotid(int slotid) {
+            if (d_sync)
+                d_sync->set_slot_mask(slotid);
+        }
+
+        void frame_assembler_impl::set_slotkey(int slotkey) {
+            if (d_sync)
+                d_sync->set_slot_key(slotkey);
+        }
+
+        void frame_assembler_impl::set_nac(int nac) {
+            if (d_sync)
+                d_sync->set_nac(nac);
+        }
+
+        void frame_assembler_impl::sync_reset() {
+            if (d_sync)
+                d_sync->sync_reset();
+        }
+
+        void frame_assembler_impl::call_end() {
+            if (d_sync)
+                d_sync->call_end();
+        }
+
+        void frame_assembler_impl::crypt_reset() {
+            if (d_sync)
+                d_sync->crypt_reset();
+        }
+
+        void frame_assembler_impl::crypt_key(uint16_t keyid, uint8_t algid, const std::vector<uint8_t>& key) {
+            if (d_sync)
+                d_sync->crypt_key(keyid, algid, key);
+        }
+
+        void frame_assembler_impl::crypt_behavior(int behavior) {
+            if (d_sync)
+                d_sync->crypt_behavior(behavior);
+        }
+
+        void frame_assembler_impl::dump_buffer() {
+            if (d_sync)
+                d_sync->dump_buffer();
+        }
+
+        void frame_assembler_impl::set_protocols(const std::string& protocols) {
+            if (d_sync)
+                d_sync->set_protocols(protocols.c_str());
+        }
+
+        void frame_assembler_impl::set_replay_clock(double rate) {
+            logts.set_virtual_clock(-1, rate);    // starts from the wall clock, then advances per symbol
+        }
+
         void frame_assembler_impl::set_debug(int debug) {
             d_debug = debug;
             if (d_sync)
@@ -116,6 +169,9 @@ namespace gr {
         static const int MIN_IN = 1;	// mininum number of input streams
         static const int MAX_IN = 1;	// maximum number of input streams
 
+        static const int REPLAY_WAIT_USEC = 500;    // replay: poll interval while the message queue drains
+        static const int REPLAY_WAIT_MAX = 2000;    // replay: give up waiting after this many polls (1 sec)
+
         /*
          * The private constructor
          */
@@ -144,13 +200,30 @@ namespace gr {
             {
 
                 const uint8_t *in = (const uint8_t *) input_items[0];
+                int nconsumed = ninput_items[0];
 
-                if (d_sync) {
+                if (d_sync && logts.is_virtual() && (d_msgq_id >= 0)) {
+                    // Replay: let the trunking module catch up before going on, and stop
+                    // after each message this decoder sends so its responses take effect at the
+                    // same symbol position however fast the host is
+                    for (int w = 0; (d_msg_queue->count() > 0) && (w < REPLAY_WAIT_MAX); w++)
+                        usleep(REPLAY_WAIT_USEC);
+                    uint32_t sent = d_sync->msgs_sent();
+                    for (nconsumed = 0; nconsumed < ninput_items[0]; ) {
+                        logts.tick();
+                        d_sync->rx_sym(in[nconsumed++]);
+                        if (d_sync->msgs_sent() != sent)
+                            break;
+                    }
+                } else if (d_sync && logts.is_virtual()) {
                     for (int i=0; i<ninput_items[0]; i++) {
+                        logts.tick();
                         d_sync->rx_sym(in[i]);
                     }
+                } else if (d_sync) {
+                    d_sync->rx_syms(in, ninput_items[0]);
                 }
-                consume_each(ninput_items[0]);
+                consume_each(nconsumed);
                 // Tell runtime system how many output items we produced.
                 return 0;
             }
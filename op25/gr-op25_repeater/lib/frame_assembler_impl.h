@@ -51,6 +51,18 @@ namespace gr {
                 void queue_msg(int duid);
                 void set_debug(int debug);
                 void control(const std::string& args);
+                void set_xormask(const std::string& xormask);
+                void set_slotid(int slotid);
+                void set_slotkey(int slotkey);
+                void set_nac(int nac);
+                void sync_reset();
+                void call_end();
+                void crypt_reset();
+                void crypt_key(uint16_t keyid, uint8_t algid, const std::vector<uint8_t>& key);
+                void crypt_behavior(int behavior);
+                void dump_buffer();
+                void set_protocols(const std::string& protocols);
+                void set_replay_clock(double rate);
 
             public:
                 log_ts logts;
@@ -0,0 +1,180 @@
+/*
+ * Stand-alone benchmark for the IMBE unvoiced synthesis transforms.
+ *
+ * Decodes a file of IMBE frames, one frame per line as eight hex words
+ * u0..u7 (the format read and written by the vocoder block), once with
+ * each available software_imbe_decoder transform backend, and reports
+ * the frame rate of each path and how far their audio differs.  Without
+ * a file, pseudo-random frames are generated instead.
+ *
+ * This file is part of OP25
+ *
+ * OP25 is free software; you can redistribute it and/or modify it
+ * under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * OP25 is distributed in the hope that it will be useful, but WITHOUT
+ * ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+ * or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+ * License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with OP25; see the file COPYING. If not, write to the Free
+ * Software Foundation, Inc., 51 Franklin Street, Boston, MA
+ * 02110-1301, USA.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <unistd.h>
+#include <time.h>
+#include <math.h>
+#include <new>
+#include <vector>
+
+#include "op25_imbe_frame.h"
+#include "software_imbe_decoder.h"
+#include "imbe_transform.h"
+
+static const int FRAME = 160;			// samples per frame
+static const double FRAMES_PER_SEC = 50.0;
+static const double MIN_SNR_DB = 60.0;		// minimum agreement between the paths
+
+static double now()
+{
+	struct timespec ts;
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+static bool read_frames(const char* filename, std::vector<voice_codeword>& frames)
+{
+	FILE* fp = fopen(filename, "r");
+	if (!fp)
+		return false;
+	char line[256];
+	uint32_t u[8];
+	while (fgets(line, sizeof(line), fp)) {
+		if (sscanf(line, "%x %x %x %x %x %x %x %x", &u[0], &u[1], &u[2], &u[3], &u[4], &u[5], &u[6], &u[7]) != 8)
+			continue;
+		voice_codeword cw(voice_codeword_sz);
+		imbe_header_encode(cw, u[0], u[1], u[2], u[3], u[4], u[5], u[6], u[7]);
+		frames.push_back(cw);
+	}
+	fclose(fp);
+	return true;
+}
+
+// random parameters with a valid pitch (b0 < 208) so every frame is synthesized
+static void make_frames(int n, std::vector<voice_codeword>& frames)
+{
+	uint32_t seed = 1;
+	for (int i = 0; i < n; i++) {
+		uint32_t u[8];
+		for (int j = 0; j < 8; j++) {
+			seed = seed * 1103515245 + 12345;
+			u[j] = seed >> 8;
+		}
+		u[0] = (((u[0] >> 12) % 52) << 6) | (u[0] & 0x3f);
+		for (int j = 1; j < 4; j++)
+			u[j] &= 0xfff;
+		for (int j = 4; j < 7; j++)
+			u[j] &= 0x7ff;
+		u[7] &= 0x7e;
+		voice_codeword cw(voice_codeword_sz);
+		imbe_header_encode(cw, u[0], u[1], u[2], u[3], u[4], u[5], u[6], u[7]);
+		frames.push_back(cw);
+	}
+}
+
+// decodes all frames repeat times, returns seconds per pass and the audio of the last pass
+static double run(int type, const std::vector<voice_codeword>& frames, int repeat, std::vector<float>& audio)
+{
+	double total = 0;
+	for (int r = 0; r < repeat; r++) {
+		// the constructor does not set every member, start both paths from zeroed memory
+		void* mem = calloc(1, sizeof(software_imbe_decoder));
+		software_imbe_decoder* decoder = new (mem) software_imbe_decoder();
+		decoder->set_transform(type);
+		audio_samples* samples = decoder->audio();
+		audio.clear();
+		double t0 = now();
+		for (size_t i = 0; i < frames.size(); i++) {
+			decoder->decode(frames[i]);
+			audio.insert(audio.end(), samples->begin(), samples->end());
+			samples->clear();
+		}
+		total += now() - t0;
+		decoder->~software_imbe_decoder();
+		free(mem);
+	}
+	return total / repeat;
+}
+
+int main(int argc, char* argv[])
+{
+	int repeat = 10;
+	int nframes = 3000;
+	int opt;
+
+	while ((opt = getopt(argc, argv, "r:n:")) != -1) {
+		switch (opt) {
+		case 'r': repeat = atoi(optarg); break;
+		case 'n': nframes = atoi(optarg); break;
+		default:
+			fprintf(stderr, "Usage: imbe_bench [-r repeat] [-n random_frames] [imbe frame file]\n");
+			return 1;
+		}
+	}
+	if (repeat < 1 || nframes < 1) {
+		fprintf(stderr, "Usage: imbe_bench [-r repeat] [-n random_frames] [imbe frame file]\n");
+		return 1;
+	}
+
+	std::vector<voice_codeword> frames;
+	if (optind < argc) {
+		if (!read_frames(argv[optind], frames)) {
+			fprintf(stderr, "imbe_bench: unable to open %s\n", argv[optind]);
+			return 1;
+		}
+		printf("%zu frames from %s, %d passes\n", frames.size(), argv[optind], repeat);
+	} else {
+		make_frames(nframes, frames);
+		printf("%zu random frames, %d passes\n", frames.size(), repeat);
+	}
+	if (frames.empty())
+		return 1;
+
+	std::vector<float> ref_audio;
+	double t_ref = run(IMBE_XFORM_BUILTIN, frames, repeat, ref_audio);
+	printf("builtin: %10.0f frames/s  (%.0fx real time)\n", frames.size() / t_ref, frames.size() / t_ref / FRAMES_PER_SEC);
+
+	imbe_transform* fftw = imbe_transform::make(IMBE_XFORM_FFTW);
+	if (!fftw) {
+		printf("fftw:    not available in this build\n");
+		return 0;
+	}
+	delete fftw;
+
+	std::vector<float> audio;
+	double t_fftw = run(IMBE_XFORM_FFTW, frames, repeat, audio);
+	printf("fftw:    %10.0f frames/s  (%.0fx real time, %.1fx builtin)\n", frames.size() / t_fftw, frames.size() / t_fftw / FRAMES_PER_SEC, t_ref / t_fftw);
+
+	double sig = 0, err = 0, max_err = 0;
+	for (size_t i = 0; i < ref_audio.size() && i < audio.size(); i++) {
+		double d = fabs(audio[i] - ref_audio[i]);
+		sig += ref_audio[i] * ref_audio[i];
+		err += d * d;
+		if (d > max_err)
+			max_err = d;
+	}
+	double snr = (err > 0) ? 10 * log10(sig / err) : INFINITY;
+	printf("difference: max %g, snr %.1f dB over %zu samples\n", max_err, snr, audio.size());
+	if (audio.size() != ref_audio.size() || audio.size() != frames.size() * FRAME || snr < MIN_SNR_DB) {
+		fprintf(stderr, "imbe_bench: MISMATCH between builtin and fftw audio\n");
+		return 2;
+	}
+	return 0;
+}
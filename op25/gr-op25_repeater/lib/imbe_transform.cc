@@ -0,0 +1,264 @@
+// IMBE unvoiced synthesis transforms
+//
+// This file is part of OP25
+//
+// OP25 is free software; you can redistribute it and/or modify it
+// under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 3, or (at your option)
+// any later version.
+//
+// OP25 is distributed in the hope that it will be useful, but WITHOUT
+// ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+// or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+// License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with OP25; see the file COPYING. If not, write to the Free
+// Software Foundation, Inc., 51 Franklin Street, Boston, MA
+// 02110-1301, USA.
+
+#include <math.h>
+#include <string.h>
+
+#include "imbe_transform.h"
+
+#ifdef HAVE_FFTW3F
+#include <mutex>
+#include <fftw3.h>
+#endif
+
+// the original software_imbe_decoder transforms
+class builtin_transform : public imbe_transform {
+public:
+	const char* name() const { return "builtin"; }
+
+	void set_input(const float x[])
+	{
+		memcpy(d_x, x, sizeof(d_x));
+	}
+
+	void spectrum(int lo, int hi, float re[], float im[])
+	{
+		for (int em = lo; em < hi; em++) {
+			re[em] = 0;
+			im[em] = 0;
+			for (int en = 0; en < NWIN; en++) {
+				float exp = -0.0078125 * M_PI * em * (en - WCENTER);
+				re[em] = re[em] + d_x[en] * cos(exp);
+				im[em] = im[em] + d_x[en] * sin(exp);
+			}
+		}
+	}
+
+	void synthesize(float FDi[], float FDq[], float TD[])
+	{
+		//Inverse FFT:
+		//  transform 129-point freq domain(FDx) to 256-point time domain(TD)
+
+		float Ai[128];
+		float Aq[128];
+
+		int I;
+		int J;
+		int K;
+		int H;
+		float l_Ui, l_Uq, Si, Sq, Ti, Tq, Xi, Xq;
+
+		for(I = 0; I <= 63; I++) {
+			J = I + 64;    //64 to 127
+			K = I * 2;     //0 to 126(step 2)
+			H = 128 - K;   //128 to 2(step 2)
+			Ai[I] = FDi[K] + FDq[K];
+			Aq[I] = FDi[K + 1] + FDq[K + 1];
+			Ai[J] = FDi[H] - FDq[H];
+			Aq[J] = FDi[H - 1] - FDq[H - 1];
+		}
+
+		fft(Ai, Aq);
+
+		for(I = 1; I <= 63; I++) {
+			J = 128 - I;    //127 to 65
+			K = I + 128;    //129 to 191
+			H = J + 128;    //255 to 193
+			FDi[K] = (Aq[I] + Aq[J]) / 2;
+			FDi[H] = FDi[K]  ; //a
+			FDq[K] = -(Ai[I] - Ai[J]) / 2;
+			FDq[H] = -FDq[K] ; //b
+			FDi[I] = (Ai[I] + Ai[J]) / 2;
+			FDi[J] = FDi[I]  ; //c
+			FDq[I] = (Aq[I] - Aq[J]) / 2;
+			FDq[J] = -FDq[I] ; //d
+		}
+
+		// I,J=64  K,H=192
+		FDi[192] = Aq[64]; //a
+		FDq[192] = 0     ; //b
+		FDi[64] = Ai[64] ; //c (new)
+		FDq[64] = 0      ; //d
+
+		//I=0  J,K=128  H=256  ( Ax(128) wraps to Ax(0))
+		FDi[128] = Aq[0] ; //a
+		FDq[128] = 0     ; //b
+		FDi[0] = Ai[0]   ; //c (new)
+		FDq[0] = 0       ; //d
+
+		l_Ui = 1; l_Uq = 0;
+		Si = cos(M_PI / 128); Sq = -sin(M_PI / 128);
+		for(I = 0; I <= 127; I++) {
+			J = I + 128  ;   //128 TO 255
+
+			Ti = FDi[J] * l_Ui - FDq[J] * l_Uq; Xi = FDi[I];
+			Tq = FDi[J] * l_Uq + FDq[J] * l_Ui; Xq = FDq[I];
+
+			TD[I + 128] =((Xi + Ti) -(Xq + Tq));
+			TD[I      ] =((Xi - Ti) -(Xq - Tq));
+
+			Ti = l_Ui;
+			l_Ui = Ti * Si - l_Uq * Sq;
+			l_Uq = Ti * Sq + l_Uq * Si;
+		}
+	}
+
+private:
+	// 128 point complex FFT, in place
+	void fft(float REX[], float IMX[])
+	{
+		int I;
+		int J;
+		int K;
+		int H;
+		int KpH;
+		int Ht2;
+		float tmp_f;
+		float l_Ui, l_Uq, Theta, Si, Sq, Ti, Xi, Tq, Xq;
+
+		J = 64;
+		for(I = 1; I <= 126; I++) {
+#define SWAP(x,y) tmp_f=x;x=y;y=tmp_f
+			if(I < J) { SWAP(REX[J], REX[I]); SWAP(IMX[J], IMX[I]); }
+#undef SWAP
+			K = 64;
+			while(K <= J) { J = J - K; K = K / 2; }
+			J = J + K;
+		}
+
+		H = 1;
+		for(I = 1; I <= 7; I++) {
+			Ht2 = H * 2; l_Ui = 1; l_Uq = 0;
+			Theta = M_PI / H; Si = cos(Theta); Sq = -sin(Theta);
+			for(J = 1; J <= H; J++) {
+				for(K = J - 1; K <= 127; K+=Ht2) {
+					KpH = K + H;
+
+					Ti = REX[KpH] * l_Ui - IMX[KpH] * l_Uq; Xi = REX[K];
+					Tq = REX[KpH] * l_Uq + IMX[KpH] * l_Ui; Xq = IMX[K];
+
+					REX[KpH] = Xi - Ti; REX[K] = Xi + Ti;
+					IMX[KpH] = Xq - Tq; IMX[K] = Xq + Tq;
+				}
+				Ti = l_Ui;
+				l_Ui = Ti * Si - l_Uq * Sq;
+				l_Uq = Ti * Sq + l_Uq * Si;
+			}
+			H = Ht2;
+		}
+	}
+
+	float d_x[NWIN];
+};
+
+#ifdef HAVE_FFTW3F
+// FFTW planning is not thread safe, only plan execution is
+static std::mutex fftw_plan_mutex;
+
+class fftw_transform : public imbe_transform {
+public:
+	fftw_transform() :
+		d_fwd(NULL),
+		d_inv(NULL),
+		d_pending(false)
+	{
+		d_time = fftwf_alloc_real(N);
+		d_freq = fftwf_alloc_complex(NBINS);
+		std::lock_guard<std::mutex> lock(fftw_plan_mutex);
+		d_fwd = fftwf_plan_dft_r2c_1d(N, d_time, d_freq, FFTW_MEASURE);
+		d_inv = fftwf_plan_dft_c2r_1d(N, d_freq, d_time, FFTW_MEASURE);
+	}
+
+	~fftw_transform()
+	{
+		std::lock_guard<std::mutex> lock(fftw_plan_mutex);
+		if (d_fwd)
+			fftwf_destroy_plan(d_fwd);
+		if (d_inv)
+			fftwf_destroy_plan(d_inv);
+		fftwf_free(d_time);
+		fftwf_free(d_freq);
+	}
+
+	bool valid() const { return d_fwd != NULL && d_inv != NULL; }
+	const char* name() const { return "fftw"; }
+
+	// sample n of the window goes to d_time[n mod 256], so the r2c output
+	// is U(m) directly; the transform only runs if a bin is requested
+	void set_input(const float x[])
+	{
+		memcpy(d_time, x + WCENTER, (NWIN - WCENTER) * sizeof(float));
+		memset(d_time + NWIN - WCENTER, 0, (N - NWIN) * sizeof(float));
+		memcpy(d_time + N - WCENTER, x, WCENTER * sizeof(float));
+		d_pending = true;
+	}
+
+	void spectrum(int lo, int hi, float re[], float im[])
+	{
+		if (d_pending) {
+			fftwf_execute(d_fwd);
+			d_pending = false;
+		}
+		for (int em = lo; em < hi; em++) {
+			re[em] = d_freq[em][0];
+			im[em] = d_freq[em][1];
+		}
+	}
+
+	// td(n) = sum over m of Re(conj(U(m)) exp(j 2 pi m n / 256)) for
+	// n = -128..127; the (-1)^m factor moves n = -128 to td[0]
+	void synthesize(float re[], float im[], float td[])
+	{
+		d_freq[0][0] = re[0] + im[0];
+		d_freq[0][1] = 0;
+		for (int em = 1; em < N / 2; em++) {
+			float sign = (em & 1) ? -1 : 1;
+			d_freq[em][0] = sign * re[em];
+			d_freq[em][1] = -sign * im[em];
+		}
+		d_freq[N / 2][0] = re[N / 2] - im[N / 2];
+		d_freq[N / 2][1] = 0;
+		fftwf_execute(d_inv);
+		memcpy(td, d_time, N * sizeof(float));
+	}
+
+private:
+	fftwf_plan d_fwd;
+	fftwf_plan d_inv;
+	float* d_time;
+	fftwf_complex* d_freq;
+	bool d_pending;
+};
+#endif /* HAVE_FFTW3F */
+
+imbe_transform*
+imbe_transform::make(int type)
+{
+#ifdef HAVE_FFTW3F
+	if (type == IMBE_XFORM_DEFAULT || type == IMBE_XFORM_FFTW) {
+		fftw_transform* xform = new fftw_transform();
+		if (xform->valid())
+			return xform;
+		delete xform;
+	}
+#endif
+	if (type == IMBE_XFORM_DEFAULT || type == IMBE_XFORM_BUILTIN)
+		return new builtin_transform();
+	return NULL;
+}
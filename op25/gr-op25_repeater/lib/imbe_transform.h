@@ -0,0 +1,68 @@
+// IMBE unvoiced synthesis transforms
+//
+// This file is part of OP25
+//
+// OP25 is free software; you can redistribute it and/or modify it
+// under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 3, or (at your option)
+// any later version.
+//
+// OP25 is distributed in the hope that it will be useful, but WITHOUT
+// ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+// or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+// License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with OP25; see the file COPYING. If not, write to the Free
+// Software Foundation, Inc., 51 Franklin Street, Boston, MA
+// 02110-1301, USA.
+
+#ifndef INCLUDED_IMBE_TRANSFORM_H
+#define INCLUDED_IMBE_TRANSFORM_H
+
+// Transform backend used by software_imbe_decoder::synth_unvoiced().
+//
+// The analysis side takes the 211 windowed noise samples of a frame
+// (n = -105..105, stored at x[0..210]) and returns the 256 point spectrum
+//     U(m) = sum x[n] exp(-j 2 pi m (n - 105) / 256)
+// for the requested bins.  The synthesis side turns bins 0..128 back into
+// the 256 time domain samples n = -128..127.
+//
+// IMBE_XFORM_BUILTIN is the original decoder code (a direct DFT of the
+// unvoiced bins and the hand written real IFFT).  IMBE_XFORM_FFTW uses
+// planned FFTW real transforms, when built with FFTW.  Each backend
+// object owns its plans and buffers, which are reused for every frame.
+
+enum imbe_transform_type {
+	IMBE_XFORM_DEFAULT = 0,		// FFTW when available, else builtin
+	IMBE_XFORM_BUILTIN,
+	IMBE_XFORM_FFTW
+};
+
+class imbe_transform {
+public:
+	static const int N = 256;		// transform length
+	static const int NBINS = N / 2 + 1;	// bins 0..128
+	static const int NWIN = 211;		// analysis window length
+	static const int WCENTER = 105;		// window sample at n = 0
+
+	// returns NULL if the requested backend is not available
+	static imbe_transform* make(int type = IMBE_XFORM_DEFAULT);
+
+	virtual ~imbe_transform() { }
+	virtual const char* name() const = 0;
+
+	// load the windowed samples for the following spectrum() calls
+	virtual void set_input(const float x[]) = 0;
+
+	// U(m) for lo <= m < hi into re[m], im[m]
+	virtual void spectrum(int lo, int hi, float re[], float im[]) = 0;
+
+	// time domain samples n = -128..127 into td[n + 128] from bins 0..128
+	// of re[] and im[].  As in the original code, the imaginary part of
+	// bin 0 is added to its real part and that of bin 128 subtracted.
+	// re[] and im[] must hold 256 entries and are used as scratch.
+	virtual void synthesize(float re[], float im[], float td[]) = 0;
+};
+
+#endif /* INCLUDED_IMBE_TRANSFORM_H */
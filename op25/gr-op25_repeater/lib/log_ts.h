@@ -23,6 +23,7 @@
 
 #include <time.h>
 #include <sys/time.h>
+#include <stdint.h>
 #include <string.h>
 #include <string>
 #include <vector>
@@ -51,9 +52,17 @@ private:
 	struct tm curr_loc_time;
 	double tstamp;
 	char log_tstring[40];
+	bool d_virtual;			// replay mode: time is derived from the symbol count
+	double d_vbase;			// virtual time at the last clock (re)start
+	double d_vrate;			// symbols per second
+	uint64_t d_vsyms;		// symbols processed since d_vbase
 
 public:
-	inline log_ts()
+	inline log_ts() :
+		d_virtual(false),
+		d_vbase(0),
+		d_vrate(1),
+		d_vsyms(0)
 	{
 		if (gettimeofday(&curr_time, 0) == 0)
 		{
@@ -66,9 +75,55 @@ public:
 		}
 	}
 
+	// Switch to a virtual clock advanced by tick() once per symbol at the given rate.
+	// A negative start_ts keeps the current virtual time (symbol rate change).
+	inline void set_virtual_clock(double start_ts, double rate)
+	{
+		if (start_ts < 0)
+			start_ts = d_virtual ? get_virtual_ts() : get_wall_ts();
+		d_vbase = start_ts;
+		d_vrate = (rate > 0) ? rate : 1;
+		d_vsyms = 0;
+		d_virtual = true;
+	}
+
+	inline bool is_virtual() const
+	{
+		return d_virtual;
+	}
+
+	inline void tick()
+	{
+		d_vsyms++;
+	}
+
+	inline double get_virtual_ts() const
+	{
+		return d_vbase + (d_vsyms / d_vrate);
+	}
+
+	inline double get_wall_ts() const
+	{
+		struct timeval tv;
+		if (gettimeofday(&tv, 0) != 0)
+			return 0;
+		return tv.tv_sec + (tv.tv_usec / 1e6);
+	}
+
+	// current time from the wall clock or, in replay mode, the virtual clock
+	inline int get_time(struct timeval* tv) const
+	{
+		if (!d_virtual)
+			return gettimeofday(tv, 0);
+		double t = get_virtual_ts();
+		tv->tv_sec = (time_t) t;
+		tv->tv_usec = (suseconds_t) ((t - tv->tv_sec) * 1e6);
+		return 0;
+	}
+
 	inline const char* get()
 	{
-		if (gettimeofday(&curr_time, 0) == 0)
+		if (get_time(&curr_time) == 0)
 		{
 			localtime_r(&curr_time.tv_sec, &curr_loc_time);
 			size_t i = strftime(log_tstring, sizeof(log_tstring), "%m/%d/%y %H:%M:%S", &curr_loc_time);
@@ -87,7 +142,7 @@ public:
 
 	inline const char* get(const int id)
 	{
-		if (gettimeofday(&curr_time, 0) == 0)
+		if (get_time(&curr_time) == 0)
 		{
 			localtime_r(&curr_time.tv_sec, &curr_loc_time);
 			size_t i = strftime(log_tstring, sizeof(log_tstring), "%m/%d/%y %H:%M:%S", &curr_loc_time);
@@ -106,7 +161,7 @@ public:
 
 	inline double get_ts()
 	{
-		if (gettimeofday(&curr_time, 0) == 0)
+		if (get_time(&curr_time) == 0)
 			tstamp = curr_time.tv_sec + (curr_time.tv_usec / 1e6);
 		else
 			tstamp = 0;
@@ -40,7 +40,6 @@ op25_crypt_adp::~op25_crypt_adp() {
 bool
 op25_crypt_adp::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
     d_pr_type = pr_type;
-    memcpy(d_mi, MI, sizeof(d_mi));
 
     d_key_iter = d_keys.find(keyid);
     if (d_key_iter == d_keys.end()) {
@@ -54,12 +53,25 @@ op25_crypt_adp::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
     }
     d_position = 0;
     d_pr_type = pr_type;
+    load_keystream(keyid, pr_type, MI, d_keystream);
 
+    return true;
+}
+
+// superframe keystream length
+size_t
+op25_crypt_adp::keystream_len(protocol_type pr_type) {
+    return sizeof(d_keystream);
+}
+
+// superframe keystream generation
+void
+op25_crypt_adp::generate(const key_info& kinfo, protocol_type pr_type, uint8_t *MI, uint8_t *keystream) {
     // Find key value from keyid and set up to create keystream
     uint8_t adp_key[13], S[256], K[256];
     uint32_t i, j, k;
-    std::vector<uint8_t>::const_iterator kval_iter = d_key_iter->second.key.begin();
-    for (i = 0; i < (uint32_t)std::max(5-(int)(d_key_iter->second.key.size()), 0); i++) {
+    std::vector<uint8_t>::const_iterator kval_iter = kinfo.key.begin();
+    for (i = 0; i < (uint32_t)std::max(5-(int)(kinfo.key.size()), 0); i++) {
         adp_key[i] = 0;             // pad with leading 0 if supplied key too short 
     }
     for ( ; i < 5; i++) {
@@ -68,7 +80,7 @@ op25_crypt_adp::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
 
     j = 0;
     for (i = 5; i < 13; ++i) {
-        adp_key[i] = d_mi[i - 5];   // append MI bytes
+        adp_key[i] = MI[i - 5];     // append MI bytes
     }
 
     for (i = 0; i < 256; ++i) {
@@ -90,10 +102,8 @@ op25_crypt_adp::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
         i = (i + 1) & 0xFF;
         j = (j + S[i]) & 0xFF;
         adp_swap(S, i, j);
-        d_keystream[k] = S[(S[i] + S[j]) & 0xFF];
+        keystream[k] = S[(S[i] + S[j]) & 0xFF];
     }
-
-    return true;
 }
 
 // process routine entry point
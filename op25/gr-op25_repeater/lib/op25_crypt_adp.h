@@ -31,10 +31,13 @@ class op25_crypt_adp : public op25_crypt_alg
 {
     private:
         protocol_type d_pr_type;
-        uint8_t d_mi[9];
         uint8_t d_keystream[469];
         uint32_t d_position;
 
+    protected:
+        virtual size_t keystream_len(protocol_type pr_type);
+        virtual void generate(const key_info& kinfo, protocol_type pr_type, uint8_t *MI, uint8_t *keystream);
+
     public:
         virtual bool prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI);
         virtual bool process(packed_codeword& PCW, frame_type fr_type, int voice_subframe);
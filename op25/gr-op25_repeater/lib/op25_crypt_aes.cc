@@ -919,7 +919,21 @@ op25_crypt_aes::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
     if (d_debug >= 10) {
         fprintf(stderr, "%s op25_crypt_aes::prepare: keyid[0x%x] found\n", logts.get(d_msgq_id), keyid);
     }
+    load_keystream(keyid, pr_type, MI, d_keystream);
+    d_position = 0;
+
+    return true;
+}
+
+// superframe keystream length
+size_t
+op25_crypt_aes::keystream_len(protocol_type pr_type) {
+    return AES_BLOCKLEN * ((pr_type == PT_P25_PHASE2) ? 9 : 15);
+}
 
+// superframe keystream generation
+void
+op25_crypt_aes::generate(const key_info& kinfo, protocol_type pr_type, uint8_t *MI, uint8_t *keystream) {
     // Expand MI to create proper IV
     uint8_t IV[16];
     op25_crypt_algs::expand_mi_to_128(MI, IV);
@@ -927,8 +941,8 @@ op25_crypt_aes::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
 	// Find key value from keyid and set up to create keystream
     uint8_t Key[32];
     uint32_t i;
-	std::vector<uint8_t>::const_iterator kval_iter = d_key_iter->second.key.begin();
-	for (i = 0; i < (uint32_t)std::max(32 - (int)(d_key_iter->second.key.size()), 0); i++) {
+	std::vector<uint8_t>::const_iterator kval_iter = kinfo.key.begin();
+	for (i = 0; i < (uint32_t)std::max(32 - (int)(kinfo.key.size()), 0); i++) {
 		Key[i] = 0;             // pad with leading 0 if supplied key is too short 
 	}
 	for (; i < 32; i++) {
@@ -937,10 +951,7 @@ op25_crypt_aes::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
 
     // Run the crypt routine to create a keystream long enough for the whole superframe
     // Length is dependent on protocol: FDMA=15 blocks, TDMA=9 blocks.
-    aes_ofb_keystream_output (IV, Key, d_keystream, 2, ((pr_type == PT_P25_PHASE2) ? 9 : 15));
-    d_position = 0;
-
-    return true;
+    aes_ofb_keystream_output (IV, Key, keystream, 2, ((pr_type == PT_P25_PHASE2) ? 9 : 15));
 }
 
 // process routine entry point
@@ -44,6 +44,10 @@ class op25_crypt_aes : public op25_crypt_alg
         unsigned Nk = 8;
         unsigned Nr = 14;
 
+    protected:
+        virtual size_t keystream_len(protocol_type pr_type);
+        virtual void generate(const key_info& kinfo, protocol_type pr_type, uint8_t *MI, uint8_t *keystream);
+
     public:
         virtual bool prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI);
         virtual bool process(packed_codeword& PCW, frame_type fr_type, int voice_subframe);
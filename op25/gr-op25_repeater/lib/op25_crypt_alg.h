@@ -23,13 +23,56 @@
 
 #include <gnuradio/msg_queue.h>
 #include <unordered_map>
+#include <list>
+#include <vector>
+#include <string.h>
 
 #include "op25_crypt.h"
 #include "log_ts.h"
 
+static const size_t KEYSTREAM_CACHE_SIZE = 8;   // superframe keystreams kept per algorithm
+
 // Base class for implementation of individual decryption algorithms
+//
+// Superframe keystreams are kept in a small LRU cache keyed by keyid,
+// protocol and MI, so a keystream generated ahead of time by precompute()
+// (or already used by an earlier prepare() call) is not generated again.
 class op25_crypt_alg
 {
+    private:
+        struct keystream_entry {
+            uint16_t keyid;
+            protocol_type pr_type;
+            uint64_t mi;
+            std::vector<uint8_t> keystream;
+        };
+        std::list<keystream_entry> d_ks_cache;  // most recently used first
+
+        // keystream for key and MI, from the cache or newly generated
+        inline const std::vector<uint8_t>& cached_keystream(uint16_t keyid, const key_info& key, protocol_type pr_type, uint8_t *MI) {
+            uint64_t mi = 0;
+            for (int i = 0; i < 8; i++) {
+                mi = (mi << 8) + MI[i];
+            }
+            for (auto it = d_ks_cache.begin(); it != d_ks_cache.end(); ++it) {
+                if ((it->keyid == keyid) && (it->pr_type == pr_type) && (it->mi == mi)) {
+                    d_ks_cache.splice(d_ks_cache.begin(), d_ks_cache, it);
+                    return it->keystream;
+                }
+            }
+            if (d_ks_cache.size() >= KEYSTREAM_CACHE_SIZE)
+                d_ks_cache.splice(d_ks_cache.begin(), d_ks_cache, std::prev(d_ks_cache.end()));    // reuse the oldest entry
+            else
+                d_ks_cache.emplace_front();
+            keystream_entry& e = d_ks_cache.front();
+            e.keyid = keyid;
+            e.pr_type = pr_type;
+            e.mi = mi;
+            e.keystream.resize(keystream_len(pr_type));
+            generate(key, pr_type, MI, e.keystream.data());
+            return e.keystream;
+        }
+
     protected:
         log_ts& logts;
         int d_debug;
@@ -37,6 +80,18 @@ class op25_crypt_alg
         std::unordered_map<uint16_t, key_info> d_keys;
         std::unordered_map<uint16_t, key_info>::const_iterator d_key_iter;
 
+        // length of the keystream for one superframe
+        virtual size_t keystream_len(protocol_type pr_type) = 0;
+
+        // generate the keystream for one superframe
+        virtual void generate(const key_info& key, protocol_type pr_type, uint8_t *MI, uint8_t *keystream) = 0;
+
+        // copy the superframe keystream for the current key (d_key_iter) into keystream
+        inline void load_keystream(uint16_t keyid, protocol_type pr_type, uint8_t *MI, uint8_t *keystream) {
+            const std::vector<uint8_t>& ks = cached_keystream(keyid, d_key_iter->second, pr_type, MI);
+            memcpy(keystream, ks.data(), ks.size());
+        }
+
     public:
         virtual bool prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) = 0;
         virtual bool process(packed_codeword& PCW, frame_type fr_type, int voice_subframe) = 0;
@@ -44,15 +99,31 @@ class op25_crypt_alg
         inline op25_crypt_alg(log_ts& logger, int debug, int msgq_id) : logts(logger), d_debug(debug), d_msgq_id(msgq_id) { }
         inline virtual ~op25_crypt_alg() { }
 
-        inline virtual void reset(void) { d_keys.clear(); }
+        inline virtual void reset(void) { d_keys.clear(); d_ks_cache.clear(); }
         inline virtual void set_debug(int debug) { d_debug = debug; }
         inline virtual uint8_t key(uint16_t keyid, uint8_t algid, const std::vector<uint8_t> &key) {
             if ((keyid == 0) || (algid == ALG_UNENCRYPTED))
                 return 0;
             d_keys[keyid] = key_info(algid, key);
+            d_key_iter = d_keys.end();
+            for (auto it = d_ks_cache.begin(); it != d_ks_cache.end(); ) {     // drop keystreams made with an old key value
+                if (it->keyid == keyid)
+                    it = d_ks_cache.erase(it);
+                else
+                    ++it;
+            }
             return algid;
         }
 
+        // generate the keystream of an upcoming superframe ahead of time
+        inline bool precompute(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
+            std::unordered_map<uint16_t, key_info>::const_iterator it = d_keys.find(keyid);
+            if (it == d_keys.end())
+                return false;
+            cached_keystream(keyid, it->second, pr_type, MI);
+            return true;
+        }
+
 };
 
 #endif /* INCLUDED_OP25_REPEATER_OP25_CRYPT_ALG_H  */
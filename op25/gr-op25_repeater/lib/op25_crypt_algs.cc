@@ -47,7 +47,7 @@ op25_crypt_algs::~op25_crypt_algs() {
     d_alg_iter = d_algs.begin();
     while (d_alg_iter != d_algs.end()) {
         delete d_alg_iter->second;
-        d_algs.erase(d_alg_iter);
+        d_alg_iter = d_algs.erase(d_alg_iter);
     }
 }
 
@@ -104,6 +104,19 @@ bool op25_crypt_algs::prepare(uint8_t algid, uint16_t keyid, protocol_type pr_ty
     return d_alg_iter->second->prepare(keyid, pr_type, MI);
 }
 
+// generate the keystream for an upcoming superframe ahead of time
+// so that the following prepare() call finds it already cached
+bool op25_crypt_algs::precompute(uint8_t algid, uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
+    std::unordered_map<uint8_t, op25_crypt_alg*>::const_iterator alg_iter = d_algs.find(algid);
+    if (alg_iter == d_algs.end())
+        return false;
+    bool rc = alg_iter->second->precompute(keyid, pr_type, MI);
+    if (d_debug >= 10) {
+        fprintf(stderr, "%s op25_crypt_algs::precompute: algid[0x%x] keyid[0x%x] %s\n", logts.get(d_msgq_id), algid, keyid, rc ? "ready" : "key not found");
+    }
+    return rc;
+}
+
 // generic entry point to perform decryption
 bool op25_crypt_algs::process(packed_codeword& PCW, frame_type fr_type, int voice_subframe) {
     if (d_alg_iter == d_algs.end()) {
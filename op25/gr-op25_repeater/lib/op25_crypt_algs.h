@@ -43,6 +43,7 @@ class op25_crypt_algs
 
         void key(uint16_t keyid, uint8_t algid, const std::vector<uint8_t> &key);
         bool prepare(uint8_t algid, uint16_t keyid, protocol_type pr_type, uint8_t *MI);
+        bool precompute(uint8_t algid, uint16_t keyid, protocol_type pr_type, uint8_t *MI);
         bool process(packed_codeword& PCW, frame_type fr_type, int voice_subframe);
         void reset(void);
         inline void set_debug(int debug) {d_debug = debug;}
@@ -60,14 +60,27 @@ op25_crypt_des::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
     }
     d_pr_type = pr_type;
     d_position = 0;
+    load_keystream(keyid, pr_type, MI, d_keystream);
 
+    return true;
+}
+
+// superframe keystream length
+size_t
+op25_crypt_des::keystream_len(protocol_type pr_type) {
+    return sizeof(d_keystream);
+}
+
+// superframe keystream generation
+void
+op25_crypt_des::generate(const key_info& kinfo, protocol_type pr_type, uint8_t *MI, uint8_t *keystream) {
 	std::string key, mi, ct;
 	uint8_t des_key[8];
 	uint32_t i;
 	
 	// Find key value from keyid and set up to create keystream
-	std::vector<uint8_t>::const_iterator kval_iter = d_key_iter->second.key.begin();
-	for (i = 0; i < (uint32_t)std::max(8 - (int)(d_key_iter->second.key.size()), 0); i++) {
+	std::vector<uint8_t>::const_iterator kval_iter = kinfo.key.begin();
+	for (i = 0; i < (uint32_t)std::max(8 - (int)(kinfo.key.size()), 0); i++) {
 		des_key[i] = 0;             // pad with leading 0 if supplied key too short 
 	}
 	for (; i < 8; i++) {
@@ -144,13 +157,11 @@ op25_crypt_des::prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI) {
         }
 
         // Append keystream to ks_array
-        string2ByteArray(ct, d_keystream, offset);
+        string2ByteArray(ct, keystream, offset);
 
         // Increment offset by 8 for next round
         offset += 8;
     }
-
-    return true;
 }
 
 // process routine entry point
@@ -48,6 +48,10 @@ class op25_crypt_des : public op25_crypt_alg
         std::string byteArray2string(uint8_t array[]);
         void        string2ByteArray(const std::string& s, uint8_t array[], int offset);
 
+    protected:
+        virtual size_t keystream_len(protocol_type pr_type);
+        virtual void generate(const key_info& kinfo, protocol_type pr_type, uint8_t *MI, uint8_t *keystream);
+
     public:
         virtual bool prepare(uint16_t keyid, protocol_type pr_type, uint8_t *MI);
         virtual bool process(packed_codeword& PCW, frame_type fr_type, int voice_subframe);
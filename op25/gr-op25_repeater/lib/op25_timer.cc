@@ -22,7 +22,8 @@
 #include "op25_timer.h"
 
 op25_timer::op25_timer(uint64_t duration) :
-	d_duration(duration)
+	d_duration(duration),
+	d_clock(NULL)
 {
 	reset();
 }
@@ -31,17 +32,33 @@ op25_timer::~op25_timer()
 {
 }
 
+void
+op25_timer::set_clock(const log_ts* clock)
+{
+	d_clock = clock;
+	reset();
+}
+
+void
+op25_timer::now(struct timeval* tv)
+{
+	if (d_clock)
+		d_clock->get_time(tv);
+	else
+		gettimeofday(tv, 0);
+}
+
 void
 op25_timer::reset()
 {
-	gettimeofday(&d_timer, 0);
+	now(&d_timer);
 }
 
 bool
 op25_timer::expired()
 {
 	struct timeval cur_time;
-	gettimeofday(&cur_time, 0);
+	now(&cur_time);
 
 	int64_t diff_usec = cur_time.tv_usec - d_timer.tv_usec;
 	int64_t diff_sec  = cur_time.tv_sec  - d_timer.tv_sec ;
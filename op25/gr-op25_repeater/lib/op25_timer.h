@@ -24,17 +24,22 @@
 
 #include <sys/time.h>
 #include <stdint.h>
+#include "log_ts.h"
 
 class op25_timer {
 public:
 	op25_timer(const uint64_t duration);
 	~op25_timer();
+	void set_clock(const log_ts* clock);	// follow the (possibly virtual) time of a log_ts
 	void reset();
 	bool expired();
 
 private:
+	void now(struct timeval* tv);
+
 	struct timeval d_timer;
 	uint64_t d_duration;
+	const log_ts* d_clock;
 };
 
 #endif /* INCLUDED_OP25_TIMER_H */
@@ -213,6 +213,7 @@ namespace gr {
             d_nac(0),
             d_behavior(0),
             d_msg_queue(queue),
+            d_msgs_sent(0),
             output_queue(output_queue),
             framer(new p25_framer(logger, debug, msgq_id)),
             qtimer(op25_timer(TIMEOUT_THRESHOLD)),
@@ -223,6 +224,7 @@ namespace gr {
             ess_algid(0x80),
             vf_tgid(0)
         {
+            qtimer.set_clock(&logts);
         }
 
         void p25p1_fdma::process_duid(uint32_t const duid, uint32_t const nac, const uint8_t* buf, const int len) {
@@ -363,6 +365,11 @@ namespace gr {
                 op25_crypt_algs::cycle_p25_mi(ess_mi);
             }
 
+            // the next superframe's MI is known now; generate its keystream ahead of the LDU1
+            if (encrypted()) {
+                crypt_algs.precompute(ess_algid, ess_keyid, PT_P25_PHASE1, ess_mi);
+            }
+
             std::string encr = "{\"encrypted\": " + std::to_string(encrypted() ? 1 : 0) + ", \"algid\": " + std::to_string(ess_algid) + ", \"keyid\": " + std::to_string(ess_keyid) + "}";
             send_msg(encr, M_P25_JSON_DATA);
         }
@@ -681,8 +688,10 @@ namespace gr {
                 return;
 
             gr::message::sptr msg = gr::message::make_from_string(msg_str, get_msg_type(PROTOCOL_P25, msg_type), (d_msgq_id << 1), logts.get_ts());
-            if (!d_msg_queue->full_p())
+            if (!d_msg_queue->full_p()) {
                 d_msg_queue->insert_tail(msg);
+                d_msgs_sent++;
+            }
         }
 
         void p25p1_fdma::process_frame() {
@@ -782,8 +791,10 @@ namespace gr {
 
                     qtimer.reset();
                     gr::message::sptr msg = gr::message::make(get_msg_type(PROTOCOL_P25, M_P25_TIMEOUT), (d_msgq_id << 1), logts.get_ts());
-                    if (!d_msg_queue->full_p())
+                    if (!d_msg_queue->full_p()) {
                         d_msg_queue->insert_tail(msg);
+                        d_msgs_sent++;
+                    }
                 }
             }
         }
@@ -79,6 +79,7 @@ namespace gr {
                 int d_nac;
                 int d_behavior;
                 gr::msg_queue::sptr d_msg_queue;
+                uint32_t d_msgs_sent;	// messages queued by this decoder
                 std::deque<int16_t> &output_queue;
                 p25_framer* framer;
                 op25_timer qtimer;
@@ -106,6 +107,7 @@ namespace gr {
                 void crypt_behavior(int behavior);
                 void crypt_key(uint16_t keyid, uint8_t algid, const std::vector<uint8_t> &key);
                 void rx_sym (const uint8_t *syms, int nsyms);
+                inline uint32_t msgs_sent() const { return d_msgs_sent; }
                 p25p1_fdma(const op25_audio& udp, log_ts& logger, int debug, bool do_imbe, bool do_output, bool do_msgq, gr::msg_queue::sptr queue, std::deque<int16_t> &output_queue, bool do_audio_output, int msgq_id = 0);
                 ~p25p1_fdma();
                 uint32_t load_nid(const uint8_t *syms, int nsyms, const uint64_t fs);
@@ -98,6 +98,7 @@ p25p2_tdma::p25p2_tdma(const op25_audio& udp, log_ts& logger, int slotid, int de
 	mbe_err_cnt(0),
 	tone_frame(false),
 	d_msg_queue(queue),
+	d_msgs_sent(0),
 	output_queue_decode(qptr),
 	d_do_msgq(do_msgq),
 	d_msgq_id(msgq_id),
@@ -812,6 +813,10 @@ void p25p2_tdma::handle_4V2V_ess(const uint8_t dibits[])
 	} else if (d_debug >= 10) {
 		fprintf(stderr, "ESS: (partial)\n");
 	}
+	// the next superframe's MI is known now; generate its keystream ahead of the 2V promotion
+	if ((burst_id == 4) && (next_algid != 0x80)) {
+		crypt_algs.precompute(next_algid, next_keyid, PT_P25_PHASE2, next_mi);
+	}
 }
 
 void p25p2_tdma::send_msg(const std::string msg_str, long msg_type)
@@ -820,6 +825,8 @@ void p25p2_tdma::send_msg(const std::string msg_str, long msg_type)
 		return;
 
 	gr::message::sptr msg = gr::message::make_from_string(msg_str, get_msg_type(PROTOCOL_P25, msg_type), (d_msgq_id << 1), logts.get_ts());
-    if (!d_msg_queue->full_p())
+    if (!d_msg_queue->full_p()) {
     	d_msg_queue->insert_tail(msg);
+    	d_msgs_sent++;
+    }
 }
@@ -56,6 +56,7 @@ public:
 	inline void set_nac(int nac) { d_nac = nac; }
 	void crypt_behavior(int behavior);
 	inline void set_debug(int debug) { d_debug = debug; }
+	inline uint32_t msgs_sent() const { return d_msgs_sent; }
 	bool rx_sym(uint8_t sym);
 	int handle_frame(void) ;
 private:
@@ -75,6 +76,7 @@ private:
 	bool tone_frame;
 	software_imbe_decoder software_decoder;
 	gr::msg_queue::sptr d_msg_queue;
+	uint32_t d_msgs_sent;	// messages queued by this decoder
 	std::deque<int16_t> &output_queue_decode;
 	bool d_do_msgq;
 	int d_msgq_id;
@@ -28,6 +28,7 @@ namespace gr {
         class rx_base {
             public:
                 virtual void rx_sym(const uint8_t sym) = 0;
+                virtual void rx_syms(const uint8_t* syms, size_t n) { for (size_t i = 0; i < n; i++) rx_sym(syms[i]); }
                 virtual void sync_reset(void) = 0;
                 virtual void call_end(void) = 0;
                 virtual void crypt_reset(void) = 0;
@@ -38,6 +39,8 @@ namespace gr {
                 virtual void set_nac(int nac) = 0;
                 virtual void set_debug(int debug) = 0;
                 virtual void dump_buffer() { };
+                virtual void set_protocols(const char* protocols) { };
+                virtual uint32_t msgs_sent() const = 0;  // messages queued so far, used to pace replay
                 // Crypt_behavior
                 virtual void set_xormask(const char* p) = 0;
                 virtual void crypt_behavior(int behavior) = 0;
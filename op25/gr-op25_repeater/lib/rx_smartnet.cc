@@ -22,6 +22,8 @@
 #include "rx_smartnet.h"
 #include "op25_msg_types.h"
 
+#include <algorithm>
+
 namespace gr {
     namespace op25_repeater {
 
@@ -30,10 +32,12 @@ namespace gr {
             d_debug(debug),
             d_msgq_id(msgq_id),
             d_msg_queue(queue),
+            d_msgs_sent(0),
             sync_timer(op25_timer(1000000)),
             d_cbuf_idx(0),
             logts(logger)
         {
+            sync_timer.set_clock(&logts);
             sync_reset();
         }
 
@@ -41,8 +45,43 @@ namespace gr {
         rx_smartnet::~rx_smartnet() {
         }
 
-        // symbol receiver and framer
+        // symbol receiver
         void rx_smartnet::rx_sym(const uint8_t sym) {
+            rx_syms(&sym, 1);
+        }
+
+        // bulk symbol receiver; the timeout is checked once per block, and symbols
+        // which can neither start nor end a frame are only buffered
+        void rx_smartnet::rx_syms(const uint8_t* syms, size_t n) {
+            if (sync_timer.expired()) {                                                 // Check for timeout
+                d_in_sync = false;
+                d_rx_count = 0;
+                sync_timeout();
+            }
+
+            size_t i = 0;
+            while (i < n) {
+                size_t run = n - i;
+                if (d_in_sync)
+                    run = (d_rx_count + 1 < SMARTNET_FRAME_LENGTH) ? std::min(run, (size_t)(SMARTNET_FRAME_LENGTH - 1 - d_rx_count)) : 0;
+                size_t k = 0;
+                for (; k < run; k++) {
+                    uint8_t sync_reg = ((d_sync_reg << 1) & 0xff ) | (syms[i+k] & 1);
+                    if (!d_in_sync && ((sync_reg ^ (uint8_t)SMARTNET_SYNC_MAGIC) == 0))
+                        break;
+                    d_sync_reg = sync_reg;
+                    cbuf_insert(syms[i+k]);
+                }
+                d_symbol_count += k;
+                d_rx_count += k;
+                i += k;
+                if (k < run || run == 0)
+                    frame_sym(syms[i++]);
+            }
+        }
+
+        // framer; called for symbols that may start or complete a frame
+        void rx_smartnet::frame_sym(const uint8_t sym) {
             bool crc_ok;
             bool sync_detected = false;
             d_symbol_count ++;
@@ -53,13 +92,6 @@ namespace gr {
             cbuf_insert(sym);
             d_rx_count ++;
 
-            if (sync_timer.expired()) {                                                 // Check for timeout
-                d_in_sync = false;
-                d_rx_count = 0;
-                sync_timeout();
-                return;
-            }
-
             if (sync_detected && !d_in_sync) {                                          // First sync marks starts data collection
                 d_in_sync = true;
                 d_rx_count = 0;
@@ -222,8 +254,10 @@ namespace gr {
                 std::string m_buf;
                 gr::message::sptr msg;
                 msg = gr::message::make_from_string(m_buf, get_msg_type(PROTOCOL_SMARTNET, M_SMARTNET_TIMEOUT), (d_msgq_id << 1), logts.get_ts());
-                if (!d_msg_queue->full_p())
+                if (!d_msg_queue->full_p()) {
                     d_msg_queue->insert_tail(msg);
+                    d_msgs_sent++;
+                }
             }
             if (d_debug >= 10) {
                 fprintf(stderr, "%s rx_smartnet::sync_timeout:\n", logts.get(d_msgq_id));
@@ -237,8 +271,10 @@ namespace gr {
                 std::string m_buf;
                 gr::message::sptr msg;
                 msg = gr::message::make_from_string(m_buf, get_msg_type(PROTOCOL_SMARTNET, M_SMARTNET_BAD_OSW), (d_msgq_id << 1), logts.get_ts());
-                if (!d_msg_queue->full_p())
+                if (!d_msg_queue->full_p()) {
                     d_msg_queue->insert_tail(msg);
+                    d_msgs_sent++;
+                }
             }
             if (d_debug >= 10) {
                 fprintf(stderr, "%s rx_smartnet::bad_osw:\n", logts.get(d_msgq_id));
@@ -251,8 +287,10 @@ namespace gr {
             if ((d_msgq_id >= 0) && (!d_msg_queue->full_p())) {
 
                 gr::message::sptr msg = gr::message::make_from_string(msg_str, get_msg_type(PROTOCOL_SMARTNET, M_SMARTNET_OSW), (d_msgq_id<<1), logts.get_ts());
-                if (!d_msg_queue->full_p())
+                if (!d_msg_queue->full_p()) {
                     d_msg_queue->insert_tail(msg);
+                    d_msgs_sent++;
+                }
             }
         }
 
@@ -61,6 +61,7 @@ namespace gr {
         class rx_smartnet : public rx_base {
             public:
                 void rx_sym(const uint8_t sym);
+                void rx_syms(const uint8_t* syms, size_t n);
                 void sync_reset(void);
                 void reset_timer(void);
                 void call_end(void) { };
@@ -73,11 +74,13 @@ namespace gr {
                 // crypt_behavior
                 void crypt_behavior(int behavior) { };
                 void set_debug(int debug);
+                uint32_t msgs_sent() const { return d_msgs_sent; }
                 rx_smartnet(const char * options, log_ts& logger, int debug, int msgq_id, gr::msg_queue::sptr queue);
                 ~rx_smartnet();
 
             private:
                 void sync_timeout();
+                void frame_sym(const uint8_t sym);
                 void cbuf_insert(const uint8_t c);
                 void deinterleave(const uint8_t* buf);
                 void error_correction();
@@ -88,6 +91,7 @@ namespace gr {
                 int d_debug;
                 int d_msgq_id;
                 gr::msg_queue::sptr d_msg_queue;
+                uint32_t d_msgs_sent;	// messages queued by this decoder
 
                 op25_timer sync_timer;
                 bool d_in_sync;
@@ -30,6 +30,7 @@ namespace gr {
             d_debug(debug),
             d_msgq_id(msgq_id),
             d_msg_queue(queue),
+            d_msgs_sent(0),
             d_flag_reg(0),
             logts(logger)
         {
@@ -53,6 +54,11 @@ namespace gr {
             }
         }
 
+        void rx_subchannel::rx_syms(const uint8_t* syms, size_t n) {
+            for (size_t i = 0; i < n; i++)
+                rx_subchannel::rx_sym(syms[i]);     // qualified to avoid a virtual call per symbol
+        }
+
         void rx_subchannel::sync_reset(void) {
             d_flag_reg = 0;
         }
@@ -66,8 +72,10 @@ namespace gr {
             if ((d_msgq_id >= 0) && (!d_msg_queue->full_p())) {
 
                 gr::message::sptr msg = gr::message::make_from_string(msg_str, get_msg_type(PROTOCOL_SMARTNET, M_SMARTNET_END_PTT), (d_msgq_id<<1), logts.get_ts());
-                if (!d_msg_queue->full_p())
+                if (!d_msg_queue->full_p()) {
                     d_msg_queue->insert_tail(msg);
+                    d_msgs_sent++;
+                }
             }
         }
 
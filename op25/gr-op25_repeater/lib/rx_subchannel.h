@@ -45,6 +45,7 @@ namespace gr {
         class rx_subchannel : public rx_base {
             public:
                 void rx_sym(const uint8_t sym);
+                void rx_syms(const uint8_t* syms, size_t n);
                 void sync_reset(void);
                 void reset_timer(void) { };
                 void call_end(void) { };
@@ -57,6 +58,7 @@ namespace gr {
                 // crypt_behavior
                 void crypt_behavior(int behavior) { };
                 void set_debug(int debug);
+                uint32_t msgs_sent() const { return d_msgs_sent; }
                 rx_subchannel(const char * options, log_ts& logger, int debug, int msgq_id, gr::msg_queue::sptr queue);
                 ~rx_subchannel();
 
@@ -66,6 +68,7 @@ namespace gr {
                 int d_debug;
                 int d_msgq_id;
                 gr::msg_queue::sptr d_msg_queue;
+                uint32_t d_msgs_sent;	// messages queued by this decoder
 
                 uint16_t d_flag_reg;
                 log_ts& logts;
@@ -59,6 +59,17 @@ void rx_sync::cbuf_insert(const uint8_t c) {
 	d_cbuf_idx = (d_cbuf_idx + 1) % CBUF_SIZE;
 }
 
+void rx_sync::cbuf_insert(const uint8_t* c, size_t n) {
+	while (n > 0) {
+		size_t len = std::min((size_t)(CBUF_SIZE - d_cbuf_idx), n);
+		memcpy(d_cbuf + d_cbuf_idx, c, len);
+		memcpy(d_cbuf + d_cbuf_idx + CBUF_SIZE, c, len);
+		d_cbuf_idx = (d_cbuf_idx + len) % CBUF_SIZE;
+		c += len;
+		n -= len;
+	}
+}
+
 void rx_sync::reset_timer(void) {
 	sync_timer.reset();
 	p25fdma.reset_timer();
@@ -116,6 +127,28 @@ void rx_sync::set_nac(int nac) {
     p25tdma.set_nac(nac);
 }
 
+// Restrict sync detection to a comma separated list of protocols (MODE_DATA names,
+// e.g. "P25P1,P25P2"); an empty list searches for all of them
+void rx_sync::set_protocols(const char* protocols) {
+	uint32_t mask = 0;
+	std::string list(protocols);
+	for (int type = RX_TYPE_NONE + 1; type < RX_N_TYPES; type++) {
+		size_t pos = 0;
+		while (pos <= list.size()) {
+			size_t end = list.find(',', pos);
+			if (end == std::string::npos)
+				end = list.size();
+			if (strcasecmp(list.substr(pos, end - pos).c_str(), MODE_DATA[type].type) == 0)
+				mask |= 1U << type;
+			pos = end + 1;
+		}
+	}
+	if (d_debug >= 10) {
+		fprintf(stderr, "%s rx_sync::set_protocols: %s (mask 0x%x)\n", logts.get(d_msgq_id), protocols, mask);
+	}
+	d_protocols = (mask == 0) ? ~0U : mask;	// applied by the symbol thread on its next pass
+}
+
 void rx_sync::set_slot_mask(int mask) {
 	if (mask == d_slot_mask)
 		return;
@@ -157,6 +190,10 @@ void rx_sync::set_debug(int debug) {
 	dmr.set_debug(debug);
 }
 
+uint32_t rx_sync::msgs_sent() const {
+	return d_msgs_sent + p25fdma.msgs_sent() + p25tdma.msgs_sent() + dmr.msgs_sent();
+}
+
 static int ysf_decode_fich(const uint8_t src[100], uint8_t dest[32]) {   // input is 100 dibits, result is 32 bits
 // return -1 on decode error, else 0
 	static const int pc[] = {0, 1, 1, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0, 1, 1, 0, 1, 0, 0, 1, 0, 1, 1, 0, 0, 1, 1, 0, 1, 0, 0, 1};
@@ -243,11 +280,16 @@ rx_sync::rx_sync(const char * options, log_ts& logger, int debug, int msgq_id, g
 	dmr(logger, debug, msgq_id, queue),
 	d_msgq_id(msgq_id),
 	d_msg_queue(queue),
+	d_msgs_sent(0),
 	d_stereo(true),
 	d_debug(debug),
 	d_audio(options, debug),
     logts(logger)
 {
+	sync_timer.set_clock(&logts);
+	for (int i = 0; i < KNOWN_MAGICS; i++)
+		d_correlator.add(SYNC_MAGIC[i].type, SYNC_MAGIC[i].magic, MODE_DATA[SYNC_MAGIC[i].type].sync_len);
+	d_protocols = ~0U;
 	if (msgq_id >= 0)
 		d_stereo = false; // single channel audio for trunking
 
@@ -279,13 +321,17 @@ void rx_sync::sync_timeout(rx_types proto)
 		case RX_TYPE_P25P1:
 		case RX_TYPE_P25P2:
 			msg = gr::message::make_from_string(m_buf, get_msg_type(PROTOCOL_P25, M_P25_TIMEOUT), (d_msgq_id << 1), logts.get_ts());
-            if (!d_msg_queue->full_p())
+            if (!d_msg_queue->full_p()) {
 				d_msg_queue->insert_tail(msg);
+				d_msgs_sent++;
+            }
 			break;
 		case RX_TYPE_DMR:
 			msg = gr::message::make_from_string(m_buf, get_msg_type(PROTOCOL_DMR, M_DMR_TIMEOUT), (d_msgq_id << 1), logts.get_ts());
-            if (!d_msg_queue->full_p())
+            if (!d_msg_queue->full_p()) {
 				d_msg_queue->insert_tail(msg);
+				d_msgs_sent++;
+            }
 			break;
 		default:
 			break;
@@ -308,8 +354,10 @@ void rx_sync::sync_established(rx_types proto)
 		case RX_TYPE_P25P1:
 		case RX_TYPE_P25P2:
 			msg = gr::message::make_from_string(m_buf, get_msg_type(PROTOCOL_P25, M_P25_SYNC_ESTAB), (d_msgq_id << 1), logts.get_ts());
-            if (!d_msg_queue->full_p())
+            if (!d_msg_queue->full_p()) {
 				d_msg_queue->insert_tail(msg);
+				d_msgs_sent++;
+            }
 			break;
 		case RX_TYPE_DMR:
 			break;
@@ -464,6 +512,51 @@ void rx_sync::output(int16_t * samp_buf, const ssize_t slot_id) {
 		d_audio.send_audio(samp_buf, NSAMP_OUTPUT * sizeof(int16_t));
 }
 
+// returns the protocol whose sync pattern ends at sync_reg (and sets d_fs), or RX_TYPE_NONE
+enum rx_types rx_sync::find_sync(const uint64_t sync_reg) {
+	d_correlator.set_types(d_protocols);
+	d_correlator.set_locked(d_current_type, d_threshold);
+	int i = d_correlator.match(sync_reg);
+	if (i < 0)
+		return RX_TYPE_NONE;
+	d_fs = d_correlator.magic(i);
+	return (enum rx_types) d_correlator.type(i);
+}
+
+// Bulk symbol entry point.  Runs of symbols that can neither carry a sync
+// pattern nor complete or expire the current fragment are only scanned and
+// copied into the circular buffer; every other symbol goes through rx_sym().
+// While unsynced the sync timeout is checked once per run instead of per symbol.
+void rx_sync::rx_syms(const uint8_t* syms, size_t n) {
+	size_t i = 0;
+	while (i < n) {
+		if (d_slot_mask & 0x4) // idle receiver
+			return;
+		int64_t run = n - i;
+		if (d_current_type != RX_TYPE_NONE) {
+			run = std::min(run, (int64_t)d_fragment_len - d_rx_count - 1);
+			run = std::min(run, (int64_t)d_expires - d_symbol_count - 1);
+		}
+		size_t k = 0;
+		if (run > 0) {
+			d_correlator.set_types(d_protocols);
+			d_correlator.set_locked(d_current_type, d_threshold);
+			k = d_correlator.scan(syms + i, run, d_sync_reg);
+		}
+		if (k > 0) {
+			d_symbol_count += k;
+			cbuf_insert(syms + i, k);
+			i += k;
+			if (d_current_type != RX_TYPE_NONE)
+				d_rx_count += k;
+			else if (sync_timer.expired())
+				sync_timeout(RX_TYPE_NONE);
+		}
+		if ((int64_t)k < run || run <= 0)
+			rx_sym(syms[i++]);
+	}
+}
+
 void rx_sync::rx_sym(const uint8_t sym) {
 	uint8_t bitbuf[864*2];
 	enum rx_types sync_detected = RX_TYPE_NONE;
@@ -478,13 +571,7 @@ void rx_sync::rx_sym(const uint8_t sym) {
 
 	d_symbol_count ++;
 	d_sync_reg = (d_sync_reg << 2) | (sym & 3);
-	for (int i = 0; i < KNOWN_MAGICS; i++) {
-		if (check_frame_sync(SYNC_MAGIC[i].magic ^ d_sync_reg, (SYNC_MAGIC[i].type == d_current_type) ? d_threshold : 0, MODE_DATA[SYNC_MAGIC[i].type].sync_len)) {
-			sync_detected = (enum rx_types) SYNC_MAGIC[i].type;
-            d_fs = SYNC_MAGIC[i].magic;
-			break;
-		}
-	}
+	sync_detected = find_sync(d_sync_reg);
 	cbuf_insert(sym);
 	if (d_current_type == RX_TYPE_NONE && sync_detected == RX_TYPE_NONE) {
 		if (sync_timer.expired()) {
@@ -33,6 +33,7 @@
 
 #include "bit_utils.h"
 #include "check_frame_sync.h"
+#include "sync_correlator.h"
 
 #include "frame_sync_magics.h"
 #include "p25p1_fdma.h"
@@ -124,6 +125,7 @@ enum codeword_types {
 class rx_sync : public rx_base {
 public:
 	void rx_sym(const uint8_t sym);
+	void rx_syms(const uint8_t* syms, size_t n);
 	void sync_reset(void);
 	void reset_timer(void);
 	void call_end(void);
@@ -133,17 +135,21 @@ public:
 	void set_slot_key(int mask);
 	void set_xormask(const char* p);
 	void set_nac(int nac);
+	void set_protocols(const char* protocols);
 	//crypt_behavior
 	void crypt_behavior(int behavior);
 	void set_debug(int debug);
     void dump_buffer();
+	uint32_t msgs_sent() const;
 	rx_sync(const char * options, log_ts& logger, int debug, int msgq_id, gr::msg_queue::sptr queue);
 	~rx_sync();
 
 private:
 	void sync_timeout(rx_types proto);
 	void sync_established(rx_types proto);
+	enum rx_types find_sync(const uint64_t sync_reg);
 	void cbuf_insert(const uint8_t c);
+	void cbuf_insert(const uint8_t* c, size_t n);
 	void ysf_sync(const uint8_t dibitbuf[], bool& ysf_fullrate, bool& unmute);
 	void codeword(const uint8_t* cw, const enum codeword_types codeword_type, int slot_id);
 	void output(int16_t * samp_buf, const ssize_t slot_id);
@@ -155,6 +161,8 @@ private:
 	unsigned int d_symbol_count;
 	uint64_t d_sync_reg;
 	uint64_t d_fs;
+	sync_correlator d_correlator;
+	uint32_t d_protocols;	// bit mask (1 << rx_types) of protocols searched for
 	uint8_t d_cbuf[CBUF_SIZE*2];
 	//unsigned int d_cbuf_idx;
 	uint32_t d_cbuf_idx;
@@ -181,6 +189,7 @@ private:
 	dmr_cai dmr;
 	int d_msgq_id;
 	gr::msg_queue::sptr d_msg_queue;
+	uint32_t d_msgs_sent;	// messages queued by this decoder
 	bool d_stereo;
 	int d_debug;
 	int d_behavior;
@@ -729,7 +729,8 @@ static const float PhzNz[57] = {
 	0.068775, 0.520336, 2.339119, -0.808328, 1.332154, 2.929768, -0.338316, 0.022767, -1.063795
 };
 
-software_imbe_decoder::software_imbe_decoder()
+software_imbe_decoder::software_imbe_decoder() :
+   d_xform(imbe_transform::make())
 {
    int i,j;
 	//initialize
@@ -765,6 +766,24 @@ software_imbe_decoder::next_u(uint32_t u) {
 
 software_imbe_decoder::~software_imbe_decoder()
 {
+   delete d_xform;
+}
+
+bool
+software_imbe_decoder::set_transform(int type)
+{
+   imbe_transform *xform = imbe_transform::make(type);
+   if (!xform)
+      return false;
+   delete d_xform;
+   d_xform = xform;
+   return true;
+}
+
+const char *
+software_imbe_decoder::transform_name() const
+{
+   return d_xform->name();
 }
 
 void
@@ -815,51 +834,6 @@ software_imbe_decoder::adaptive_smoothing(float SE, float ET)
    }
 }
 
-void
-software_imbe_decoder::fft(float REX[], float IMX[])
-{
-   int I;
-   int J;
-   int K;
-   int H;
-   int KpH;
-   int Ht2;
-   float tmp_f;
-   float l_Ui, l_Uq, Theta, Si, Sq, Ti, Xi, Tq, Xq;
-
-   J = 64;
-   for(I = 1; I <= 126; I++) {
-#define SWAP(x,y) tmp_f=x;x=y;y=tmp_f
-      if(I < J) { SWAP(REX[J], REX[I]); SWAP(IMX[J], IMX[I]); }
-#undef SWAP
-      K = 64;
-      while(K <= J) { J = J - K; K = K / 2; }
-      J = J + K;
-   }
-
-   H = 1;
-   for(I = 1; I <= 7; I++) {
-      Ht2 = H * 2; l_Ui = 1; l_Uq = 0;
-      Theta = M_PI / H; Si = cos(Theta); Sq = -sin(Theta);
-      for(J = 1; J <= H; J++) {
-         for(K = J - 1; K <= 127; K+=Ht2) {
-            KpH = K + H;
-
-            Ti = REX[KpH] * l_Ui - IMX[KpH] * l_Uq; Xi = REX[K];
-            Tq = REX[KpH] * l_Uq + IMX[KpH] * l_Ui; Xq = IMX[K];
-
-            REX[KpH] = Xi - Ti; REX[K] = Xi + Ti;
-            IMX[KpH] = Xq - Tq; IMX[K] = Xq + Tq;
-         }
-         Ti = l_Ui;
-         l_Ui = Ti * Si - l_Uq * Sq;
-         l_Uq = Ti * Sq + l_Uq * Si;
-      }
-      H = Ht2;
-   }
-
-}
-
 void
 software_imbe_decoder::decode_fullrate(uint32_t u0, uint32_t u1, uint32_t u2, uint32_t u3, uint32_t u4, uint32_t u5, uint32_t u6, uint32_t u7, uint32_t E0, uint32_t ET)
 {
@@ -1304,77 +1278,6 @@ software_imbe_decoder::enhance_spectral_amplitudes(float& SE)
 
 }
 
-void
-software_imbe_decoder::ifft(float FDi[], float FDq[], float TD[]) // ToDo: replace "real IFFT" with fftw3 IFFT proc!
-{
-	//Inverse FFT:
-	//  transform 129-point freq domain(FDx) to 256-point time domain(TD)
-
-   float Ai[128];
-   float Aq[128];
-
-   int I;
-   int J;
-   int K;
-   int H;
-   float l_Ui, l_Uq, Si, Sq, Ti, Tq, Xi, Xq;
-
-   for(I = 0; I <= 63; I++) {
-      J = I + 64;    //64 to 127
-      K = I * 2;     //0 to 126(step 2)
-      H = 128 - K;   //128 to 2(step 2)
-      Ai[I] = FDi[K] + FDq[K];
-      Aq[I] = FDi[K + 1] + FDq[K + 1];
-      Ai[J] = FDi[H] - FDq[H];
-      Aq[J] = FDi[H - 1] - FDq[H - 1];
-   }
-
-   fft(Ai, Aq);
-
-   for(I = 1; I <= 63; I++) {
-      J = 128 - I;    //127 to 65
-      K = I + 128;    //129 to 191
-      H = J + 128;    //255 to 193
-      FDi[K] = (Aq[I] + Aq[J]) / 2;
-      FDi[H] = FDi[K]  ; //a
-      FDq[K] = -(Ai[I] - Ai[J]) / 2;
-      FDq[H] = -FDq[K] ; //b
-      FDi[I] = (Ai[I] + Ai[J]) / 2;
-      FDi[J] = FDi[I]  ; //c
-      FDq[I] = (Aq[I] - Aq[J]) / 2;
-      FDq[J] = -FDq[I] ; //d
-   }
-
-   // I,J=64  K,H=192
-   FDi[192] = Aq[64]; //a
-   FDq[192] = 0     ; //b
-   FDi[64] = Ai[64] ; //c (new)
-   FDq[64] = 0      ; //d
-
-   //I=0  J,K=128  H=256  ( Ax(128) wraps to Ax(0))
-   FDi[128] = Aq[0] ; //a
-   FDq[128] = 0     ; //b
-   FDi[0] = Ai[0]   ; //c (new)
-   FDq[0] = 0       ; //d
-
-   l_Ui = 1; l_Uq = 0;
-   Si = cos(M_PI / 128); Sq = -sin(M_PI / 128);
-   for(I = 0; I <= 127; I++) {
-      J = I + 128  ;   //128 TO 255
-
-      Ti = FDi[J] * l_Ui - FDq[J] * l_Uq; Xi = FDi[I];
-      Tq = FDi[J] * l_Uq + FDq[J] * l_Ui; Xq = FDq[I];
-
-
-      TD[I + 128] =((Xi + Ti) -(Xq + Tq));
-      TD[I      ] =((Xi - Ti) -(Xq - Tq));
-
-      Ti = l_Ui;
-      l_Ui = Ti * Si - l_Uq * Sq;
-      l_Uq = Ti * Sq + l_Uq * Si;
-   }
-}
-
 uint16_t
 software_imbe_decoder::rearrange(uint32_t u0, uint32_t u1, uint32_t u2, uint32_t u3, uint32_t u4, uint32_t u5, uint32_t u6, uint32_t u7)
 {
@@ -1490,6 +1393,7 @@ software_imbe_decoder::synth_unvoiced()
    float Uwi[256];
    float Uwq[256];
    float uw[256];
+   float x[211];
 
    float Tmp;
 
@@ -1502,6 +1406,10 @@ software_imbe_decoder::synth_unvoiced()
    for (; en < 211; en++) {
       u[en] = next_u(u[en-1]);
    }
+   for (en = 0; en < 211; en++) {
+      x[en] = u[en] * ws[en];
+   }
+   d_xform->set_input(x);
 
    ell = 0; bl =(int) ceilf(128 / M_PI *(ell + .5) * w0);
    for(em = 0; em <= bl - 1; em++) {
@@ -1518,15 +1426,7 @@ software_imbe_decoder::synth_unvoiced()
          }
       } else {
          Luv = Luv + 1;
-         for(em = al; em <= bl - 1; em++) {
-            Uwi[em] = 0;
-            Uwq[em] = 0;
-            for (en = 0; en < 211; en++) {
-               float exp = -0.0078125 * M_PI * em * (en - 105);
-               Uwi[em] = Uwi[em] + u[en] * ws[en] * cos(exp);
-               Uwq[em] = Uwq[em] + u[en] * ws[en] * sin(exp);
-            }
-         }
+         d_xform->spectrum(al, bl, Uwi, Uwq);
          //precompute Tmp = <most of big hairy equation>
          Tmp = 0;
          // FOR en = al TO bl - 1
@@ -1549,7 +1449,7 @@ software_imbe_decoder::synth_unvoiced()
       Uwi[em] = 0; Uwq[em] = 0;
    }
 
-   ifft(Uwi, Uwq, uw);
+   d_xform->synthesize(Uwi, Uwq, uw);
 
    //         ws(n)*uw(n,-1) + ws(n-159)*uw(n-159,0)          uw(-128 to 127)
    //suv(n) = --------------------------------------
@@ -25,6 +25,7 @@
 #define INCLUDED_SOFTWARE_IMBE_DECODER_H
 
 #include "imbe_decoder.h"
+#include "imbe_transform.h"
 
 #include <stdint.h>
 
@@ -54,6 +55,15 @@ public:
 	void decode_fullrate(uint32_t u0, uint32_t u1, uint32_t u2, uint32_t u3, uint32_t u4, uint32_t u5, uint32_t u6, uint32_t u7, uint32_t E0, uint32_t ET);
 	void decode_tap(int _L, int _K, float _w0, const int * _v, const float * _mu);
 	void decode_tone(int _ID, int _AD, int * _n);
+
+	/**
+	 * Select the unvoiced synthesis transform backend.
+	 *
+	 * \param type an imbe_transform_type.
+	 * \return false (keeping the current backend) if it is not available.
+	 */
+	bool set_transform(int type);
+	const char *transform_name() const;
 private:
 
 	//NOTE: Single-letter variable names are upper case only; Lower
@@ -73,6 +83,7 @@ private:
 	float psi1;
 	float phi[57][2];
 	uint32_t u[211];
+	imbe_transform *d_xform;			// unvoiced synthesis transforms
 
 	int Old;
 	int New;
@@ -93,9 +104,7 @@ private:
 	void decode_spectral_amplitudes(int, int );
 	void decode_vuv(int );
 	void adaptive_smoothing(float, float );
-	void fft(float i[], float q[]);
 	void enhance_spectral_amplitudes(float&);
-	void ifft(float i[], float q[], float[]);
 	uint16_t rearrange(uint32_t u0, uint32_t u1, uint32_t u2, uint32_t u3, uint32_t u4, uint32_t u5, uint32_t u6, uint32_t u7);
 	void synth_unvoiced();
 	void synth_voiced();
@@ -0,0 +1,155 @@
+/*
+ * Stand-alone benchmark for frame sync detection.
+ *
+ * Scans a binary dibit file (one symbol per byte, as written by the
+ * raw_output channel option) for all rx_sync frame sync patterns, once
+ * with the per-pattern check_frame_sync() loop and once with the
+ * sync_correlator, and reports the matches found and symbols per second.
+ *
+ * This file is part of OP25
+ *
+ * OP25 is free software; you can redistribute it and/or modify it
+ * under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * OP25 is distributed in the hope that it will be useful, but WITHOUT
+ * ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+ * or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+ * License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with OP25; see the file COPYING. If not, write to the Free
+ * Software Foundation, Inc., 51 Franklin Street, Boston, MA
+ * 02110-1301, USA.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <unistd.h>
+#include <time.h>
+#include <fstream>
+#include <iterator>
+#include <vector>
+
+#include "frame_sync_magics.h"
+#include "check_frame_sync.h"
+#include "sync_correlator.h"
+
+static const struct {
+	int type;
+	int len;
+	uint64_t magic;
+	const char* name;
+} SYNCS[] = {
+	{1, 48, P25_FRAME_SYNC_MAGIC,    "P25P1"},
+	{2, 40, P25P2_FRAME_SYNC_MAGIC,  "P25P2"},
+	{3, 48, DMR_BS_VOICE_SYNC_MAGIC, "DMR"},
+	{3, 48, DMR_BS_DATA_SYNC_MAGIC,  "DMR"},
+	{3, 48, DMR_MS_VOICE_SYNC_MAGIC, "DMR"},
+	{3, 48, DMR_MS_DATA_SYNC_MAGIC,  "DMR"},
+	{3, 48, DMR_MS_RC_SYNC_MAGIC,    "DMR"},
+	{3, 48, DMR_T1_VOICE_SYNC_MAGIC, "DMR"},
+	{3, 48, DMR_T1_DATA_SYNC_MAGIC,  "DMR"},
+	{3, 48, DMR_T2_VOICE_SYNC_MAGIC, "DMR"},
+	{3, 48, DMR_T2_DATA_SYNC_MAGIC,  "DMR"},
+	{4, 48, DSTAR_FRAME_SYNC_MAGIC,  "DSTAR"},
+	{5, 40, YSF_FRAME_SYNC_MAGIC,    "YSF"}
+};	// same patterns, order and types as SYNC_MAGIC in rx_sync.h
+static const int N_SYNCS = sizeof(SYNCS) / sizeof(SYNCS[0]);
+
+static double now()
+{
+	struct timespec ts;
+	clock_gettime(CLOCK_MONOTONIC, &ts);
+	return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+// reference: test every pattern on every symbol, as rx_sync did
+static size_t scan_scalar(const std::vector<uint8_t>& syms, int locked, int threshold, std::vector<size_t>& hits)
+{
+	uint64_t reg = 0;
+	for (size_t i = 0; i < syms.size(); i++) {
+		reg = (reg << 2) | (syms[i] & 3);
+		for (int p = 0; p < N_SYNCS; p++) {
+			if (check_frame_sync(SYNCS[p].magic ^ reg, (SYNCS[p].type == locked) ? threshold : 0, SYNCS[p].len)) {
+				hits.push_back(i);
+				break;
+			}
+		}
+	}
+	return hits.size();
+}
+
+static size_t scan_correlator(const std::vector<uint8_t>& syms, int locked, int threshold, std::vector<size_t>& hits)
+{
+	sync_correlator corr;
+	for (int p = 0; p < N_SYNCS; p++)
+		corr.add(SYNCS[p].type, SYNCS[p].magic, SYNCS[p].len);
+	corr.set_locked(locked, threshold);
+	uint64_t reg = 0;
+	size_t i = 0;
+	while (i < syms.size()) {
+		i += corr.scan(&syms[i], syms.size() - i, reg);
+		if (i < syms.size()) {
+			hits.push_back(i);
+			reg = (reg << 2) | (syms[i++] & 3);
+		}
+	}
+	return hits.size();
+}
+
+int main(int argc, char* argv[])
+{
+	int repeat = 10;
+	int locked = 1;		// P25P1
+	int threshold = 2;	// rx_sync allows up to 2 bit errors for the locked protocol
+	int opt;
+
+	while ((opt = getopt(argc, argv, "r:l:t:")) != -1) {
+		switch (opt) {
+		case 'r': repeat = atoi(optarg); break;
+		case 'l': locked = atoi(optarg); break;
+		case 't': threshold = atoi(optarg); break;
+		default:
+			fprintf(stderr, "Usage: sync_bench [-r repeat] [-l locked_type] [-t threshold] <dibit file>\n");
+			return 1;
+		}
+	}
+	if (optind >= argc || repeat < 1) {
+		fprintf(stderr, "Usage: sync_bench [-r repeat] [-l locked_type] [-t threshold] <dibit file>\n");
+		return 1;
+	}
+
+	std::ifstream file(argv[optind], std::ios::in | std::ios::binary);
+	if (!file) {
+		fprintf(stderr, "sync_bench: unable to open %s\n", argv[optind]);
+		return 1;
+	}
+	std::vector<uint8_t> syms((std::istreambuf_iterator<char>(file)), std::istreambuf_iterator<char>());
+	printf("%zu symbols, locked type %d with threshold %d, %d passes\n", syms.size(), locked, threshold, repeat);
+
+	std::vector<size_t> ref_hits, hits;
+	double t0 = now();
+	for (int r = 0; r < repeat; r++) {
+		ref_hits.clear();
+		scan_scalar(syms, locked, threshold, ref_hits);
+	}
+	double t_scalar = (now() - t0) / repeat;
+
+	t0 = now();
+	for (int r = 0; r < repeat; r++) {
+		hits.clear();
+		scan_correlator(syms, locked, threshold, hits);
+	}
+	double t_corr = (now() - t0) / repeat;
+
+	printf("scalar:     %8zu syncs  %8.2f Msym/s\n", ref_hits.size(), syms.size() / t_scalar / 1e6);
+	printf("correlator: %8zu syncs  %8.2f Msym/s  (%.1fx)\n", hits.size(), syms.size() / t_corr / 1e6, t_scalar / t_corr);
+	if (hits != ref_hits) {
+		fprintf(stderr, "sync_bench: MISMATCH between scalar and correlator results\n");
+		return 2;
+	}
+	return 0;
+}
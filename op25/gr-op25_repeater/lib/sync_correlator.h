@@ -0,0 +1,166 @@
+// Multi-pattern frame sync correlator
+//
+// This file is part of OP25
+//
+// OP25 is free software; you can redistribute it and/or modify it
+// under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 3, or (at your option)
+// any later version.
+//
+// OP25 is distributed in the hope that it will be useful, but WITHOUT
+// ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+// or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+// License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with OP25; see the file COPYING. If not, write to the Free
+// Software Foundation, Inc., 51 Franklin Street, Boston, MA
+// 02110-1301, USA.
+
+#ifndef INCLUDED_SYNC_CORRELATOR_H
+#define INCLUDED_SYNC_CORRELATOR_H
+
+#include <stdint.h>
+#include <string.h>
+#include <vector>
+
+#include "check_frame_sync.h"
+
+// Tests a dibit stream against a list of sync patterns at once.
+//
+// Every candidate pattern (and, for patterns allowed bit errors, every
+// variant of it within the error threshold) is entered into a 64k bit
+// filter indexed by the last 16 bits of the sync register.  A symbol
+// position is only compared against the patterns when its filter bit is
+// set, so scanning costs a shift and a table lookup per symbol however
+// many patterns are active.  Matching is identical to testing each
+// pattern in order with check_frame_sync().
+//
+// Patterns must be at least 16 bits long.  Errors are tolerated for one
+// "locked" type at a time, other types must match exactly.
+
+class sync_correlator {
+public:
+	sync_correlator() :
+		d_locked_type(-1),
+		d_threshold(0),
+		d_types(~0U),
+		d_dirty(true)
+	{
+	}
+
+	// patterns are tested in the order added; type must be < 32
+	void add(int type, uint64_t magic, int len)
+	{
+		pattern p = {type, magic, (len < 64) ? ((1ULL << len) - 1) : ~0ULL, len};
+		d_patterns.push_back(p);
+		d_dirty = true;
+	}
+
+	// allow up to threshold bit errors for patterns of the given type
+	void set_locked(int type, int threshold)
+	{
+		if (type == d_locked_type && threshold == d_threshold)
+			return;
+		d_locked_type = type;
+		d_threshold = threshold;
+		d_dirty = true;
+	}
+
+	// bit mask (1 << type) of the types considered; patterns of other types never match
+	void set_types(uint32_t types)
+	{
+		if (types == d_types)
+			return;
+		d_types = types;
+		d_dirty = true;
+	}
+
+	int type(int idx) const { return d_patterns[idx].type; }
+	uint64_t magic(int idx) const { return d_patterns[idx].magic; }
+
+	// index of the first pattern ending at sync_reg, or -1
+	int match(uint64_t sync_reg)
+	{
+		if (d_dirty)
+			rebuild();
+		if (!filter_hit(sync_reg))
+			return -1;
+		return verify(sync_reg);
+	}
+
+	// Shifts the symbols into sync_reg until one completes a pattern.  Returns
+	// the number of symbols consumed (n if there was no match); the matching
+	// symbol itself is not shifted in.
+	size_t scan(const uint8_t* syms, size_t n, uint64_t& sync_reg)
+	{
+		if (d_dirty)
+			rebuild();
+		uint64_t reg = sync_reg;
+		size_t k = 0;
+		for (; k < n; k++) {
+			uint64_t next_reg = (reg << 2) | (syms[k] & 3);
+			if (filter_hit(next_reg) && verify(next_reg) >= 0)
+				break;
+			reg = next_reg;
+		}
+		sync_reg = reg;
+		return k;
+	}
+
+private:
+	struct pattern {
+		int type;
+		uint64_t magic;
+		uint64_t mask;
+		int len;
+	};
+
+	inline bool filter_hit(uint64_t sync_reg) const
+	{
+		uint32_t key = sync_reg & 0xffff;
+		return (d_filter[key >> 6] >> (key & 63)) & 1;
+	}
+
+	inline int verify(uint64_t sync_reg) const
+	{
+		for (size_t i = 0; i < d_patterns.size(); i++) {
+			const pattern& p = d_patterns[i];
+			if (!((d_types >> p.type) & 1))
+				continue;
+			if (check_frame_sync(p.magic ^ sync_reg, (p.type == d_locked_type) ? d_threshold : 0, p.len))
+				return i;
+		}
+		return -1;
+	}
+
+	// set the filter bit of every 16 bit key within errs bit flips of key, flipping bits below pos
+	void mark(uint32_t key, int errs, int pos)
+	{
+		d_filter[key >> 6] |= 1ULL << (key & 63);
+		if (errs == 0)
+			return;
+		for (int b = pos - 1; b >= 0; b--)
+			mark(key ^ (1U << b), errs - 1, b);
+	}
+
+	void rebuild()
+	{
+		memset(d_filter, 0, sizeof(d_filter));
+		for (size_t i = 0; i < d_patterns.size(); i++) {
+			const pattern& p = d_patterns[i];
+			if ((d_types >> p.type) & 1)
+				mark(p.magic & 0xffff, (p.type == d_locked_type) ? d_threshold : 0, 16);
+		}
+		d_dirty = false;
+	}
+
+	std::vector<pattern> d_patterns;
+	uint64_t d_filter[65536 / 64];
+	int d_locked_type;
+	int d_threshold;
+	uint32_t d_types;
+	bool d_dirty;
+};
+
+#endif /* INCLUDED_SYNC_CORRELATOR_H */
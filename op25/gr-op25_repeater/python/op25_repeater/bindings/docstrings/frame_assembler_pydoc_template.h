@@ -25,3 +25,27 @@ static const char *__doc_gr_op25_repeater_frame_assembler_set_debug =
     R"doc()doc";
 
 static const char *__doc_gr_op25_repeater_frame_assembler_control = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_set_xormask = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_set_slotid = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_set_slotkey = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_set_nac = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_sync_reset = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_call_end = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_crypt_reset = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_crypt_key = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_crypt_behavior = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_dump_buffer = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_set_protocols = R"doc()doc";
+
+static const char *__doc_gr_op25_repeater_frame_assembler_set_replay_clock = R"doc()doc";
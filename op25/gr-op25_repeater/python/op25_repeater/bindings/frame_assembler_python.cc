@@ -16,7 +16,7 @@
 /* BINDTOOL_GEN_AUTOMATIC(0) */
 /* BINDTOOL_USE_PYGCCXML(0) */
 /* BINDTOOL_HEADER_FILE(frame_assembler.h) */
-/* BINDTOOL_HEADER_FILE_HASH(039ddef878982559df6298d2cbbe8747) */
+/* BINDTOOL_HEADER_FILE_HASH(1806d2a3f43c5b4364cbe28ef212a0aa) */
 /***********************************************************************************/
 
 #include <pybind11/complex.h>
@@ -47,5 +47,41 @@ void bind_frame_assembler(py::module &m) {
       .def("control", &frame_assembler::control, py::arg("args"),
            D(frame_assembler, control))
 
+      .def("set_xormask", &frame_assembler::set_xormask, py::arg("xormask"),
+           D(frame_assembler, set_xormask))
+
+      .def("set_slotid", &frame_assembler::set_slotid, py::arg("slotid"),
+           D(frame_assembler, set_slotid))
+
+      .def("set_slotkey", &frame_assembler::set_slotkey, py::arg("slotkey"),
+           D(frame_assembler, set_slotkey))
+
+      .def("set_nac", &frame_assembler::set_nac, py::arg("nac"),
+           D(frame_assembler, set_nac))
+
+      .def("sync_reset", &frame_assembler::sync_reset,
+           D(frame_assembler, sync_reset))
+
+      .def("call_end", &frame_assembler::call_end,
+           D(frame_assembler, call_end))
+
+      .def("crypt_reset", &frame_assembler::crypt_reset,
+           D(frame_assembler, crypt_reset))
+
+      .def("crypt_key", &frame_assembler::crypt_key, py::arg("keyid"), py::arg("algid"), py::arg("key"),
+           D(frame_assembler, crypt_key))
+
+      .def("crypt_behavior", &frame_assembler::crypt_behavior, py::arg("behavior"),
+           D(frame_assembler, crypt_behavior))
+
+      .def("dump_buffer", &frame_assembler::dump_buffer,
+           D(frame_assembler, dump_buffer))
+
+      .def("set_protocols", &frame_assembler::set_protocols, py::arg("protocols"),
+           D(frame_assembler, set_protocols))
+
+      .def("set_replay_clock", &frame_assembler::set_replay_clock, py::arg("rate"),
+           D(frame_assembler, set_replay_clock))
+
       ;
 }
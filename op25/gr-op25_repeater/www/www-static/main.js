@@ -38,6 +38,15 @@ var nfinal_count = 0;
 var n200_count = 0;
 var r200_count = 0;
 var SEND_QLIMIT = 5;
+var stream_src = null;
+var stream_count = 0;
+var stream_errors = 0;
+var STREAM_MAX_ERRORS = 3;
+var poll_timer = null;
+var plot_frames = {};
+var PLOT_WIDTH = 640;
+var PLOT_HEIGHT = 400;
+var PLOT_STALE = 5000;      // ms without data before a plot is hidden
 var c_freq = 0;
 var c_ppm = null;
 var c_system = null;
@@ -248,6 +257,7 @@ function rx_update(d) {
         error_val = null;
     if (d["fine_tune"] != undefined)
         fine_tune = d["fine_tune"];
+    plot_expire();
 }
 
 // frequency, system, and talkgroup display
@@ -726,8 +736,116 @@ function trunk_update(d) {
     channel_status();
 }
 
+// plots are rendered locally from the json frames sent by the receiver
+
 function plot(d) {
-    //TODO: implement local plot rendering using json data
+    var chan = (channel_list.length > 0) ? Number(channel_list[channel_index]) : 0;
+    if (d["chan"] != chan)
+        return;
+    var p = plot_frames[d["mode"]];
+    if (p == undefined) {
+        var canvas = document.createElement("canvas");
+        canvas.width = (d["mode"] == "constellation") ? PLOT_HEIGHT : PLOT_WIDTH;
+        canvas.height = PLOT_HEIGHT;
+        canvas.className = "plot-canvas";
+        document.getElementById("div_canvas").appendChild(canvas);
+        p = {"canvas": canvas, "time": 0};
+        plot_frames[d["mode"]] = p;
+    }
+    p.time = Date.now();
+    p.canvas.style["display"] = "";
+    plot_draw(p.canvas, d);
+}
+
+function plot_expire() {
+    var now = Date.now();
+    for (var mode in plot_frames) {
+        if (now - plot_frames[mode].time > PLOT_STALE)
+            plot_frames[mode].canvas.style["display"] = "none";
+    }
+}
+
+function plot_draw(canvas, d) {
+    var ctx = canvas.getContext("2d");
+    var w = canvas.width;
+    var h = canvas.height;
+    var ml = 60, mr = 15, mt = 25, mb = 30;
+    var x0 = d["xrange"][0], x1 = d["xrange"][1];
+    var y0 = d["yrange"][0], y1 = d["yrange"][1];
+    if (x1 == x0) x1 = x0 + 1;
+    if (y1 == y0) y1 = y0 + 1;
+    var sx = (w - ml - mr) / (x1 - x0);
+    var sy = (h - mt - mb) / (y1 - y0);
+    function px(x) { return ml + (x - x0) * sx; }
+    function py(y) { return h - mb - (y - y0) * sy; }
+
+    ctx.fillStyle = "white";
+    ctx.fillRect(0, 0, w, h);
+    ctx.font = "11px sans-serif";
+    ctx.strokeStyle = "#dddddd";
+    ctx.fillStyle = "black";
+    ctx.lineWidth = 1;
+    ctx.beginPath();
+    for (var i = 0; i <= 4; i++) {
+        var gx = x0 + (x1 - x0) * i / 4;
+        var gy = y0 + (y1 - y0) * i / 4;
+        ctx.moveTo(px(gx), py(y0));
+        ctx.lineTo(px(gx), py(y1));
+        ctx.moveTo(px(x0), py(gy));
+        ctx.lineTo(px(x1), py(gy));
+        ctx.textAlign = "center";
+        ctx.fillText(Math.abs(x1 - x0) < 10 ? gx.toFixed(3) : gx.toFixed(0), px(gx), h - mb + 14);
+        ctx.textAlign = "right";
+        ctx.fillText(gy.toFixed(0), ml - 4, py(gy) + 4);
+    }
+    ctx.stroke();
+    ctx.strokeStyle = "black";
+    ctx.strokeRect(ml, mt, w - ml - mr, h - mt - mb);
+    ctx.textAlign = "center";
+    ctx.fillText(d["title"], w / 2, 16);
+
+    ctx.save();
+    ctx.beginPath();
+    ctx.rect(ml, mt, w - ml - mr, h - mt - mb);
+    ctx.clip();
+    var y = d["y"];
+    ctx.strokeStyle = "#8a2be2";
+    ctx.fillStyle = "#8a2be2";
+    if (d["mode"] == "eye") {
+        var sps = d["sps"];
+        ctx.beginPath();
+        for (var t = 0; t + sps <= y.length; t += sps) {
+            ctx.moveTo(px(0), py(y[t]));
+            for (var i = 1; i < sps; i++)
+                ctx.lineTo(px(i), py(y[t + i]));
+        }
+        ctx.stroke();
+    }
+    else if (d["mode"] == "constellation") {
+        var x = d["x"];
+        for (var i = 0; i < y.length; i++)
+            ctx.fillRect(px(x[i]) - 1, py(y[i]) - 1, 2, 2);
+    }
+    else if (d["mode"] == "symbol") {
+        for (var i = 0; i < y.length; i++)
+            ctx.fillRect(px(i) - 1, py(y[i]) - 1, 2, 2);
+    }
+    else {                  // fft, mixer, fll
+        var dx = (y.length > 1) ? (d["xrange"][1] - d["xrange"][0]) / (y.length - 1) : 0;
+        ctx.beginPath();
+        ctx.moveTo(px(x0), py(y[0]));
+        for (var i = 1; i < y.length; i++)
+            ctx.lineTo(px(x0 + i * dx), py(y[i]));
+        ctx.stroke();
+        if (d["marker"] != undefined) {
+            ctx.strokeStyle = "black";
+            ctx.beginPath();
+            ctx.moveTo(px(d["marker"]), py(y0));
+            ctx.lineTo(px(d["marker"]), py(y1));
+            ctx.stroke();
+        }
+    }
+    ctx.restore();
 }
 
 function http_req_cb() {
@@ -742,7 +860,10 @@ function http_req_cb() {
         return;
     }
     r200_count += 1;
-    var dl = JSON.parse(http_req.responseText);
+    dispatch_updates(JSON.parse(http_req.responseText));
+}
+
+function dispatch_updates(dl) {
     var dispatch = {'trunk_update': trunk_update, 'change_freq': change_freq, 'channel_update': channel_update, 'rx_update': rx_update, 'terminal_config': term_config, 'plot': plot}
     for (var i=0; i<dl.length; i++) {
         var d = dl[i];
@@ -758,12 +879,43 @@ function do_onload() {
     var ele = document.getElementById("div_status");
     ele.style["display"] = "";
     set_tuning_step_sizes();
+    if (!stream_start())
+        poll_start();
     send_command("get_terminal_config", 0, 0);
-    setInterval(do_update, 1000);
     b = document.getElementById("b1");
     b.className = "nav-button-active";
 }
 
+// status updates are pushed by the server over an EventSource; fall back to
+// polling if the browser or server does not support it
+function stream_start() {
+    if (typeof(EventSource) == "undefined")
+        return false;
+    stream_src = new EventSource("/stream");
+    stream_src.onopen = function() {
+        stream_errors = 0;
+    }
+    stream_src.onmessage = function(e) {
+        stream_count += 1;
+        dispatch_updates(JSON.parse(e.data));
+        f_debug();
+    }
+    stream_src.onerror = function() {
+        stream_errors += 1;
+        if (stream_src.readyState == EventSource.CLOSED || stream_errors >= STREAM_MAX_ERRORS) {
+            stream_src.close();
+            stream_src = null;
+            poll_start();
+        }
+    }
+    return true;
+}
+
+function poll_start() {
+    if (poll_timer == null)
+        poll_timer = setInterval(do_update, 1000);
+}
+
 function do_update() {
     if (channel_list.length == 0) {
         send_command("update", 0, 0);
@@ -790,7 +942,7 @@ function send_process() {
         send_busy += 1;
         return;
     }
-    http_req.open("POST", "/");
+    http_req.open("POST", (stream_src == null) ? "/" : "/?stream");
     http_req.onreadystatechange = http_req_cb;
     http_req.setRequestHeader("Content-type", "application/json");
     cmd = JSON.stringify( send_queue );
@@ -885,6 +1037,9 @@ function f_debug() {
 	html += " incomplete=" + nfinal_count;
 	html += " error=" + n200_count;
 	html += " OK=" + r200_count;
+	html += "<br>stream: " + ((stream_src == null) ? "off" : "on");
+	html += " events=" + stream_count;
+	html += " errors=" + stream_errors;
 	html += "<br>";
 	var div_debug = document.getElementById("div_debug");
 	div_debug.innerHTML = html;